@@ -0,0 +1,371 @@
+"""
+Sorgu planı gerileme testi: sentetik bir portföy kurar, servislerin ve sayfaların (Streamlit AppTest
+ile) çalıştırdığı tüm SQL cümlelerini toplar ve her birini EXPLAIN (ANALYZE, BUFFERS) ile çalıştırır.
+Büyük tablolarda seçici bir süzgeç için yapılan sıralı taramaları (Seq Scan) ve taban çizgisine
+göre maliyeti artan planları işaretler; sıralı taramanın süzgecinden bir indeks önerisi çıkarır.
+İşaret varsa çıkış kodu 1'dir.
+
+Yerel bir PostgreSQL'e karşı, proje kökünden (.env okunur):
+
+    python benchmarks/explain_plans.py --olcek orta
+    python benchmarks/explain_plans.py --olcek orta --taban-kaydet
+    python benchmarks/explain_plans.py --olcek orta --json planlar.json --ayrinti
+
+Notlar:
+- Yazma cümleleri de ANALYZE ile gerçekten çalıştırılır; her biri bir savepoint içinde çalışıp geri
+  alınır, veri değişmez (tetikleyicilerin gönderdiği NOTIFY'lar da iletilmez).
+- Geçici tablolara (tmp_*) dayanan toplu aktarım cümleleri ayrı bağlantıda çalıştırılamadığı için
+  atlanır. Tetikleyici / fonksiyon içindeki sorgular EXPLAIN'de görünmediği için sıcak olanların
+  eşdeğerleri FONKSIYON_SORGULARI'nda tutulur (database/*.sql değişirse burası da güncellenmeli).
+- Cümleler, sabitleri '?' ile değiştirilmiş "parmak izine" göre tekilleştirilir; her parmak izinin
+  ilk görülen örneği açıklanır.
+"""
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+PROJE_KOKU = Path(__file__).resolve().parents[1]
+VARSAYILAN_ONEK = "Plan Testi Sitesi"
+BITIS_AYI = "2025-12"
+TABAN_DOSYASI = Path(__file__).with_name("plan_baseline.json")
+
+# Bu kadar satırdan büyük tablolarda, okuduğu satırların en az SECICILIK kadarını süzgeçle atan
+# sıralı taramalar işaretlenir (indeksle yalnızca gereken satırlar okunabilirdi)
+BUYUK_TABLO_SATIR = 10_000
+SECICILIK = 0.90
+# Toplam plan maliyeti taban çizgisine göre bu orandan fazla artarsa gerileme sayılır
+MALIYET_TOLERANSI = 0.20
+
+# Uygulamanın sayfaları: (modül, render fonksiyonu)
+SAYFALAR = (
+    ("src.views.overview", "render_overview_page"),
+    ("src.views.payments", "render_payments_page"),
+    ("src.views.buildings", "render_buildings_page"),
+    ("src.views.expenses", "render_expenses_page"),
+    ("src.views.personnel", "render_personnel_page"),
+    ("src.views.bulk_ops", "render_bulk_ops_page"),
+)
+
+# Açıklanmayan cümleler: bağlantı / oturum komutları, COPY ve DDL, havuz sağlık kontrolü
+_ATLANAN_CUMLE = re.compile(
+    r"^\s*(SET|SHOW|BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE|COPY|CREATE|DROP|ALTER|TRUNCATE|ANALYZE|LISTEN|"
+    r"select pg_catalog\.version|select current_schema|SELECT 1\s*$|SELECT pg_stat_force_next_flush)",
+    re.IGNORECASE)
+_GECICI_TABLO = re.compile(r"\btmp_\w+", re.IGNORECASE)
+
+# Veritabanı fonksiyonlarının içindeki sıcak sorguların eşdeğerleri: (fonksiyon, sorgu).
+# %(site_id)s / %(unit_id)s test portföyünden doldurulur.
+FONKSIYON_SORGULARI = (
+    ("fn_distribute_payment_to_debts", """
+        SELECT d.id, d.remaining_amount,
+               SUM(GREATEST(d.remaining_amount, 0)) OVER (ORDER BY d.period_month ASC, d.id ASC)
+        FROM debt_item d
+        WHERE d.unit_id = %(unit_id)s AND d.status IN ('UNPAID', 'PARTIAL')
+    """),
+    ("fn_rebuild_monthly_site_summary", """
+        SELECT date_trunc('month', process_date)::date, SUM(amount)
+        FROM payment
+        WHERE complex_id = %(site_id)s
+        GROUP BY 1
+    """),
+    ("fn_rebuild_monthly_site_summary", """
+        SELECT date_trunc('month', process_date)::date, SUM(amount)
+        FROM account_transaction
+        WHERE complex_id = %(site_id)s AND type = 'EXPENSE'
+        GROUP BY 1
+    """),
+)
+
+# --------------------------------------------------------------------------------------------
+# Cümlelerin toplanması
+# --------------------------------------------------------------------------------------------
+
+def parmak_izi(sorgu):
+    """Sabitleri ve liste uzunluklarını atarak aynı sorgu şablonunu tek anahtara indirger."""
+    metin = re.sub(r"--[^\n]*", " ", sorgu)
+    metin = re.sub(r"'(?:[^']|'')*'", "?", metin)
+    metin = re.sub(r"\b\d+(?:\.\d+)?\b", "?", metin)
+    metin = re.sub(r"\?(?:\s*,\s*\?)+", "?", metin)
+    return re.sub(r"\s+", " ", metin).strip()
+
+def _cagiran():
+    """Sorguyu çalıştıran en yakın servis / sayfa fonksiyonu ('modül.fonksiyon')."""
+    cerceve = sys._getframe(2)
+    while cerceve is not None:
+        dosya = cerceve.f_code.co_filename
+        if f"{os.sep}src{os.sep}services{os.sep}" in dosya or f"{os.sep}src{os.sep}views{os.sep}" in dosya:
+            modul = Path(dosya).relative_to(PROJE_KOKU).with_suffix("").as_posix().replace("/", ".")
+            return f"{modul}.{cerceve.f_code.co_name}"
+        cerceve = cerceve.f_back
+    return None
+
+class SorguToplayici:
+    """Havuz bağlantılarından geçen cümleleri parmak izine göre tekilleştirerek toplar."""
+
+    def __init__(self):
+        self.cumleler = {}
+
+    def __call__(self, sorgu, sure_ms, satir):
+        if not _ATLANAN_CUMLE.match(sorgu):
+            self.ekle(sorgu, _cagiran())
+
+    def ekle(self, sorgu, cagiran):
+        iz = parmak_izi(sorgu)
+        kayit = self.cumleler.setdefault(iz, {"ornek": sorgu.strip(), "adet": 0, "cagiranlar": []})
+        kayit["adet"] += 1
+        if cagiran and cagiran not in kayit["cagiranlar"]:
+            kayit["cagiranlar"].append(cagiran)
+
+def sayfalari_calistir(site_id, site_adi):
+    """Her sayfayı Streamlit AppTest ile bir kez (önbellek boşken) çizer; hata veren sayfaları döner."""
+    from streamlit.testing.v1 import AppTest
+    from src.services.cache_service import tum_onbellegi_temizle
+
+    hatalar = {}
+    for modul, fonksiyon in SAYFALAR:
+        tum_onbellegi_temizle()
+        betik = (f"import streamlit as st\n"
+                 f"st.session_state.setdefault('selected_site_id', {site_id})\n"
+                 f"st.session_state.setdefault('selected_site_name', {site_adi!r})\n"
+                 f"from {modul} import {fonksiyon}\n"
+                 f"{fonksiyon}()\n")
+        uygulama = AppTest.from_string(betik, default_timeout=120)
+        uygulama.run()
+        if uygulama.exception:
+            hatalar[fonksiyon] = str(uygulama.exception[0].value)[:200]
+    return hatalar
+
+def servisleri_calistir(site_id, daire_haritasi, tohum):
+    """Servis benchmark'ının senaryolarını (okuma ve yazma) birer kez çalıştırır."""
+    import random
+    from benchmarks.service_benchmark import senaryolari_olustur
+    from src.services.debt_service import dogrula_odenen_tutarlar
+
+    daireler = random.Random(tohum).sample(list(daire_haritasi["unit_id"]), min(len(daire_haritasi), 3))
+    baglam = {"site_id": site_id, "daireler": daireler, "daire_haritasi": daire_haritasi}
+    sirali = sorted(senaryolari_olustur().items(), key=lambda s: s[1][2] != "okuma")
+    for ad, (cagri, _, _) in sirali:
+        cagri(baglam, 1)
+    dogrula_odenen_tutarlar(site_id)
+
+def fonksiyon_sorgularini_ekle(toplayici, site_id, unit_id):
+    from src.database.connection import db_cursor
+
+    with db_cursor() as cur:
+        for fonksiyon, sorgu in FONKSIYON_SORGULARI:
+            ornek = cur.mogrify(sorgu, {"site_id": site_id, "unit_id": unit_id}).decode("utf-8")
+            toplayici.ekle(ornek, f"database.{fonksiyon}")
+
+# --------------------------------------------------------------------------------------------
+# Planların çıkarılması ve incelenmesi
+# --------------------------------------------------------------------------------------------
+
+def _dugumler(dugum, derinlik=0):
+    yield dugum, derinlik
+    for alt in dugum.get("Plans", ()):
+        yield from _dugumler(alt, derinlik + 1)
+
+def indeks_onerisi(tablo, suzgec, siralama=()):
+    """
+    Sıralı taramanın süzgecinden (ör. "((unit_id = 5) AND ((status)::text <> 'PAID'))") indeks önerisi:
+    önce eşitlik sütunları, sonra planın sıraladığı sütunlar (siralama), sonra aralık karşılaştırmaları.
+    Öneri yoksa None.
+    """
+    if not suzgec:
+        return None
+    esitlik, aralik = [], []
+    for sutun, islec in re.findall(r"\(*(\w+)\)?(?:::\w+)*\s*(=|<>|>=|<=|>|<)\s", suzgec):
+        if sutun.lower() in ("and", "or", "not") or sutun.isdigit():
+            continue
+        hedef = esitlik if islec == "=" else aralik if islec != "<>" else None
+        if hedef is not None and sutun not in esitlik + aralik:
+            hedef.append(sutun)
+    sutunlar = esitlik + [s for s in siralama if s not in esitlik] + [s for s in aralik if s not in siralama]
+    return f"CREATE INDEX ON {tablo} ({', '.join(sutunlar)})" if sutunlar else None
+
+def plani_incele(plan, tablo_boyutlari):
+    """EXPLAIN JSON çıktısından özet ve büyük tablolardaki sıralı taramaları çıkarır."""
+    kok = plan["Plan"]
+    # Sort düğümlerinin anahtarları ("p.process_date DESC"): taranan tabloya aitse indekse eklenir
+    siralamalar = [re.match(r"(?:(\w+)\.)?(\w+)(?: DESC)?$", anahtar)
+                   for dugum, _ in _dugumler(kok) if dugum["Node Type"] == "Sort"
+                   for anahtar in dugum.get("Sort Key", ())]
+    taramalar = []
+    for dugum, _ in _dugumler(kok):
+        tablo = dugum.get("Relation Name")
+        if dugum["Node Type"] != "Seq Scan" or tablo_boyutlari.get(tablo, 0) < BUYUK_TABLO_SATIR:
+            continue
+        elenen = dugum.get("Rows Removed by Filter", 0)
+        if elenen < SECICILIK * (elenen + dugum.get("Actual Rows", 0)):
+            continue
+        siralama = [m.group(2) for m in siralamalar
+                    if m and m.group(1) in (None, tablo, dugum.get("Alias"))]
+        taramalar.append({
+            "tablo": tablo,
+            "tablo_satir": int(tablo_boyutlari[tablo]),
+            "suzgec": dugum.get("Filter"),
+            "elenen_satir": elenen * dugum.get("Actual Loops", 1),
+            "oneri": indeks_onerisi(tablo, dugum.get("Filter"), siralama),
+        })
+    return {
+        "maliyet": kok["Total Cost"],
+        "sure_ms": round(plan.get("Execution Time", 0.0), 3),
+        "tampon_isabet": kok.get("Shared Hit Blocks", 0),
+        "tampon_okuma": kok.get("Shared Read Blocks", 0),
+        "dugumler": sorted({d["Node Type"] for d, _ in _dugumler(kok)}),
+        "sirali_taramalar": taramalar,
+    }
+
+def planlari_cikar(cumleler):
+    """
+    Her cümleyi ayrı bir savepoint içinde EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ile çalıştırır ve geri alır.
+    Dönüş: {parmak_izi_hash: {"ornek", "cagiranlar", "adet", ... plani_incele alanları | "atlandi" | "hata"}}
+    """
+    from src.database.connection import havuz_disi_baglanti
+
+    sonuclar = {}
+    conn = havuz_disi_baglanti()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' "
+                        "AND relnamespace = 'public'::regnamespace")
+            tablo_boyutlari = dict(cur.fetchall())
+            for iz, kayit in cumleler.items():
+                anahtar = hashlib.md5(iz.encode("utf-8")).hexdigest()[:12]
+                sonuc = {"parmak_izi": iz, "ornek": kayit["ornek"], "cagiranlar": kayit["cagiranlar"],
+                         "adet": kayit["adet"]}
+                if _GECICI_TABLO.search(kayit["ornek"]):
+                    sonuc["atlandi"] = "geçici tabloya bağlı"
+                else:
+                    cur.execute("SAVEPOINT plan")
+                    try:
+                        cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + kayit["ornek"])
+                        sonuc.update(plani_incele(cur.fetchone()[0][0], tablo_boyutlari))
+                    except Exception as e:
+                        sonuc["hata"] = str(e).strip().splitlines()[0]
+                    cur.execute("ROLLBACK TO SAVEPOINT plan")
+                sonuclar[anahtar] = sonuc
+        conn.rollback()
+    finally:
+        conn.close()
+    return sonuclar
+
+def karsilastir(planlar, taban):
+    """
+    İşaretler: büyük tablodaki her sıralı tarama ve tabana göre maliyeti MALIYET_TOLERANSI'ndan fazla artan planlar.
+    Dönüş: [{"anahtar", "tur": "sirali_tarama" | "maliyet", "cagiranlar", "ayrinti"}]
+    """
+    isaretler = []
+    for anahtar, plan in planlar.items():
+        for tarama in plan.get("sirali_taramalar", ()):
+            ayrinti = f"Seq Scan {tarama['tablo']} ({tarama['tablo_satir']:,} satır), süzgeç: {tarama['suzgec']}"
+            if tarama["oneri"]:
+                ayrinti += f"\n      öneri: {tarama['oneri']}"
+            isaretler.append({"anahtar": anahtar, "tur": "sirali_tarama", "cagiranlar": plan["cagiranlar"],
+                              "ayrinti": ayrinti})
+        eski = (taban or {}).get("planlar", {}).get(anahtar)
+        if eski and "maliyet" in eski and "maliyet" in plan and plan["maliyet"] > eski["maliyet"] * (1 + MALIYET_TOLERANSI):
+            isaretler.append({"anahtar": anahtar, "tur": "maliyet", "cagiranlar": plan["cagiranlar"],
+                              "ayrinti": f"maliyet {eski['maliyet']:.1f} -> {plan['maliyet']:.1f} "
+                                         f"({plan['maliyet'] / eski['maliyet'] - 1:+.0%}), düğümler: "
+                                         f"{', '.join(eski['dugumler'])} -> {', '.join(plan['dugumler'])}"})
+    return isaretler
+
+def raporu_yazdir(planlar, isaretler, ayrinti=False):
+    aciklanan = sum(1 for p in planlar.values() if "maliyet" in p)
+    atlanan = sum(1 for p in planlar.values() if "atlandi" in p)
+    hatali = {a: p for a, p in planlar.items() if "hata" in p}
+    print(f"\n{len(planlar)} farklı cümle: {aciklanan} açıklandı, {atlanan} atlandı, {len(hatali)} hata.")
+    if ayrinti:
+        for anahtar, plan in sorted(planlar.items(), key=lambda p: -p[1].get("maliyet", 0)):
+            if "maliyet" in plan:
+                print(f"  {anahtar}  maliyet {plan['maliyet']:>10.1f}  {plan['sure_ms']:>8.2f} ms  "
+                      f"{', '.join(plan['cagiranlar']) or '-'}")
+    for anahtar, plan in hatali.items():
+        print(f"  HATA {anahtar} ({', '.join(plan['cagiranlar']) or '-'}): {plan['hata']}")
+    if not isaretler:
+        print("İşaretlenen plan yok.")
+        return
+    print(f"\n{len(isaretler)} işaret:")
+    for isaret in isaretler:
+        print(f"  [{isaret['tur']}] {isaret['anahtar']} {', '.join(isaret['cagiranlar']) or '-'}")
+        print(f"      {isaret['ayrinti']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EXPLAIN tabanlı sorgu planı gerileme testi (yerel PostgreSQL).")
+    parser.add_argument("--olcek", default="orta", choices=("kucuk", "orta", "buyuk"))
+    parser.add_argument("--tohum", type=int, default=42)
+    parser.add_argument("--onek", default=VARSAYILAN_ONEK, help="Test sitesi adı öneki")
+    parser.add_argument("--json", help="Planların yazılacağı JSON dosyası")
+    parser.add_argument("--taban", default=str(TABAN_DOSYASI), help="Karşılaştırılacak taban çizgisi")
+    parser.add_argument("--taban-kaydet", action="store_true", help="Planları yeni taban çizgisi olarak kaydet")
+    parser.add_argument("--ayrinti", action="store_true", help="Tüm cümleleri maliyetleriyle listele")
+    parser.add_argument("--koru", action="store_true", help="Test portföyünü sonda silme")
+    args = parser.parse_args(argv)
+
+    from benchmarks.synthetic_data import (OLCEKLER, portfoy_uret, portfoyu_sil, istatistikleri_guncelle,
+                                           streamlit_uyarilarini_kapat)
+    from src.database.connection import db_cursor, sorgu_dinleyicisi_ekle, sorgu_dinleyicisi_kaldir
+
+    streamlit_uyarilarini_kapat()
+    print(f"[{args.olcek}] portföy kuruluyor (tohum {args.tohum}, bitiş {BITIS_AYI})...", flush=True)
+    site_id = portfoy_uret(**OLCEKLER[args.olcek], tohum=args.tohum, bitis_ayi=BITIS_AYI,
+                           onek=args.onek)["site_idleri"][0]
+    try:
+        import pandas as pd
+
+        # Maliyetler tüm tabloların istatistiklerine bağlıdır; önceki çalıştırmalardan kalanlar oynatmasın
+        istatistikleri_guncelle(genis_orneklem=True)
+        with db_cursor() as cur:
+            cur.execute("SELECT name FROM complex_properties WHERE id = %s", (site_id,))
+            site_adi = cur.fetchone()[0]
+            cur.execute("""
+                SELECT u.id, b.name, u.unit_number FROM unit u JOIN building b ON b.id = u.building_id
+                WHERE b.complex_id = %s ORDER BY u.id
+            """, (site_id,))
+            daire_haritasi = pd.DataFrame(cur.fetchall(), columns=["unit_id", "Blok", "Daire No"])
+
+        toplayici = SorguToplayici()
+        sorgu_dinleyicisi_ekle(toplayici)
+        try:
+            print("Sayfalar ve servisler çalıştırılıyor...", flush=True)
+            sayfa_hatalari = sayfalari_calistir(site_id, site_adi)
+            servisleri_calistir(site_id, daire_haritasi, args.tohum)
+        finally:
+            sorgu_dinleyicisi_kaldir(toplayici)
+        fonksiyon_sorgularini_ekle(toplayici, site_id, int(daire_haritasi["unit_id"].iloc[0]))
+        for fonksiyon, hata in sayfa_hatalari.items():
+            print(f"  Sayfa hatası ({fonksiyon}): {hata}")
+
+        print(f"{len(toplayici.cumleler)} farklı cümle açıklanıyor...", flush=True)
+        planlar = planlari_cikar(toplayici.cumleler)
+    finally:
+        if not args.koru:
+            portfoyu_sil(args.onek)
+
+    taban_yolu = Path(args.taban)
+    taban = json.loads(taban_yolu.read_text(encoding="utf-8")) if taban_yolu.exists() else None
+    if taban and (taban.get("olcek"), taban.get("tohum")) != (args.olcek, args.tohum):
+        print(f"\nTaban çizgisi farklı ölçek / tohumla ({taban.get('olcek')}, {taban.get('tohum')}) kaydedilmiş; "
+              f"maliyetler karşılaştırılmadı.")
+        taban = None
+    isaretler = karsilastir(planlar, taban)
+    raporu_yazdir(planlar, isaretler, args.ayrinti)
+
+    sonuc = {"olcek": args.olcek, "tohum": args.tohum, "bitis_ayi": BITIS_AYI, "planlar": planlar}
+    if args.json:
+        Path(args.json).write_text(json.dumps({**sonuc, "isaretler": isaretler}, ensure_ascii=False, indent=2),
+                                   encoding="utf-8")
+    if args.taban_kaydet:
+        taban_yolu.write_text(json.dumps(sonuc, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"\nTaban çizgisi kaydedildi: {taban_yolu}")
+    return 1 if isaretler or sayfa_hatalari else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+Tahsilat günü yük testi: sentetik bir site kurar, ardından N iş parçacığı (veya süreç) ile
+kaydet_odeme, add_bulk_dues ve genel bakış okumalarını ayarlanan oran ve hızda çalıştırır.
+Sonunda işlem türü başına verim ve p50/p95/p99 gecikme, deadlock sayısı, daire kilidi
+bekleme süresi ve dağıtım tutarlılığı ihlallerini raporlar.
+
+Yerel bir PostgreSQL'e karşı, proje kökünden (.env okunur):
+
+    python benchmarks/load_test.py --isci 16 --sure 60 --karisim odeme=80,aidat=2,okuma=18
+    python benchmarks/load_test.py --mod surec --isci 8 --hiz 5 --json sonuc.json
+
+Test sitesi benchmarks/synthetic_data.py ile kurulur; aynı --tohum ile kurulan site ve üretilen
+işlem dizisi aynıdır. Site her çalıştırmada silinip yeniden kurulur; --koru verilirse sonda silinmez.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+import multiprocessing
+from datetime import date
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+ISLEM_TURLERI = ("odeme", "aidat", "okuma")
+VARSAYILAN_KARISIM = "odeme=80,aidat=2,okuma=18"
+
+def karisimi_coz(metin):
+    """'odeme=80,aidat=2,okuma=18' -> {"odeme": 80.0, ...}; toplamın 100 olması gerekmez."""
+    karisim = {}
+    for parca in metin.split(","):
+        tur, _, agirlik = parca.partition("=")
+        tur = tur.strip()
+        if tur not in ISLEM_TURLERI:
+            raise argparse.ArgumentTypeError(f"Bilinmeyen işlem türü: {tur} (geçerli: {', '.join(ISLEM_TURLERI)})")
+        karisim[tur] = float(agirlik)
+    if sum(karisim.values()) <= 0:
+        raise argparse.ArgumentTypeError("Karışım ağırlıklarının toplamı sıfırdan büyük olmalı.")
+    return karisim
+
+# --------------------------------------------------------------------------------------------
+# Test sitesinin kurulumu / silinmesi
+# --------------------------------------------------------------------------------------------
+
+def siteyi_kur(onek, blok_sayisi, daire_sayisi, yil_sayisi, tohum):
+    """
+    Sentetik veri üreticisiyle tek bir test sitesi kurar (geçmiş borçlar, ödemeler ve dağıtımlarıyla).
+    Dönüş: (site_id, [unit_id, ...])
+    """
+    from src.database.connection import db_cursor
+    from benchmarks.synthetic_data import portfoy_uret
+
+    site_id = portfoy_uret(1, blok_sayisi, daire_sayisi, yil_sayisi, tohum=tohum, onek=onek)["site_idleri"][0]
+    with db_cursor() as cur:
+        cur.execute("""
+            SELECT u.id FROM unit u JOIN building b ON b.id = u.building_id
+            WHERE b.complex_id = %s AND u.is_exempt IS DISTINCT FROM TRUE
+            ORDER BY u.id
+        """, (site_id,))
+        return site_id, [r[0] for r in cur.fetchall()]
+
+# --------------------------------------------------------------------------------------------
+# İşçiler
+# --------------------------------------------------------------------------------------------
+
+def _isci(ayarlar, isci_no):
+    """
+    Bir işçinin döngüsü: bitiş anına kadar karışıma göre işlem seçer ve çalıştırır.
+    Süreç modunda ayrı süreçte çalışır; bu yüzden servisler burada içe aktarılır.
+    Dönüş: {"olcumler": [(tür, başlangıç (epoch sn), süre_sn, başarılı, hata)], "havuz": get_pool_metrics()}
+    """
+    from src.database.connection import get_pool_metrics
+    from src.services.payment_service import kaydet_odeme
+    from src.services.bulk_ops_service import add_bulk_dues
+    from src.services.overview_service import get_genel_istatistikler, get_aylik_tahsilat_verisi
+    from benchmarks.synthetic_data import streamlit_uyarilarini_kapat
+
+    streamlit_uyarilarini_kapat()
+    okumalar = (get_genel_istatistikler, get_aylik_tahsilat_verisi)
+    if not ayarlar["onbellek"]:
+        # Önbelleği atlayıp doğrudan veritabanını ölçmek için süslenmemiş fonksiyonlar
+        okumalar = tuple(f.__wrapped__ for f in okumalar)
+
+    rastgele = random.Random(ayarlar["tohum"] * 1000 + isci_no)
+    turler = list(ayarlar["karisim"])
+    agirliklar = [ayarlar["karisim"][t] for t in turler]
+    site_id, daireler = ayarlar["site_id"], ayarlar["daireler"]
+    # Her aidat işlemi ileride, işçiye özgü yeni bir ay yansıtır (çakışıp boşa düşmesin diye)
+    aidat_sirasi = 0
+    aralik = 1.0 / ayarlar["hiz"] if ayarlar["hiz"] else 0.0
+
+    olcumler = []
+    sonraki = time.perf_counter()
+    # Süre işçi hazır olduğunda başlar; spawn edilen süreçlerin açılış süresi testten yemez
+    bitis = time.time() + ayarlar["sure"]
+    while time.time() < bitis:
+        if aralik:
+            bekle = sonraki - time.perf_counter()
+            if bekle > 0:
+                time.sleep(bekle)
+            sonraki += aralik
+        tur = rastgele.choices(turler, agirliklar)[0]
+        hata = None
+        an, baslangic = time.time(), time.perf_counter()
+        try:
+            if tur == "odeme":
+                tutar = rastgele.randrange(25, 200) * 10
+                basarili = kaydet_odeme(site_id, rastgele.choice(daireler), tutar, "Yük testi")
+            elif tur == "aidat":
+                ay = 12 * 5 + isci_no + aidat_sirasi * ayarlar["isci"]
+                aidat_sirasi += 1
+                donem = date(date.today().year + ay // 12, ay % 12 + 1, 1)
+                sonuc = add_bulk_dues(site_id, 1000, donem)
+                basarili, hata = sonuc["hata"] is None, sonuc["hata"]
+            else:
+                okuma = rastgele.choice(okumalar)
+                basarili = okuma(site_id) is not None
+        except Exception as e:
+            basarili, hata = False, str(e)
+        olcumler.append((tur, an, time.perf_counter() - baslangic, basarili, hata))
+    return {"olcumler": olcumler, "havuz": get_pool_metrics()}
+
+def _deadlock_sayisi(cur):
+    cur.execute("SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()")
+    return cur.fetchone()[0]
+
+# --------------------------------------------------------------------------------------------
+# Tutarlılık kontrolleri
+# --------------------------------------------------------------------------------------------
+
+TUTARLILIK_SORGULARI = {
+    # Bir ödemeden, tutarından fazlası borçlara dağıtılmış
+    "asiri_dagitilan_odeme": """
+        SELECT COUNT(*) FROM (
+            SELECT p.id FROM payment p JOIN payment_debt pd ON pd.payment_id = p.id
+            WHERE p.complex_id = %(site_id)s
+            GROUP BY p.id, p.amount HAVING SUM(pd.covered_amount) > p.amount
+        ) x
+    """,
+    # Bir borca, beklenen tutarından fazlası ödenmiş (aynı borca çifte dağıtım)
+    "asiri_odenen_borc": """
+        SELECT COUNT(*) FROM (
+            SELECT d.id FROM debt_item d
+            JOIN unit u ON u.id = d.unit_id JOIN building b ON b.id = u.building_id
+            JOIN payment_debt pd ON pd.debt_item_id = d.id
+            WHERE b.complex_id = %(site_id)s
+            GROUP BY d.id, d.expected_amount HAVING SUM(pd.covered_amount) > d.expected_amount
+        ) x
+    """,
+    # debt_item.paid_amount / status, payment_debt toplamıyla uyuşmuyor
+    "odenen_tutar_sapmasi": "SELECT COUNT(*) FROM fn_verify_debt_paid_amounts(%(site_id)s)",
+    # Tetikleyicilerle tutulan daire bakiyesi, borçlardan hesaplanan bakiyeyle uyuşmuyor
+    "daire_bakiyesi_sapmasi": """
+        SELECT COUNT(*) FROM (
+            SELECT u.id,
+                   COALESCE(SUM(d.remaining_amount) FILTER (WHERE d.status <> 'PAID'), 0) AS hesaplanan
+            FROM unit u JOIN building b ON b.id = u.building_id
+            LEFT JOIN debt_item d ON d.unit_id = u.id
+            WHERE b.complex_id = %(site_id)s
+            GROUP BY u.id
+        ) h
+        LEFT JOIN unit_balance ub ON ub.unit_id = h.id
+        WHERE COALESCE(ub.total, 0) <> h.hesaplanan
+    """,
+}
+
+def tutarlilik_kontrolu(site_id):
+    from src.database.connection import db_cursor
+    ihlaller = {}
+    with db_cursor() as cur:
+        for ad, sorgu in TUTARLILIK_SORGULARI.items():
+            cur.execute(sorgu, {"site_id": site_id})
+            ihlaller[ad] = cur.fetchone()[0]
+    return ihlaller
+
+# --------------------------------------------------------------------------------------------
+# Raporlama
+# --------------------------------------------------------------------------------------------
+
+def _yuzdelik(sureler, oran):
+    if len(sureler) == 1:
+        return sureler[0]
+    return statistics.quantiles(sureler, n=100, method="inclusive")[oran - 1]
+
+def ozetle(olcumler, sure_sn):
+    """İşlem türü başına adet, hata, verim (işlem/sn) ve gecikme yüzdelikleri (ms)."""
+    ozet = {}
+    for tur in ISLEM_TURLERI + ("toplam",):
+        secili = [o for o in olcumler if tur == "toplam" or o[0] == tur]
+        if not secili:
+            continue
+        sureler = sorted(o[2] * 1000 for o in secili)
+        ozet[tur] = {
+            "adet": len(secili),
+            "hata": sum(1 for o in secili if not o[3]),
+            "verim": round(len(secili) / sure_sn, 2),
+            "p50_ms": round(_yuzdelik(sureler, 50), 2),
+            "p95_ms": round(_yuzdelik(sureler, 95), 2),
+            "p99_ms": round(_yuzdelik(sureler, 99), 2),
+            "max_ms": round(sureler[-1], 2),
+        }
+    return ozet
+
+def raporu_yazdir(rapor):
+    print(f"\nSüre: {rapor['sure_sn']:.1f} sn, işçi: {rapor['ayarlar']['isci']} ({rapor['ayarlar']['mod']})")
+    print(f"{'İşlem':<8}{'Adet':>8}{'Hata':>7}{'İşlem/sn':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for tur, o in rapor["ozet"].items():
+        print(f"{tur:<8}{o['adet']:>8}{o['hata']:>7}{o['verim']:>10}{o['p50_ms']:>9}{o['p95_ms']:>9}"
+              f"{o['p99_ms']:>9}{o['max_ms']:>9}")
+    print(f"\nDeadlock: {rapor['deadlock']}")
+    kilit = rapor["kilit"]
+    print(f"Daire kilidi: {kilit['kilit_sayisi']} alım, ort {kilit['ort_kilit_bekleme_ms']:.2f} ms, "
+          f"max {kilit['max_kilit_bekleme_ms']:.2f} ms")
+    print("Tutarlılık ihlalleri:")
+    for ad, adet in rapor["tutarlilik"].items():
+        print(f"  {ad:<24}{adet:>6}{'' if adet == 0 else '  <-- HATA'}")
+    if rapor["hata_ornekleri"]:
+        print("Hata örnekleri:")
+        for hata in rapor["hata_ornekleri"]:
+            print(f"  {hata}")
+
+def _kilit_metriklerini_birlestir(havuzlar):
+    kilit = {"kilit_sayisi": 0, "toplam_kilit_bekleme_ms": 0.0, "max_kilit_bekleme_ms": 0.0}
+    for havuz in havuzlar:
+        kilit["kilit_sayisi"] += havuz["kilit_sayisi"]
+        kilit["toplam_kilit_bekleme_ms"] += havuz["toplam_kilit_bekleme_ms"]
+        kilit["max_kilit_bekleme_ms"] = max(kilit["max_kilit_bekleme_ms"], havuz["max_kilit_bekleme_ms"])
+    kilit["ort_kilit_bekleme_ms"] = (kilit["toplam_kilit_bekleme_ms"] / kilit["kilit_sayisi"]
+                                     if kilit["kilit_sayisi"] else 0.0)
+    return kilit
+
+# --------------------------------------------------------------------------------------------
+
+def yuk_testi(site_id, daireler, isci=8, sure=30, karisim=None, hiz=0.0, mod="thread", tohum=42, onbellek=True):
+    """
+    Kurulu bir site üzerinde yük testini çalıştırır ve rapor sözlüğünü döner
+    (ozet, deadlock, kilit, tutarlilik, hata_ornekleri).
+    """
+    from src.database.connection import db_cursor, get_pool_metrics
+
+    ayarlar = {"site_id": site_id, "daireler": daireler, "isci": isci, "karisim": karisim or karisimi_coz(VARSAYILAN_KARISIM),
+               "hiz": hiz, "tohum": tohum, "onbellek": onbellek, "mod": mod, "sure": sure}
+    with db_cursor() as cur:
+        deadlock_once = _deadlock_sayisi(cur)
+    kilit_once = get_pool_metrics()
+
+    if mod == "surec":
+        # spawn: havuzdaki bağlantılar çatallanan süreçlere kopyalanmasın
+        with ProcessPoolExecutor(max_workers=isci, mp_context=multiprocessing.get_context("spawn")) as yurutucu:
+            sonuclar = list(yurutucu.map(_isci, [ayarlar] * isci, range(isci)))
+        havuzlar = [s["havuz"] for s in sonuclar]
+    else:
+        with ThreadPoolExecutor(max_workers=isci, thread_name_prefix="yuk-testi") as yurutucu:
+            sonuclar = list(yurutucu.map(_isci, [ayarlar] * isci, range(isci)))
+        # İş parçacıkları aynı havuzu paylaşır; sayaçlardan testten önceki değerler çıkarılır
+        son = get_pool_metrics()
+        havuzlar = [{"kilit_sayisi": son["kilit_sayisi"] - kilit_once["kilit_sayisi"],
+                     "toplam_kilit_bekleme_ms": son["toplam_kilit_bekleme_ms"] - kilit_once["toplam_kilit_bekleme_ms"],
+                     "max_kilit_bekleme_ms": son["max_kilit_bekleme_ms"]}]
+
+    with db_cursor() as cur:
+        deadlock = _deadlock_sayisi(cur) - deadlock_once
+    olcumler = [o for s in sonuclar for o in s["olcumler"]]
+    # Verim ilk işlemin başından son işlemin sonuna kadar ölçülür (süreç başlatma süresi hariç)
+    gecen = max(o[1] + o[2] for o in olcumler) - min(o[1] for o in olcumler) if olcumler else 0.0
+    hatalar = sorted({o[4] for o in olcumler if o[4]})
+    return {
+        "ayarlar": {k: v for k, v in ayarlar.items() if k != "daireler"},
+        "sure_sn": gecen,
+        "ozet": ozetle(olcumler, gecen),
+        "deadlock": deadlock,
+        "kilit": _kilit_metriklerini_birlestir(havuzlar),
+        "tutarlilik": tutarlilik_kontrolu(site_id),
+        "hata_ornekleri": hatalar[:5],
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eşzamanlı kasiyer yük testi (yerel PostgreSQL).")
+    parser.add_argument("--isci", type=int, default=8, help="İşçi (iş parçacığı / süreç) sayısı")
+    parser.add_argument("--sure", type=float, default=30, help="Test süresi (sn)")
+    parser.add_argument("--karisim", type=karisimi_coz, default=VARSAYILAN_KARISIM,
+                        help=f"İşlem ağırlıkları (varsayılan: {VARSAYILAN_KARISIM})")
+    parser.add_argument("--hiz", type=float, default=0.0, help="İşçi başına işlem/sn (0: sınırsız)")
+    parser.add_argument("--mod", choices=("thread", "surec"), default="thread")
+    parser.add_argument("--blok", type=int, default=8, help="Test sitesindeki blok sayısı")
+    parser.add_argument("--daire", type=int, default=40, help="Blok başına daire sayısı")
+    parser.add_argument("--yil", type=int, default=1, help="Test sitesinin kaç yıllık geçmişle kurulacağı")
+    parser.add_argument("--tohum", type=int, default=42)
+    parser.add_argument("--onek", default="Yük Testi Sitesi", help="Test sitesi adı öneki")
+    parser.add_argument("--onbelleksiz", action="store_true", help="Okumalarda önbelleği atla")
+    parser.add_argument("--koru", action="store_true", help="Test sitesini sonda silme")
+    parser.add_argument("--json", help="Raporun yazılacağı JSON dosyası")
+    args = parser.parse_args(argv)
+
+    # Her işçiye bir bağlantı düşsün (havuz ayarları connection.py içe aktarılırken okunur)
+    os.environ.setdefault("DB_POOL_MAX", str(args.isci + 2))
+    from benchmarks.synthetic_data import portfoyu_sil, streamlit_uyarilarini_kapat
+
+    streamlit_uyarilarini_kapat()
+    print(f"Site kuruluyor: {args.blok} blok x {args.daire} daire, {args.yil} yıl geçmiş (tohum {args.tohum})...")
+    site_id, daireler = siteyi_kur(args.onek, args.blok, args.daire, args.yil, args.tohum)
+    try:
+        rapor = yuk_testi(site_id, daireler, isci=args.isci, sure=args.sure, karisim=args.karisim,
+                          hiz=args.hiz, mod=args.mod, tohum=args.tohum, onbellek=not args.onbelleksiz)
+    finally:
+        if not args.koru:
+            portfoyu_sil(args.onek)
+
+    raporu_yazdir(rapor)
+    if args.json:
+        Path(args.json).write_text(json.dumps(rapor, ensure_ascii=False, indent=2), encoding="utf-8")
+    # Tutarlılık ihlali varsa sıfırdan farklı çıkış kodu (CI'da kullanılabilsin)
+    return 1 if any(rapor["tutarlilik"].values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
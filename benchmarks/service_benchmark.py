@@ -0,0 +1,329 @@
+"""
+Servis benchmark'ı: src/services içindeki okuma ve yazma servislerini sentetik veriyle kurulan
+küçük / orta / büyük portföylerde çalıştırır. Her servis için çağrı başına duvar saati süresi
+(medyan, en kısa, en uzun), veritabanı gidiş-dönüş sayısı ve taranan satır sayısı ölçülür.
+Sonuçlar JSON olarak yazılır ve kayıtlı taban çizgisiyle karşılaştırılır; gerileme varsa
+çıkış kodu 1'dir (sürüm öncesi CI adımında kullanılabilsin).
+
+Yerel bir PostgreSQL'e karşı, proje kökünden (.env okunur):
+
+    python benchmarks/service_benchmark.py --olcek kucuk orta --json sonuc.json
+    python benchmarks/service_benchmark.py --olcek kucuk orta --taban-kaydet
+    python benchmarks/service_benchmark.py --olcek buyuk --servis get_daire_extresi kaydet_odeme
+
+Notlar:
+- Önbellekli okuma servisleri önbellek atlanarak (__wrapped__) ölçülür; sayılar veritabanı yolunu gösterir.
+- Gidiş-dönüşler havuz bağlantılarının cursor'ından sayılır (bkz. connection.py, sorgu_sayisi).
+- Taranan satırlar, ölçüm boyunca pg_stat_user_tables'taki seq_tup_read + idx_tup_fetch artışıdır.
+  İstatistiklerin tek bir sunucu sürecinden gelmesi için havuz tek bağlantıya indirilir ve her
+  çağrıdan sonra pg_stat_force_next_flush() ile boşaltılır (PostgreSQL 15+; eski sürümlerde boş kalır).
+- Yazma servisleri okumalardan sonra çalışır; her ölçek için portföy yeniden kurulur ve sonda silinir.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+VARSAYILAN_ONEK = "Benchmark Sitesi"
+# Taban çizgisiyle karşılaştırılabilmesi için veri hep aynı bitiş ayıyla üretilir
+BITIS_AYI = "2025-12"
+TABAN_DOSYASI = Path(__file__).with_name("service_baseline.json")
+
+# Gerileme eşikleri: süre ve taranan satır oransal + mutlak (küçük tablolarda plan değişimi ve
+# zamanlama gürültüsü için taban), gidiş-dönüş sayısı ise deterministik olduğu için her artış gerilemedir.
+SURE_TOLERANSI = 0.5
+SURE_ESIGI_MS = 5.0
+SATIR_TOLERANSI = 0.10
+SATIR_ESIGI = 1000
+
+# --------------------------------------------------------------------------------------------
+# Senaryolar
+# --------------------------------------------------------------------------------------------
+# Her senaryo (baglam, sira) -> sonuç çağrısıdır; sira her tekrarda farklı daire / dönem seçmek için
+# kullanılır. Başarı kontrolü, hatayı yutup varsayılan değer dönen servisler için ayrıca yapılır.
+
+def _gelecek_ay(sira):
+    """Yazma senaryoları her tekrarda mevcut verilerle çakışmayan yeni bir dönem kullanır."""
+    return (pd.Timestamp(BITIS_AYI) + pd.DateOffset(months=sira + 1)).date()
+
+def _yakit_listesi(baglam, sira):
+    daireler = baglam["daire_haritasi"]
+    return pd.DataFrame({
+        "Blok": daireler["Blok"],
+        "Daire No": daireler["Daire No"],
+        "Tutar": [f"{850 + (i % 7) * 50},00" for i in range(len(daireler))],
+        "Donem": _gelecek_ay(sira).strftime("%d.%m.%Y"),
+    })
+
+def _gecmis_borc_listesi(baglam, sira):
+    daireler = baglam["daire_haritasi"]
+    df = pd.DataFrame({"Blok": daireler["Blok"], "Daire No": daireler["Daire No"]})
+    df["Aidat"] = [f"{(i % 5) * 250}" for i in range(len(daireler))]
+    df["Yakıt"] = [f"{(i % 3) * 400},50" for i in range(len(daireler))]
+    # Toplu aidat / yakıt senaryolarının dönemleriyle çakışmasın diye çok ileri bir dönem
+    donem = _gelecek_ay(sira + 600)
+    esleme = [{"sutun": "Aidat", "tur": "DUES", "donem": donem}, {"sutun": "Yakıt", "tur": "FUEL", "donem": donem}]
+    return df, esleme
+
+def _hata_yok(sonuc):
+    return isinstance(sonuc, dict) and not sonuc.get("hata")
+
+def senaryolari_olustur():
+    """Senaryo adı -> (çağrı, başarı kontrolü, tür). Servisler burada içe aktarılır (havuz ayarları önce okunsun)."""
+    from src.services.debt_service import get_detayli_borc, get_daire_extresi, get_toplu_borc_haritasi
+    from src.services.payment_service import get_daire_odemeleri, kaydet_odeme
+    from src.services.overview_service import get_aylik_tahsilat_verisi, get_genel_istatistikler
+    from src.services.bulk_ops_service import add_bulk_dues, process_bulk_fuel_csv, process_past_debts_csv
+
+    def daire(baglam, sira):
+        return baglam["daireler"][sira % len(baglam["daireler"])]
+
+    return {
+        "get_detayli_borc": (lambda b, i: get_detayli_borc.__wrapped__(daire(b, i)), None, "okuma"),
+        "get_daire_extresi": (lambda b, i: get_daire_extresi.__wrapped__(daire(b, i)), None, "okuma"),
+        "get_daire_odemeleri": (lambda b, i: get_daire_odemeleri.__wrapped__(daire(b, i)), None, "okuma"),
+        "get_toplu_borc_haritasi": (lambda b, i: get_toplu_borc_haritasi.__wrapped__(b["site_id"]),
+                                    lambda s: len(s) > 0, "okuma"),
+        "get_aylik_tahsilat_verisi": (lambda b, i: get_aylik_tahsilat_verisi.__wrapped__(b["site_id"]), None, "okuma"),
+        "get_genel_istatistikler": (lambda b, i: get_genel_istatistikler.__wrapped__(b["site_id"]),
+                                    lambda s: s["toplam_alacak"] > 0, "okuma"),
+        "kaydet_odeme": (lambda b, i: kaydet_odeme(b["site_id"], daire(b, i), 1250, "Benchmark ödemesi"),
+                         lambda s: s is True, "yazma"),
+        "add_bulk_dues": (lambda b, i: add_bulk_dues(b["site_id"], 1500, _gelecek_ay(i)), _hata_yok, "yazma"),
+        "process_bulk_fuel_csv": (lambda b, i: process_bulk_fuel_csv(b["site_id"], _yakit_listesi(b, i)),
+                                  _hata_yok, "yazma"),
+        "process_past_debts_csv": (lambda b, i: process_past_debts_csv(b["site_id"], *_gecmis_borc_listesi(b, i)),
+                                   _hata_yok, "yazma"),
+    }
+
+# --------------------------------------------------------------------------------------------
+# Ölçüm
+# --------------------------------------------------------------------------------------------
+
+_SATIR_SAYACI_SORGUSU = """
+    SELECT COALESCE(SUM(seq_tup_read), 0) + COALESCE(SUM(idx_tup_fetch), 0), COALESCE(SUM(seq_scan), 0)
+    FROM pg_stat_user_tables
+"""
+
+class _IstatistikOkuyucu:
+    """pg_stat_user_tables sayaçlarını havuz dışı, autocommit bir bağlantıdan okur."""
+
+    def __init__(self):
+        from src.database.connection import db_cursor, havuz_disi_baglanti
+
+        self._db_cursor = db_cursor
+        self._conn = havuz_disi_baglanti()
+        self._conn.autocommit = True
+        with self._conn.cursor() as cur:
+            cur.execute("SELECT current_setting('server_version_num')::int >= 150000")
+            self.destekli = cur.fetchone()[0]
+
+    def bosalt(self):
+        """Havuzdaki (tek) bağlantının bekleyen istatistiklerini paylaşılan belleğe yazdırır."""
+        if self.destekli:
+            with self._db_cursor() as cur:
+                cur.execute("SELECT pg_stat_force_next_flush()")
+
+    def oku(self):
+        if not self.destekli:
+            return None
+        with self._conn.cursor() as cur:
+            cur.execute(_SATIR_SAYACI_SORGUSU)
+            taranan, sirali = cur.fetchone()
+        return int(taranan), int(sirali)
+
+    def kapat(self):
+        self._conn.close()
+
+def senaryoyu_olc(ad, cagri, kontrol, baglam, tekrar, okuyucu):
+    """
+    Senaryoyu bir ısınma turundan sonra tekrar kez çalıştırır.
+    Dönüş: {"medyan_ms", "min_ms", "max_ms", "gidis_donus", "taranan_satir", "sirali_tarama", "hata"}
+    (gidiş-dönüş ve satır sayıları çağrı başına ortalamadır).
+    """
+    from src.database.connection import get_pool_metrics
+
+    cagri(baglam, 0)
+    sureler, gidis_donus, taranan, sirali, hata = [], 0, 0, 0, None
+    for sira in range(1, tekrar + 1):
+        okuyucu.bosalt()
+        once_istatistik = okuyucu.oku()
+        once_sorgu = get_pool_metrics()["sorgu_sayisi"]
+        baslangic = time.perf_counter()
+        sonuc = cagri(baglam, sira)
+        sureler.append((time.perf_counter() - baslangic) * 1000)
+        gidis_donus += get_pool_metrics()["sorgu_sayisi"] - once_sorgu
+        okuyucu.bosalt()
+        sonra_istatistik = okuyucu.oku()
+        if once_istatistik is not None:
+            taranan += sonra_istatistik[0] - once_istatistik[0]
+            sirali += sonra_istatistik[1] - once_istatistik[1]
+        if kontrol is not None and not kontrol(sonuc) and hata is None:
+            hata = str(sonuc.get("hata") if isinstance(sonuc, dict) else sonuc)[:200]
+    return {
+        "medyan_ms": round(statistics.median(sureler), 3),
+        "min_ms": round(min(sureler), 3),
+        "max_ms": round(max(sureler), 3),
+        "gidis_donus": round(gidis_donus / tekrar, 2),
+        "taranan_satir": round(taranan / tekrar, 1) if okuyucu.destekli else None,
+        "sirali_tarama": round(sirali / tekrar, 2) if okuyucu.destekli else None,
+        "hata": hata,
+    }
+
+def olcegi_calistir(olcek, boyut, senaryolar, tekrar, tohum, onek, koru=False):
+    """Portföyü kurar, seçili senaryoları (önce okumalar) ölçer ve portföyü siler."""
+    from src.database.connection import db_cursor
+    from benchmarks.synthetic_data import portfoy_uret, portfoyu_sil, istatistikleri_guncelle
+
+    print(f"\n[{olcek}] portföy kuruluyor: {boyut} (tohum {tohum}, bitiş {BITIS_AYI})...", flush=True)
+    uretim = portfoy_uret(**boyut, tohum=tohum, bitis_ayi=BITIS_AYI, onek=onek)
+    site_id = uretim["site_idleri"][0]
+    try:
+        # Planlar (ve taranan satırlar) tüm tabloların istatistiklerine bağlıdır; önceki ölçeklerden
+        # kalan eski istatistikler sonuçları oynatmasın
+        istatistikleri_guncelle(genis_orneklem=True)
+        with db_cursor() as cur:
+            cur.execute("""
+                SELECT u.id, b.name, u.unit_number FROM unit u JOIN building b ON b.id = u.building_id
+                WHERE b.complex_id = %s ORDER BY u.id
+            """, (site_id,))
+            harita = pd.DataFrame(cur.fetchall(), columns=["unit_id", "Blok", "Daire No"])
+        daireler = random.Random(tohum).sample(list(harita["unit_id"]), min(len(harita), tekrar + 1))
+        baglam = {"site_id": site_id, "daireler": daireler, "daire_haritasi": harita}
+
+        okuyucu = _IstatistikOkuyucu()
+        sonuclar = {}
+        try:
+            sirali = sorted(senaryolar.items(), key=lambda s: s[1][2] != "okuma")
+            for ad, (cagri, kontrol, _) in sirali:
+                sonuclar[ad] = senaryoyu_olc(ad, cagri, kontrol, baglam, tekrar, okuyucu)
+                s = sonuclar[ad]
+                print(f"  {ad:<28}{s['medyan_ms']:>10.2f} ms{s['gidis_donus']:>8} gd"
+                      f"{s['taranan_satir'] if s['taranan_satir'] is not None else '-':>12} satır"
+                      f"{'  HATA: ' + s['hata'] if s['hata'] else ''}", flush=True)
+        finally:
+            okuyucu.kapat()
+        return {"boyut": boyut, "satirlar": uretim["satirlar"], "senaryolar": sonuclar}
+    finally:
+        if not koru:
+            portfoyu_sil(onek)
+
+# --------------------------------------------------------------------------------------------
+# Taban çizgisi karşılaştırması
+# --------------------------------------------------------------------------------------------
+
+def karsilastir(sonuc, taban):
+    """
+    Sonucu taban çizgisiyle karşılaştırır; yalnızca iki tarafta da bulunan ölçek / senaryolar kıyaslanır.
+    Dönüş: [{"olcek", "senaryo", "olcu", "taban", "simdi", "degisim"}] (yalnızca gerilemeler)
+    """
+    gerilemeler = []
+    for olcek, veri in sonuc["olcekler"].items():
+        taban_olcek = taban.get("olcekler", {}).get(olcek)
+        if not taban_olcek:
+            continue
+        for ad, simdi in veri["senaryolar"].items():
+            eski = taban_olcek["senaryolar"].get(ad)
+            if not eski:
+                continue
+            kontroller = (
+                ("medyan_ms", simdi["medyan_ms"] > eski["medyan_ms"] * (1 + SURE_TOLERANSI)
+                 and simdi["medyan_ms"] - eski["medyan_ms"] > SURE_ESIGI_MS),
+                ("gidis_donus", simdi["gidis_donus"] > eski["gidis_donus"]),
+                ("taranan_satir", simdi["taranan_satir"] is not None and eski["taranan_satir"] is not None
+                 and simdi["taranan_satir"] > eski["taranan_satir"] * (1 + SATIR_TOLERANSI)
+                 and simdi["taranan_satir"] - eski["taranan_satir"] > SATIR_ESIGI),
+            )
+            for olcu, geriledi in kontroller:
+                if geriledi:
+                    degisim = (simdi[olcu] - eski[olcu]) / eski[olcu] if eski[olcu] else None
+                    gerilemeler.append({"olcek": olcek, "senaryo": ad, "olcu": olcu, "taban": eski[olcu],
+                                        "simdi": simdi[olcu], "degisim": degisim})
+    return gerilemeler
+
+def gerilemeleri_yazdir(gerilemeler):
+    if not gerilemeler:
+        print("\nTaban çizgisine göre gerileme yok.")
+        return
+    print(f"\n{len(gerilemeler)} gerileme:")
+    for g in gerilemeler:
+        degisim = f"{g['degisim']:+.0%}" if g["degisim"] is not None else "yeni"
+        print(f"  [{g['olcek']}] {g['senaryo']:<28}{g['olcu']:<15}{g['taban']!s:>12} -> {g['simdi']!s:<12}{degisim}")
+
+def _ortam():
+    from src.database.connection import db_cursor
+
+    with db_cursor() as cur:
+        cur.execute("SHOW server_version")
+        surum = cur.fetchone()[0]
+    return {"tarih": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+            "postgresql": surum, "makine": platform.machine(), "bitis_ayi": BITIS_AYI}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servis benchmark'ı (yerel PostgreSQL, sentetik veri).")
+    parser.add_argument("--olcek", nargs="+", default=["kucuk", "orta"], choices=("kucuk", "orta", "buyuk"))
+    parser.add_argument("--servis", nargs="+", help="Yalnızca bu senaryoları çalıştır")
+    parser.add_argument("--tekrar", type=int, default=10, help="Senaryo başına ölçülen çağrı sayısı")
+    parser.add_argument("--tohum", type=int, default=42)
+    parser.add_argument("--onek", default=VARSAYILAN_ONEK, help="Benchmark sitesi adı öneki")
+    parser.add_argument("--json", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--taban", default=str(TABAN_DOSYASI), help="Karşılaştırılacak taban çizgisi")
+    parser.add_argument("--taban-kaydet", action="store_true", help="Sonucu yeni taban çizgisi olarak kaydet")
+    parser.add_argument("--koru", action="store_true", help="Benchmark sitelerini sonda silme")
+    args = parser.parse_args(argv)
+
+    # Taranan satır istatistikleri tek sunucu sürecinden okunabilsin diye havuz tek bağlantıdır
+    # (havuz ayarları connection.py içe aktarılırken okunur)
+    os.environ["DB_POOL_MIN"] = os.environ["DB_POOL_MAX"] = "1"
+    from benchmarks.synthetic_data import OLCEKLER, streamlit_uyarilarini_kapat
+
+    streamlit_uyarilarini_kapat()
+    senaryolar = senaryolari_olustur()
+    if args.servis:
+        bilinmeyen = set(args.servis) - set(senaryolar)
+        if bilinmeyen:
+            parser.error(f"Bilinmeyen senaryo: {', '.join(sorted(bilinmeyen))} (geçerli: {', '.join(senaryolar)})")
+        senaryolar = {ad: s for ad, s in senaryolar.items() if ad in args.servis}
+
+    sonuc = {"ortam": _ortam(), "tekrar": args.tekrar, "tohum": args.tohum, "olcekler": {}}
+    for olcek in args.olcek:
+        sonuc["olcekler"][olcek] = olcegi_calistir(olcek, OLCEKLER[olcek], senaryolar, args.tekrar,
+                                                   args.tohum, args.onek, args.koru)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(sonuc, ensure_ascii=False, indent=2), encoding="utf-8")
+    hatali = [ad for veri in sonuc["olcekler"].values() for ad, s in veri["senaryolar"].items() if s["hata"]]
+
+    taban_yolu = Path(args.taban)
+    if args.taban_kaydet:
+        # Mevcut tabandaki diğer ölçekler korunur; yalnızca çalıştırılan ölçekler güncellenir
+        taban = json.loads(taban_yolu.read_text(encoding="utf-8")) if taban_yolu.exists() else {"olcekler": {}}
+        taban["ortam"] = sonuc["ortam"]
+        taban["tekrar"], taban["tohum"] = sonuc["tekrar"], sonuc["tohum"]
+        taban["olcekler"].update(sonuc["olcekler"])
+        taban_yolu.write_text(json.dumps(taban, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"\nTaban çizgisi kaydedildi: {taban_yolu}")
+        return 1 if hatali else 0
+
+    if not taban_yolu.exists():
+        print(f"\nTaban çizgisi bulunamadı ({taban_yolu}); karşılaştırma yapılmadı.")
+        return 1 if hatali else 0
+    taban = json.loads(taban_yolu.read_text(encoding="utf-8"))
+    if taban.get("tohum") != args.tohum or taban.get("ortam", {}).get("bitis_ayi") != BITIS_AYI:
+        print("\nUyarı: taban çizgisi farklı bir tohum / bitiş ayıyla üretilmiş; satır sayıları kıyaslanamayabilir.")
+    gerilemeler = karsilastir(sonuc, taban)
+    gerilemeleri_yazdir(gerilemeler)
+    return 1 if gerilemeler or hatali else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
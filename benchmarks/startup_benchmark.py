@@ -0,0 +1,144 @@
+"""
+Açılış benchmark'ı: uygulamanın soğuk başlangıçta ne kadar beklettiğini ölçer. Her ölçüm yeni bir
+Python sürecinde yapılır (modül önbelleği boşken):
+
+- ithalat: streamlit'in ve main.py'nin üst düzey import'larının süresi; bu import'lardan sonra
+  yüklenmiş ağır modüller (pandas, SQLAlchemy, ...) listelenir. Görünümler menüden seçilince
+  yüklendiği için burada hiçbiri olmamalıdır; varsa çıkış kodu 1'dir.
+- ilk çizim: main.py'nin Streamlit AppTest ile giriş ekranını (site seçimi) ilk kez çizme süresi,
+  ardından giriş sonrası ana panel (varsayılan sayfa) ve her sayfanın menüden ilk seçilişi.
+
+Yerel bir PostgreSQL'e karşı, proje kökünden (.env okunur):
+
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --tekrar 10 --json acilis.json
+"""
+import os
+import ast
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+PROJE_KOKU = Path(__file__).resolve().parents[1]
+ANA_BETIK = PROJE_KOKU / "main.py"
+AGIR_MODULLER = ("pandas", "numpy", "sqlalchemy", "pyarrow", "altair", "openpyxl")
+
+_ITHALAT_BETIGI = """
+import sys, json, time
+baslangic = time.perf_counter()
+import streamlit
+streamlit_bitti = time.perf_counter()
+{ithalatlar}
+bitis = time.perf_counter()
+print(json.dumps({{
+    "streamlit_ms": (streamlit_bitti - baslangic) * 1000,
+    "uygulama_ms": (bitis - streamlit_bitti) * 1000,
+    "agir_moduller": [m for m in {agir!r} if m in sys.modules],
+}}))
+"""
+
+_CIZIM_BETIGI = """
+import sys, json, time, logging
+logging.disable(logging.WARNING)
+from streamlit.testing.v1 import AppTest
+
+def olc(uygulama):
+    baslangic = time.perf_counter()
+    uygulama.run()
+    if uygulama.exception:
+        raise SystemExit(f"Çizim hatası: {{uygulama.exception[0].value}}")
+    return (time.perf_counter() - baslangic) * 1000
+
+sonuc = {{}}
+uygulama = AppTest.from_file({betik!r}, default_timeout=120)
+sonuc["giris_ekrani_ms"] = olc(uygulama)
+sonuc["giris_modulleri"] = [m for m in {agir!r} if m in sys.modules]
+
+# Site seçimi, ardından (şifre adımı atlanarak) ana panel ve varsayılan sayfa
+uygulama.button[0].click()
+olc(uygulama)
+uygulama.session_state["password_correct"] = True
+sonuc["ana_panel_ms"] = olc(uygulama)
+
+sayfalar = {{}}
+menu = uygulama.sidebar.radio[0]
+for sayfa in menu.options[1:]:
+    uygulama.sidebar.radio[0].set_value(sayfa)
+    sayfalar[sayfa] = olc(uygulama)
+sonuc["sayfalar_ms"] = sayfalar
+print(json.dumps(sonuc, ensure_ascii=False))
+"""
+
+def uygulama_ithalatlari():
+    """main.py'nin üst düzey import / from ... import satırları (çalıştırılabilir kaynak olarak)."""
+    agac = ast.parse(ANA_BETIK.read_text(encoding="utf-8"))
+    dugumler = [d for d in agac.body if isinstance(d, (ast.Import, ast.ImportFrom))]
+    return ast.unparse(ast.Module(body=dugumler, type_ignores=[]))
+
+def _cocuk_surec(kaynak):
+    """Kaynağı yeni bir Python sürecinde çalıştırıp son satırındaki JSON'u döner."""
+    ortam = dict(os.environ, PYTHONPATH=str(PROJE_KOKU))
+    sonuc = subprocess.run([sys.executable, "-c", kaynak], cwd=PROJE_KOKU, env=ortam,
+                           capture_output=True, text=True)
+    if sonuc.returncode != 0:
+        raise RuntimeError((sonuc.stderr or sonuc.stdout).strip().splitlines()[-1])
+    return json.loads(sonuc.stdout.strip().splitlines()[-1])
+
+def _ozet(degerler):
+    return {"medyan_ms": round(statistics.median(degerler), 1),
+            "min_ms": round(min(degerler), 1), "max_ms": round(max(degerler), 1)}
+
+def ithalati_olc(tekrar):
+    kaynak = _ITHALAT_BETIGI.format(ithalatlar=uygulama_ithalatlari(), agir=AGIR_MODULLER)
+    olcumler = [_cocuk_surec(kaynak) for _ in range(tekrar)]
+    return {
+        "streamlit": _ozet([o["streamlit_ms"] for o in olcumler]),
+        "uygulama": _ozet([o["uygulama_ms"] for o in olcumler]),
+        "agir_moduller": olcumler[-1]["agir_moduller"],
+    }
+
+def cizimi_olc(tekrar):
+    kaynak = _CIZIM_BETIGI.format(betik=str(ANA_BETIK), agir=AGIR_MODULLER)
+    olcumler = [_cocuk_surec(kaynak) for _ in range(tekrar)]
+    return {
+        "giris_ekrani": _ozet([o["giris_ekrani_ms"] for o in olcumler]),
+        "giris_modulleri": olcumler[-1]["giris_modulleri"],
+        "ana_panel": _ozet([o["ana_panel_ms"] for o in olcumler]),
+        "sayfalar": {sayfa: _ozet([o["sayfalar_ms"][sayfa] for o in olcumler])
+                     for sayfa in olcumler[0]["sayfalar_ms"]},
+    }
+
+def raporu_yazdir(sonuc):
+    ithalat, cizim = sonuc["ithalat"], sonuc["ilk_cizim"]
+    print(f"\n=== Açılış ({sonuc['tekrar']} soğuk süreç, medyan [en kısa - en uzun]) ===")
+    satirlar = [("import streamlit", ithalat["streamlit"]),
+                ("main.py import'ları", ithalat["uygulama"]),
+                ("Giriş ekranı (ilk çizim)", cizim["giris_ekrani"]),
+                ("Ana panel (varsayılan sayfa)", cizim["ana_panel"])]
+    satirlar += [(f"  ilk kez: {sayfa}", ozet) for sayfa, ozet in cizim["sayfalar"].items()]
+    for ad, ozet in satirlar:
+        print(f"{ad:<36} {ozet['medyan_ms']:>9.1f} ms  [{ozet['min_ms']:.1f} - {ozet['max_ms']:.1f}]")
+    print(f"\nmain.py import'larından sonra yüklü ağır modüller: {', '.join(ithalat['agir_moduller']) or '-'}")
+    print(f"Giriş ekranı çizildikten sonra yüklü ağır modüller: {', '.join(cizim['giris_modulleri']) or '-'}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uygulama açılış süresi benchmark'ı (yerel PostgreSQL).")
+    parser.add_argument("--tekrar", type=int, default=5, help="Ölçüm başına soğuk süreç sayısı")
+    parser.add_argument("--json", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args(argv)
+
+    sonuc = {"tekrar": args.tekrar, "ithalat": ithalati_olc(args.tekrar), "ilk_cizim": cizimi_olc(args.tekrar)}
+    raporu_yazdir(sonuc)
+    if args.json:
+        Path(args.json).write_text(json.dumps(sonuc, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if sonuc["ithalat"]["agir_moduller"]:
+        print("\nHATA: main.py açılışta ağır modülleri yüklüyor; görünüm / servis import'ları ertelenmeli.")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
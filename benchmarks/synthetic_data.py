@@ -0,0 +1,440 @@
+"""
+Ölçek testleri için sentetik veri üreticisi. M site x B blok x U daireden oluşan bir portföyü,
+N yıllık aylık aidat / yakıt / diğer borçları, gerçekçi ödeme davranışı (düzenli, geç, kısmi
+ödeyenler ve borçlular) ve FIFO dağıtımlarıyla, giderler ve personelle birlikte COPY ile yükler.
+Aynı tohum ve bitiş ayı ile her çalıştırma birebir aynı veriyi üretir.
+
+Komut satırından, proje kökünde (.env okunur):
+
+    python benchmarks/synthetic_data.py --olcek orta
+    python benchmarks/synthetic_data.py --site 100 --blok 20 --daire 50 --yil 6 --bitis 2025-12
+    python benchmarks/synthetic_data.py --sil
+
+Kütüphane olarak:
+
+    from benchmarks.synthetic_data import portfoy_uret, OLCEKLER
+    site_idleri = portfoy_uret(**OLCEKLER["kucuk"], tohum=7)
+
+Notlar:
+- Yükleme tetikleyiciler kapalıyken (session_replication_role = replica, yalnızca bu oturum)
+  yapılır; FIFO dağıtımı, paid_amount ve ödemelerin kasa (INCOME) kayıtları üretici tarafından
+  hesaplanır. Bakiye ve aylık özet tabloları her site için sonda yeniden oluşturulur.
+  Bu yüzden veritabanı kullanıcısının süper kullanıcı olması gerekir (yerel test veritabanı).
+- Ödemeler, ödeme anında henüz oluşmamış borçlara dağıtılmaz; dairenin o anki borcunu aşan
+  kısım tetikleyicideki gibi dağıtılmadan kalır.
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.database.connection import db_connection, db_cursor, havuz_disi_baglanti
+from src.database.bulk_load import copy_dataframe
+
+VARSAYILAN_ONEK = "Sentetik Site"
+# Son borç dönemi; benchmark taban çizgileri (service_baseline.json, plan_baseline.json) bu ayla kaydedildi.
+# Bugüne göre hesaplanmaz, böylece aynı tohum her tarihte aynı veriyi üretir.
+VARSAYILAN_BITIS_AYI = "2025-12"
+
+# Hazır ölçekler: site x blok x daire, yıl. "buyuk" ~100 bin daire / ~10 milyon borç satırıdır.
+OLCEKLER = {
+    "kucuk": {"site_sayisi": 1, "blok_sayisi": 4, "daire_sayisi": 20, "yil_sayisi": 1},
+    "orta": {"site_sayisi": 5, "blok_sayisi": 10, "daire_sayisi": 40, "yil_sayisi": 3},
+    "buyuk": {"site_sayisi": 100, "blok_sayisi": 20, "daire_sayisi": 50, "yil_sayisi": 6},
+}
+
+DAIRE_TIPLERI = (("1+1", 750), ("2+1", 1000), ("3+1", 1250))
+DAIRE_TIPI_OLASILIKLARI = (0.3, 0.5, 0.2)
+MUAF_ORANI = 0.01
+# Aidatlar her yıl bu oranda artar (10 TL'ye yuvarlanır)
+YILLIK_ARTIS = 0.20
+# Yakıt borcu yansıtılan aylar (Kasım - Mart)
+YAKIT_AYLARI = (11, 12, 1, 2, 3)
+DIGER_BORC_OLASILIGI = 0.03
+DIGER_BORC_TUTARLARI = (150, 250, 500, 1000)
+
+# Ödeme davranışı profilleri: (ad, olasılık, aylık ödeme olasılığı)
+PROFILLER = (("duzenli", 0.60, 0.97), ("gec", 0.20, 0.90), ("kismi", 0.12, 0.90), ("borclu", 0.08, 0.30))
+
+PERSONEL_ROLLERI = (("Kapıcı", 28000), ("Temizlik Görevlisi", 25000), ("Güvenlik", 30000),
+                    ("Bahçıvan", 24000), ("Teknik Sorumlu", 35000))
+ISIMLER = ("Ayşe", "Mehmet", "Fatma", "Ali", "Zeynep", "Mustafa", "Elif", "Ahmet", "Emine", "Hüseyin",
+           "Hatice", "İbrahim", "Merve", "Hasan", "Esra", "Osman", "Selin", "Murat", "Derya", "Emre")
+SOYISIMLER = ("Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Aydın", "Öztürk", "Arslan", "Doğan",
+              "Kılıç", "Aslan", "Çetin", "Kara", "Koç", "Kurt", "Özdemir", "Şimşek", "Polat", "Erdoğan")
+
+BORC_TURLERI = np.array(["DUES", "FUEL", "OTHER"])
+# Daire başına kümülatif tutarları tek dizide tutmak için daireler arası boşluk (TL)
+_DAIRE_ARALIGI = 10 ** 9
+
+def streamlit_uyarilarini_kapat():
+    """Servisler Streamlit dışında çağrıldığında basılan 'ScriptRunContext' uyarılarını susturur."""
+    from streamlit import config
+    from streamlit.logger import set_log_level
+    # Yapılandırma ilk okunduğunda log seviyesi yeniden ayarlanır; önce okutup sonra kısıyoruz
+    config.get_option("logger.level")
+    set_log_level("error")
+
+def _id_blogu(cur, tablo, adet):
+    """tablo'nun id dizisinden art arda adet kadar id ayırır; ilk id'yi döner."""
+    if adet == 0:
+        return 0
+    cur.execute("SELECT pg_get_serial_sequence(%s, 'id')", (tablo,))
+    dizi = cur.fetchone()[0]
+    cur.execute("SELECT setval(%s, nextval(%s) + %s - 1)", (dizi, dizi, adet))
+    return cur.fetchone()[0] - adet + 1
+
+def _blok_adi(no):
+    return f"{chr(ord('A') + no)} Blok" if no < 26 else f"Blok {no + 1}"
+
+def _grup_ici_kumulatif(grup, tutar):
+    """grup'a göre sıralı dizide, her grubun kendi içindeki kümülatif toplamı."""
+    kumulatif = np.cumsum(tutar)
+    onceki = np.concatenate(([0], kumulatif))[np.searchsorted(grup, grup, side="left")]
+    return kumulatif - onceki
+
+def fifo_dagit(borc_daire, borc_tutar, odeme_daire, odeme_tutar):
+    """
+    Borçlar ve ödemeler daireye, sonra tarihe göre sıralı verilir (tam sayı TL).
+    Her dairenin ödemeleri en eski borçtan başlayarak kapatılır (trg_auto_distribute_payment ile aynı).
+    Kümülatif borç ve ödeme sınırlarının birleşimindeki her aralık tek bir (borç, ödeme) çiftine
+    düşer; böylece dağıtım döngüsüz hesaplanır.
+    Dönüş: (borç_indeksi, ödeme_indeksi, tutar) dizileri
+    """
+    daire_sayisi = int(max(borc_daire.max(initial=-1), odeme_daire.max(initial=-1))) + 1
+    borc_bitis = borc_daire * _DAIRE_ARALIGI + _grup_ici_kumulatif(borc_daire, borc_tutar)
+    odeme_bitis = odeme_daire * _DAIRE_ARALIGI + _grup_ici_kumulatif(odeme_daire, odeme_tutar)
+    ust_sinir = np.minimum(np.bincount(borc_daire, borc_tutar, minlength=daire_sayisi),
+                           np.bincount(odeme_daire, odeme_tutar, minlength=daire_sayisi)).astype(np.int64)
+
+    sinirlar = np.unique(np.concatenate((borc_bitis, odeme_bitis,
+                                         np.arange(daire_sayisi, dtype=np.int64) * _DAIRE_ARALIGI)))
+    bas, son = sinirlar[:-1], sinirlar[1:]
+    daire = bas // _DAIRE_ARALIGI
+    gecerli = son <= daire * _DAIRE_ARALIGI + ust_sinir[daire]
+    bas, son = bas[gecerli], son[gecerli]
+    return (np.searchsorted(borc_bitis, bas, side="right"),
+            np.searchsorted(odeme_bitis, bas, side="right"),
+            son - bas)
+
+def _dagitilabilir_tutar(borc_daire, borc_ay, borc_tutar, odeme_daire, odeme_tutar, odeme_ay, daire_adedi, ay_sayisi):
+    """
+    Her ödemenin borçlara dağıtılabilecek kısmı. Tetikleyici ödemeyi yalnızca o an var olan borçlara
+    dağıtır; fazlası dağıtılmadan kalır. Daire başına kümülatif dağıtılan S için:
+    S_j = max(S_(j-1), min(S_(j-1) + ödeme_j, ödeme ayına kadar oluşan borç)).
+    Döngü ödeme sayısı yerine dairedeki ödeme sırası üzerindendir (en fazla birkaç yüz adım).
+    """
+    borc_anahtar = borc_daire * ay_sayisi + borc_ay
+    borc_kumulatif = _grup_ici_kumulatif(borc_daire, borc_tutar)
+    sinir = np.searchsorted(borc_anahtar, odeme_daire * ay_sayisi + np.minimum(odeme_ay, ay_sayisi - 1), side="right")
+    onceki = np.maximum(sinir - 1, 0)
+    olusan_borc = np.where((sinir > 0) & (borc_daire[onceki] == odeme_daire), borc_kumulatif[onceki], 0)
+
+    sira = np.arange(len(odeme_daire)) - np.searchsorted(odeme_daire, odeme_daire, side="left")
+    dagitilan = np.zeros(len(odeme_daire), dtype=np.int64)
+    toplam = np.zeros(daire_adedi, dtype=np.int64)
+    for r in range(int(sira.max(initial=-1)) + 1):
+        secili = np.flatnonzero(sira == r)
+        daire = odeme_daire[secili]
+        yeni = np.maximum(toplam[daire], np.minimum(toplam[daire] + odeme_tutar[secili], olusan_borc[secili]))
+        dagitilan[secili] = yeni - toplam[daire]
+        toplam[daire] = yeni
+    return dagitilan
+
+def _site_verisi(rng, blok_sayisi, daire_sayisi, aylar, kesim):
+    """
+    Bir sitenin tüm satırlarını üretir (id'ler hariç, daire / blok indeksleriyle).
+    aylar: ayın ilk günleri (datetime64[M]); kesim: bu andan sonraki ödeme / gider üretilmez.
+    """
+    ay_sayisi = len(aylar)
+    daire_adedi = blok_sayisi * daire_sayisi
+    fiyat_carpani = rng.uniform(0.8, 1.5)
+    tip_aidatlari = np.array([round(a * fiyat_carpani / 50) * 50 for _, a in DAIRE_TIPLERI])
+
+    daireler = pd.DataFrame({
+        "blok": np.repeat(np.arange(blok_sayisi), daire_sayisi),
+        "unit_number": np.tile(np.arange(1, daire_sayisi + 1), blok_sayisi).astype(str),
+        "tip": rng.choice(len(DAIRE_TIPLERI), size=daire_adedi, p=DAIRE_TIPI_OLASILIKLARI),
+        "owner_name": np.char.add(np.char.add(rng.choice(ISIMLER, daire_adedi), " "),
+                                  rng.choice(SOYISIMLER, daire_adedi)),
+        "is_exempt": rng.random(daire_adedi) < MUAF_ORANI,
+        "profil": rng.choice(len(PROFILLER), size=daire_adedi, p=[p[1] for p in PROFILLER]),
+    })
+
+    # --- Borçlar: daire x ay ızgarası ---
+    d_idx = np.repeat(np.arange(daire_adedi), ay_sayisi)
+    a_idx = np.tile(np.arange(ay_sayisi), daire_adedi)
+    odeyen = ~daireler["is_exempt"].to_numpy()[d_idx]
+    yil_carpani = (1 + YILLIK_ARTIS) ** (a_idx // 12)
+    aidat = np.round(tip_aidatlari[daireler["tip"].to_numpy()[d_idx]] * yil_carpani / 10) * 10
+
+    ay_no = (aylar.astype("datetime64[M]").astype(int) % 12 + 1)[a_idx]
+    yakit_payi = rng.uniform(0.6, 1.2, daire_adedi)[d_idx]
+    yakit = np.where(np.isin(ay_no, YAKIT_AYLARI), np.round(aidat * yakit_payi / 10) * 10, 0)
+    diger = np.where(rng.random(len(d_idx)) < DIGER_BORC_OLASILIGI,
+                     rng.choice(DIGER_BORC_TUTARLARI, len(d_idx)), 0)
+
+    borc_daire = np.concatenate([d_idx] * 3)
+    borc_ay = np.concatenate([a_idx] * 3)
+    borc_tur = np.repeat(np.arange(3), len(d_idx))
+    borc_tutar = np.concatenate((aidat, yakit, diger)).astype(np.int64)
+    secili = np.concatenate([odeyen] * 3) & (borc_tutar > 0)
+    borc_daire, borc_ay, borc_tur, borc_tutar = (x[secili] for x in (borc_daire, borc_ay, borc_tur, borc_tutar))
+    # FIFO sırası: daire, dönem, tür (id'ler bu sırayla verilir; tetikleyici de period_month, id sırası izler)
+    sira = np.lexsort((borc_tur, borc_ay, borc_daire))
+    borc_daire, borc_ay, borc_tur, borc_tutar = (x[sira] for x in (borc_daire, borc_ay, borc_tur, borc_tutar))
+
+    # --- Ödemeler: her daire-ay için profile göre ---
+    aylik_borc = np.bincount(borc_daire * ay_sayisi + borc_ay, borc_tutar, minlength=daire_adedi * ay_sayisi)
+    profil = daireler["profil"].to_numpy()[d_idx]
+    odeme_olasiligi = np.array([p[2] for p in PROFILLER])[profil]
+    oder = (rng.random(len(d_idx)) < odeme_olasiligi) & (aylik_borc > 0)
+    carpan = np.select(
+        [profil == 2, profil == 3],
+        [rng.uniform(0.5, 0.9, len(d_idx)), rng.choice((1, 2, 3), len(d_idx))],
+        1.0)
+    gecikme = np.select(
+        [profil == 1, profil == 2, profil == 3],
+        [rng.integers(1, 4, len(d_idx)), rng.integers(0, 2, len(d_idx)), rng.integers(0, 6, len(d_idx))],
+        0)
+    gun = rng.integers(1, 28, len(d_idx))
+    dakika = rng.integers(9 * 60, 18 * 60, len(d_idx))
+    odeme_tutar = (np.round(aylik_borc * carpan / 10) * 10).astype(np.int64)
+    odeme_tarihi = ((aylar[a_idx] + gecikme).astype("datetime64[D]") + (gun - 1)).astype("datetime64[m]") + dakika
+    secili = oder & (odeme_tutar > 0) & (odeme_tarihi < kesim)
+    odeme_daire, odeme_ay, odeme_tutar, odeme_tarihi = (
+        x[secili] for x in (d_idx, a_idx, odeme_tutar, odeme_tarihi))
+    sira = np.lexsort((odeme_tarihi, odeme_daire))
+    odeme_daire, odeme_tutar, odeme_tarihi = (x[sira] for x in (odeme_daire, odeme_tutar, odeme_tarihi))
+
+    dagitilan = _dagitilabilir_tutar(borc_daire, borc_ay, borc_tutar, odeme_daire, odeme_tutar,
+                                     (odeme_tarihi.astype("datetime64[M]") - aylar[0]).astype(int), daire_adedi, ay_sayisi)
+    borc_d, odeme_d, tutar = fifo_dagit(borc_daire, borc_tutar, odeme_daire, dagitilan)
+
+    borclar = pd.DataFrame({
+        "daire": borc_daire,
+        "type": BORC_TURLERI[borc_tur],
+        "period_month": aylar[borc_ay].astype("datetime64[D]"),
+        "expected_amount": borc_tutar,
+        "paid_amount": np.bincount(borc_d, tutar, minlength=len(borc_daire)).astype(np.int64),
+    })
+    borclar["status"] = np.where(borclar["paid_amount"] == 0, "UNPAID",
+                                 np.where(borclar["paid_amount"] >= borclar["expected_amount"], "PAID", "PARTIAL"))
+    odemeler = pd.DataFrame({
+        "daire": odeme_daire,
+        "amount": odeme_tutar,
+        "process_date": odeme_tarihi.astype("datetime64[s]"),
+        "description": "Aidat ödemesi",
+    })
+    dagitimlar = pd.DataFrame({"borc": borc_d, "odeme": odeme_d, "covered_amount": tutar})
+
+    # --- Personel ve giderler ---
+    personel_adedi = int(np.clip(1 + blok_sayisi // 3, 2, len(PERSONEL_ROLLERI) * 2))
+    roller = rng.choice(len(PERSONEL_ROLLERI), personel_adedi)
+    personel = pd.DataFrame({
+        "name": [f"{rng.choice(ISIMLER)} {rng.choice(SOYISIMLER)}" for _ in range(personel_adedi)],
+        "role": [PERSONEL_ROLLERI[r][0] for r in roller],
+        "salary": [PERSONEL_ROLLERI[r][1] for r in roller],
+    })
+    giderler = []
+    for a, ay in enumerate(aylar):
+        gun0 = ay.astype("datetime64[D]")
+        yil = (1 + YILLIK_ARTIS) ** (a // 12)
+        kalemler = [("Personel Maaş", round(p.salary * yil), f"{p.name} - maaş ödemesi", 1) for p in personel.itertuples()]
+        kalemler += [
+            ("Elektrik Faturası", round(daire_adedi * rng.uniform(40, 70) * yil), "Ortak alan elektriği", 12),
+            ("Su Faturası", round(daire_adedi * rng.uniform(15, 30) * yil), "Ortak alan suyu", 15),
+            ("Asansör Bakımı", round(blok_sayisi * 1500 * yil), "Aylık asansör bakımı", 20),
+            ("Temizlik Malzemesi", round(rng.uniform(2000, 6000) * yil), "Temizlik malzemesi alımı", 8),
+        ]
+        for kategori, tutar, aciklama, gun_no in kalemler:
+            tarih = (gun0 + (gun_no - 1)).astype("datetime64[m]") + 10 * 60
+            if tarih < kesim:
+                giderler.append((kategori, tutar, tarih, aciklama))
+    giderler = pd.DataFrame(giderler, columns=["category", "amount", "process_date", "description"])
+
+    return {"tip_aidatlari": tip_aidatlari, "daireler": daireler, "borclar": borclar, "odemeler": odemeler,
+            "dagitimlar": dagitimlar, "personel": personel, "giderler": giderler}
+
+def _yukle(cur, site_adi, blok_sayisi, veri):
+    """Üretilen site verisini id blokları ayırarak COPY ile yükler. Dönüş: (site_id, tablo -> satır sayısı)"""
+    cur.execute("INSERT INTO complex_properties (name, total_units) VALUES (%s, %s) RETURNING id",
+                (site_adi, len(veri["daireler"])))
+    site_id = cur.fetchone()[0]
+
+    tip_ilk = _id_blogu(cur, "unit_type", len(DAIRE_TIPLERI))
+    tipler = pd.DataFrame({"id": np.arange(len(DAIRE_TIPLERI)) + tip_ilk, "complex_id": site_id,
+                           "name": [t[0] for t in DAIRE_TIPLERI], "default_dues": veri["tip_aidatlari"]})
+    copy_dataframe(cur, tipler, "unit_type", ["id", "complex_id", "name", "default_dues"])
+
+    blok_ilk = _id_blogu(cur, "building", blok_sayisi)
+    bloklar = pd.DataFrame({"id": np.arange(blok_sayisi) + blok_ilk, "complex_id": site_id,
+                            "name": [_blok_adi(b) for b in range(blok_sayisi)]})
+    copy_dataframe(cur, bloklar, "building", ["id", "complex_id", "name"])
+
+    daireler = veri["daireler"]
+    daire_ilk = _id_blogu(cur, "unit", len(daireler))
+    daireler = daireler.assign(id=np.arange(len(daireler)) + daire_ilk, building_id=daireler["blok"] + blok_ilk,
+                               unit_type_id=daireler["tip"] + tip_ilk)
+    copy_dataframe(cur, daireler, "unit", ["id", "building_id", "unit_type_id", "unit_number", "owner_name", "is_exempt"])
+
+    borclar = veri["borclar"]
+    borc_ilk = _id_blogu(cur, "debt_item", len(borclar))
+    borclar = borclar.assign(id=np.arange(len(borclar)) + borc_ilk, unit_id=borclar["daire"] + daire_ilk)
+    copy_dataframe(cur, borclar, "debt_item",
+                   ["id", "unit_id", "type", "period_month", "expected_amount", "paid_amount", "status"])
+
+    odemeler = veri["odemeler"]
+    odeme_ilk = _id_blogu(cur, "payment", len(odemeler))
+    odemeler = odemeler.assign(id=np.arange(len(odemeler)) + odeme_ilk, complex_id=site_id,
+                               unit_id=odemeler["daire"] + daire_ilk, created_at=odemeler["process_date"])
+    copy_dataframe(cur, odemeler, "payment",
+                   ["id", "complex_id", "unit_id", "amount", "process_date", "created_at", "description"])
+
+    dagitimlar = veri["dagitimlar"].assign(payment_id=lambda d: d["odeme"] + odeme_ilk,
+                                           debt_item_id=lambda d: d["borc"] + borc_ilk)
+    copy_dataframe(cur, dagitimlar, "payment_debt", ["payment_id", "debt_item_id", "covered_amount"])
+
+    personel = veri["personel"].assign(complex_id=site_id)
+    copy_dataframe(cur, personel, "employee", ["complex_id", "name", "role", "salary"])
+
+    # Kasa: her ödemenin gelir kaydı (fn_create_payment_transaction ile aynı biçim) ve giderler
+    hareketler = pd.concat([
+        odemeler.assign(type="INCOME", category="PAYMENT_RECEIVED",
+                        description="Daireden gelen ödeme: " + odemeler["description"]),
+        veri["giderler"].assign(type="EXPENSE", unit_id=None),
+    ], ignore_index=True).assign(complex_id=site_id)
+    hareketler["unit_id"] = hareketler["unit_id"].astype("Int64")
+    copy_dataframe(cur, hareketler, "account_transaction",
+                   ["complex_id", "type", "category", "unit_id", "amount", "process_date", "description"])
+
+    return site_id, {"unit": len(daireler), "debt_item": len(borclar), "payment": len(odemeler),
+                     "payment_debt": len(dagitimlar), "employee": len(personel),
+                     "account_transaction": len(hareketler)}
+
+def portfoyu_sil(onek=VARSAYILAN_ONEK):
+    """Adı 'onek ' ile başlayan sentetik siteleri tüm kayıtlarıyla siler. Silinen site sayısını döner."""
+    with db_connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT array_agg(id) FROM complex_properties WHERE name LIKE %s", (onek + " %",))
+        siteler = cur.fetchone()[0] or []
+        if not siteler:
+            return 0
+        # Tetikleyiciler ve yabancı anahtar denetimleri kapalı: satırlar bağımlılık sırasıyla silinir,
+        # özet tablolar da doğrudan temizlenir
+        cur.execute("SET LOCAL session_replication_role = replica")
+        cur.execute("CREATE TEMP TABLE tmp_silinecek_daire ON COMMIT DROP AS "
+                    "SELECT u.id FROM unit u JOIN building b ON b.id = u.building_id WHERE b.complex_id = ANY(%s)",
+                    (siteler,))
+        for sorgu in (
+            "DELETE FROM payment_debt pd USING payment p WHERE pd.payment_id = p.id AND p.complex_id = ANY(%(s)s)",
+            "DELETE FROM payment WHERE complex_id = ANY(%(s)s)",
+            "DELETE FROM account_transaction WHERE complex_id = ANY(%(s)s)",
+            "DELETE FROM employee WHERE complex_id = ANY(%(s)s)",
+            "DELETE FROM debt_item WHERE unit_id IN (SELECT id FROM tmp_silinecek_daire)",
+            "DELETE FROM unit_balance WHERE unit_id IN (SELECT id FROM tmp_silinecek_daire)",
+            "DELETE FROM unit WHERE id IN (SELECT id FROM tmp_silinecek_daire)",
+            "DELETE FROM building WHERE complex_id = ANY(%(s)s)",
+            "DELETE FROM unit_type WHERE complex_id = ANY(%(s)s)",
+            "DELETE FROM monthly_site_summary WHERE complex_id = ANY(%(s)s)",
+            "DELETE FROM background_job WHERE complex_id = ANY(%(s)s)",
+            "DELETE FROM complex_properties WHERE id = ANY(%(s)s)",
+        ):
+            cur.execute(sorgu, {"s": siteler})
+
+    # Boşalan sayfalar geri kazanılsın: sonraki yükleme tabloları büyütmesin, tekrarlanan
+    # benchmark / plan ölçümleri (sıralı tarama maliyetleri) çalıştırmadan çalıştırmaya kaymasın.
+    # VACUUM işlem içinde çalışmadığı için havuz dışı, autocommit bir bağlantı kullanılır.
+    conn = havuz_disi_baglanti()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("VACUUM payment_debt, payment, account_transaction, debt_item, unit_balance, unit")
+    finally:
+        conn.close()
+    return len(siteler)
+
+def istatistikleri_guncelle(tablolar=None, genis_orneklem=False):
+    """
+    Verilen tabloları (None ise veritabanının tamamını) ANALYZE eder. genis_orneklem=True ise örneklem
+    test ölçeklerindeki tabloların tamamını kapsar; istatistikler, dolayısıyla planlar her çalıştırmada
+    aynı çıkar (benchmark ve plan karşılaştırmaları için).
+    """
+    with db_cursor() as cur:
+        if genis_orneklem:
+            cur.execute("SET LOCAL default_statistics_target = 1000")
+        if tablolar is None:
+            cur.execute("ANALYZE")
+        for tablo in tablolar or ():
+            cur.execute(f"ANALYZE {tablo}")
+
+def portfoy_uret(site_sayisi, blok_sayisi, daire_sayisi, yil_sayisi, tohum=42, bitis_ayi=VARSAYILAN_BITIS_AYI,
+                 onek=VARSAYILAN_ONEK, ilerleme=None):
+    """
+    site_sayisi x blok_sayisi x daire_sayisi daireli portföyü yil_sayisi yıllık geçmişiyle üretip yükler.
+    Aynı önekli mevcut sentetik siteler önce silinir. Her site ayrı bir işlemde yüklenir.
+    bitis_ayi: son borç dönemi (date / 'YYYY-MM'; varsayılan VARSAYILAN_BITIS_AYI). Ödeme ve giderler bu ayın
+    sonuna kadar üretilir, böylece aynı tohum ve bitiş ayı her zaman aynı veriyi verir.
+    ilerleme(oran, mesaj): isteğe bağlı ilerleme bildirimi.
+    Dönüş: {"site_idleri": [...], "satirlar": {tablo: toplam}, "sure_sn": float}
+    """
+    bitis = np.datetime64(str(bitis_ayi)[:7], "M")
+    aylar = np.arange(bitis - 12 * yil_sayisi + 1, bitis + 1)
+    kesim = (bitis + 1).astype("datetime64[m]")
+
+    baslangic = time.perf_counter()
+    portfoyu_sil(onek)
+    site_idleri, satirlar = [], {}
+    for site_no in range(1, site_sayisi + 1):
+        # Her site kendi tohumundan üretilir: site sayısı değişse de ilk siteler aynı kalır
+        rng = np.random.default_rng([tohum, site_no])
+        veri = _site_verisi(rng, blok_sayisi, daire_sayisi, aylar, kesim)
+        with db_connection() as conn, conn.cursor() as cur:
+            cur.execute("SET LOCAL session_replication_role = replica")
+            site_id, sayilar = _yukle(cur, f"{onek} {site_no:03d}", blok_sayisi, veri)
+            cur.execute("SET LOCAL session_replication_role = origin")
+            cur.execute("SELECT fn_rebuild_balances(%s)", (site_id,))
+            cur.execute("SELECT fn_rebuild_monthly_site_summary(%s)", (site_id,))
+        site_idleri.append(site_id)
+        for tablo, adet in sayilar.items():
+            satirlar[tablo] = satirlar.get(tablo, 0) + adet
+        if ilerleme:
+            ilerleme(site_no / site_sayisi, f"{site_no}/{site_sayisi} site yüklendi")
+
+    # Toplu yüklemeden sonra planlayıcı istatistikleri güncellensin
+    istatistikleri_guncelle(("unit", "debt_item", "payment", "payment_debt", "account_transaction"))
+    return {"site_idleri": site_idleri, "satirlar": satirlar, "sure_sn": time.perf_counter() - baslangic}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ölçek testleri için deterministik sentetik veri üreticisi.")
+    parser.add_argument("--olcek", choices=sorted(OLCEKLER), help="Hazır ölçek (diğer boyut seçeneklerini ezer)")
+    parser.add_argument("--site", type=int, default=1, help="Site sayısı")
+    parser.add_argument("--blok", type=int, default=4, help="Site başına blok sayısı")
+    parser.add_argument("--daire", type=int, default=20, help="Blok başına daire sayısı")
+    parser.add_argument("--yil", type=int, default=1, help="Kaç yıllık geçmiş üretileceği")
+    parser.add_argument("--tohum", type=int, default=42)
+    parser.add_argument("--bitis", default=VARSAYILAN_BITIS_AYI,
+                        help=f"Son borç dönemi, YYYY-MM (varsayılan: {VARSAYILAN_BITIS_AYI})")
+    parser.add_argument("--onek", default=VARSAYILAN_ONEK, help="Site adı öneki")
+    parser.add_argument("--sil", action="store_true", help="Yalnızca bu önekli siteleri sil")
+    args = parser.parse_args(argv)
+
+    streamlit_uyarilarini_kapat()
+    if args.sil:
+        print(f"{portfoyu_sil(args.onek)} site silindi.")
+        return 0
+    boyut = OLCEKLER[args.olcek] if args.olcek else {
+        "site_sayisi": args.site, "blok_sayisi": args.blok, "daire_sayisi": args.daire, "yil_sayisi": args.yil}
+    sonuc = portfoy_uret(**boyut, tohum=args.tohum, bitis_ayi=args.bitis, onek=args.onek,
+                         ilerleme=lambda oran, mesaj: print(f"[{oran:6.1%}] {mesaj}", flush=True))
+    print(f"{len(sonuc['site_idleri'])} site, {sonuc['sure_sn']:.1f} sn:")
+    for tablo, adet in sonuc["satirlar"].items():
+        print(f"  {tablo:<20}{adet:>12,}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+/*
+   FILE NAME / DOSYA ADI : create_balance_rollups.sql
+   PROJECT / PROJE      : Sellable Site Management Accounting Interface
+                          Satılabilir Site Yönetimi Muhasebe Arayüzü
+
+   PURPOSE / AMAÇ:
+   EN: Keeps the outstanding balance of every unit, broken down by debt type
+       (DUES / FUEL / OTHER). Building and complex totals are views that sum the
+       unit rows of that building / complex, so screens never sum debt_item.
+
+   TR: Her dairenin açık bakiyesini borç türüne göre (Aidat / Yakıt / Diğer) ayrı
+       ayrı tutar. Blok ve site toplamları, o blok / sitenin daire satırlarını
+       toplayan görünümlerdir; ekranlar debt_item'ı hiç toplamaz.
+
+   WHEN IT RUNS? / NE ZAMAN ÇALIŞIR?
+   EN: After every INSERT / UPDATE / DELETE statement on debt_item, inside the same
+       transaction. Payment allocation updates debt_item.paid_amount, so payments
+       are reflected through the same trigger.
+   TR: debt_item üzerindeki her INSERT / UPDATE / DELETE cümlesinden sonra, aynı işlem
+       (transaction) içinde. Ödeme dağıtımı debt_item.paid_amount'u güncellediği için
+       ödemeler de aynı tetikleyiciyle yansır.
+
+   NOTES / NOTLAR:
+   - EN: Open balance = SUM(remaining_amount) of debts whose status is not PAID.
+         For an existing database (or to repair drift) run: SELECT fn_rebuild_balances();
+         Only unit rows are written: a shared building / complex row would make
+         every payment of the site wait for the same row lock. The cost is that
+         building / complex totals are summed from the unit rows on every read
+         instead of being fetched by primary key.
+   - TR: Açık bakiye = durumu PAID olmayan borçların SUM(remaining_amount) değeridir.
+         Mevcut bir veritabanında (veya sapma onarımı için): SELECT fn_rebuild_balances();
+         Yalnızca daire satırları yazılır: ortak bir blok / site satırı, sitedeki her
+         ödemeyi aynı satır kilidini beklemeye zorlardı. Bedeli, blok / site
+         toplamlarının birincil anahtarla okunmak yerine her okumada daire
+         satırlarından toplanmasıdır.
+*/
+
+-----------------------------------------------------------
+-- 1) BALANCE TABLE AND VIEWS / BAKİYE TABLOSU VE GÖRÜNÜMLERİ
+-----------------------------------------------------------
+/*
+    TABLE / TABLO : unit_balance
+
+    PURPOSE / AMAÇ:
+    One row per unit that has ever had a debt.
+    Borcu olmuş her daire için bir satır.
+*/
+CREATE TABLE IF NOT EXISTS unit_balance (
+    unit_id INTEGER PRIMARY KEY REFERENCES unit(id)
+        ON DELETE CASCADE,                        -- Unit / Daire
+    dues NUMERIC(14,2) NOT NULL DEFAULT 0,        -- Open dues / Açık aidat
+    fuel NUMERIC(14,2) NOT NULL DEFAULT 0,        -- Open fuel / Açık yakıt
+    other NUMERIC(14,2) NOT NULL DEFAULT 0,       -- Open other / Açık diğer
+    total NUMERIC(14,2)
+        GENERATED ALWAYS AS (dues + fuel + other) STORED -- Total / Toplam
+);
+
+/*
+    VIEWS / GÖRÜNÜMLER : building_balance, complex_balance
+
+    PURPOSE / AMAÇ:
+    Open balance per building / complex, summed from unit_balance when read
+    (index lookups: building -> unit -> unit_balance).
+    Blok / site bazında açık bakiye, okunurken unit_balance üzerinden toplanır
+    (indeksli erişim: blok -> daire -> unit_balance).
+*/
+CREATE OR REPLACE VIEW building_balance AS
+SELECT u.building_id,
+       SUM(ub.dues) AS dues, SUM(ub.fuel) AS fuel, SUM(ub.other) AS other, SUM(ub.total) AS total
+FROM unit_balance ub
+JOIN unit u ON u.id = ub.unit_id
+GROUP BY u.building_id;
+
+CREATE OR REPLACE VIEW complex_balance AS
+SELECT b.complex_id,
+       SUM(ub.dues) AS dues, SUM(ub.fuel) AS fuel, SUM(ub.other) AS other, SUM(ub.total) AS total
+FROM unit_balance ub
+JOIN unit u ON u.id = ub.unit_id
+JOIN building b ON b.id = u.building_id
+GROUP BY b.complex_id;
+
+-----------------------------------------------------------
+-- 2) SHARED UPSERT / ORTAK EKLEME-GÜNCELLEME
+-----------------------------------------------------------
+/*
+   EN: Applies signed per-unit deltas to unit_balance in one statement. p_rows is
+       a JSON array of {unit_id, type, amount} objects. Rows are upserted in
+       unit_id order so concurrent statements take row locks in the same order.
+   TR: Daire bazlı işaretli farkları tek cümlede unit_balance'a yazar. p_rows,
+       {unit_id, type, amount} nesnelerinden oluşan bir JSON dizisidir. Satırlar
+       unit_id sırasıyla yazılır; eşzamanlı cümleler satır kilitlerini aynı sırayla alır.
+*/
+CREATE OR REPLACE FUNCTION fn_balance_apply(p_rows JSONB)
+RETURNS VOID AS $$
+    INSERT INTO unit_balance AS x (unit_id, dues, fuel, other)
+    SELECT r.unit_id,
+           COALESCE(SUM(r.amount) FILTER (WHERE r.type = 'DUES'), 0),
+           COALESCE(SUM(r.amount) FILTER (WHERE r.type = 'FUEL'), 0),
+           COALESCE(SUM(r.amount) FILTER (WHERE r.type = 'OTHER'), 0)
+    FROM jsonb_to_recordset(p_rows) AS r(unit_id INTEGER, type TEXT, amount NUMERIC)
+    GROUP BY r.unit_id
+    ORDER BY r.unit_id
+    ON CONFLICT (unit_id) DO UPDATE
+    SET dues = x.dues + EXCLUDED.dues, fuel = x.fuel + EXCLUDED.fuel, other = x.other + EXCLUDED.other;
+$$ LANGUAGE sql;
+
+-----------------------------------------------------------
+-- 3) TRIGGER FUNCTION / TETİKLEYİCİ FONKSİYON
+-----------------------------------------------------------
+/*
+   EN: A debt contributes its remaining_amount while it is not PAID. New rows add
+       their contribution, old rows subtract it; UPDATE rows whose contribution,
+       unit and type did not change are skipped.
+   TR: Bir borç, PAID olmadığı sürece remaining_amount kadar bakiyeye katkı yapar.
+       Yeni satırlar katkısını ekler, eski satırlar düşer; katkısı, dairesi ve türü
+       değişmeyen UPDATE satırları atlanır.
+*/
+CREATE OR REPLACE FUNCTION fn_balance_debt_item()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM fn_balance_apply(COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('unit_id', unit_id, 'type', type, 'amount', remaining_amount))
+            FROM new_rows
+            WHERE status <> 'PAID'), '[]'));
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM fn_balance_apply(COALESCE((
+            SELECT jsonb_agg(x.satir)
+            FROM old_rows o
+            JOIN new_rows n ON n.id = o.id
+            CROSS JOIN LATERAL (VALUES
+                (jsonb_build_object('unit_id', o.unit_id, 'type', o.type,
+                    'amount', -CASE WHEN o.status <> 'PAID' THEN o.remaining_amount ELSE 0 END)),
+                (jsonb_build_object('unit_id', n.unit_id, 'type', n.type,
+                    'amount', CASE WHEN n.status <> 'PAID' THEN n.remaining_amount ELSE 0 END))
+            ) AS x(satir)
+            WHERE (o.unit_id, o.type, CASE WHEN o.status <> 'PAID' THEN o.remaining_amount ELSE 0 END)
+                  IS DISTINCT FROM
+                  (n.unit_id, n.type, CASE WHEN n.status <> 'PAID' THEN n.remaining_amount ELSE 0 END)), '[]'));
+    ELSE
+        PERFORM fn_balance_apply(COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('unit_id', unit_id, 'type', type, 'amount', -remaining_amount))
+            FROM old_rows
+            WHERE status <> 'PAID'), '[]'));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-----------------------------------------------------------
+-- 4) TRIGGERS / TETİKLEYİCİLER
+-----------------------------------------------------------
+/*
+   EN: Transition tables are only allowed on single-event triggers.
+   TR: Geçiş tablolarına yalnızca tek olaylı tetikleyicilerde izin verilir.
+*/
+DROP TRIGGER IF EXISTS trg_balance_debt_item_ins ON debt_item;
+DROP TRIGGER IF EXISTS trg_balance_debt_item_upd ON debt_item;
+DROP TRIGGER IF EXISTS trg_balance_debt_item_del ON debt_item;
+
+CREATE TRIGGER trg_balance_debt_item_ins
+AFTER INSERT ON debt_item
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_balance_debt_item();
+
+CREATE TRIGGER trg_balance_debt_item_upd
+AFTER UPDATE ON debt_item
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_balance_debt_item();
+
+CREATE TRIGGER trg_balance_debt_item_del
+AFTER DELETE ON debt_item
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_balance_debt_item();
+
+-----------------------------------------------------------
+-- 5) REBUILD / YENİDEN OLUŞTURMA
+-----------------------------------------------------------
+/*
+   EN: Recomputes unit_balance from debt_item (all sites, or one site).
+       Needed after backfilling an existing database and to repair drift.
+   TR: unit_balance'ı debt_item üzerinden yeniden hesaplar (tüm siteler veya tek site).
+       Mevcut veritabanı ilk kez doldurulurken ve sapma onarımında gerekir.
+*/
+CREATE OR REPLACE FUNCTION fn_rebuild_balances(p_complex_id INTEGER DEFAULT NULL)
+RETURNS VOID AS $$
+    DELETE FROM unit_balance
+    WHERE p_complex_id IS NULL
+       OR unit_id IN (SELECT u.id FROM unit u JOIN building b ON b.id = u.building_id
+                      WHERE b.complex_id = p_complex_id);
+
+    INSERT INTO unit_balance (unit_id, dues, fuel, other)
+    SELECT d.unit_id,
+           COALESCE(SUM(d.remaining_amount) FILTER (WHERE d.type = 'DUES'), 0),
+           COALESCE(SUM(d.remaining_amount) FILTER (WHERE d.type = 'FUEL'), 0),
+           COALESCE(SUM(d.remaining_amount) FILTER (WHERE d.type = 'OTHER'), 0)
+    FROM debt_item d
+    JOIN unit u ON u.id = d.unit_id
+    JOIN building b ON b.id = u.building_id
+    WHERE d.status <> 'PAID'
+      AND (p_complex_id IS NULL OR b.complex_id = p_complex_id)
+    GROUP BY d.unit_id;
+$$ LANGUAGE sql;
@@ -0,0 +1,203 @@
+/*
+   FILE NAME / DOSYA ADI : create_cache_notify_triggers.sql
+   PROJECT / PROJE      : Sellable Site Management Accounting Interface
+                          Satılabilir Site Yönetimi Muhasebe Arayüzü
+
+   PURPOSE / AMAÇ:
+   EN: Publishes a NOTIFY event on the 'onbellek_olaylari' channel whenever
+       payment, debt_item or account_transaction rows change. Every app process
+       listens on this channel and evicts the cached balances / statistics of the
+       site (and unit) named in the event, so a payment taken by one cashier is
+       visible to the others immediately.
+
+   TR: payment, debt_item veya account_transaction satırları değiştiğinde
+       'onbellek_olaylari' kanalına NOTIFY olayı gönderir. Her uygulama süreci bu
+       kanalı dinler ve olayda adı geçen sitenin (ve dairenin) önbellekteki
+       bakiye / istatistik girişlerini siler; böylece bir kasiyerin aldığı ödeme
+       diğerlerine anında yansır.
+
+   PAYLOAD / İÇERİK:
+   EN: {"tablo": "<table>", "site_id": <int>, "unit_id": <int|null>}
+       unit_id is null for site-wide events (account_transaction, or statements
+       touching more than 50 units of a site).
+   TR: {"tablo": "<tablo>", "site_id": <int>, "unit_id": <int|null>}
+       Site geneli olaylarda (account_transaction ya da bir sitenin 50'den fazla
+       dairesine dokunan cümleler) unit_id null'dır.
+
+   NOTES / NOTLAR:
+   - EN: Notifications are delivered at commit; rolled back writes send nothing and
+         identical events in one transaction are merged by PostgreSQL.
+         Run after create_payment_transaction_trigger.sql.
+   - TR: Bildirimler commit anında iletilir; geri alınan yazmalar olay göndermez,
+         aynı işlemdeki özdeş olaylar PostgreSQL tarafından birleştirilir.
+         create_payment_transaction_trigger.sql'den sonra çalıştırılır.
+*/
+
+-----------------------------------------------------------
+-- 1) SHARED SENDER / ORTAK GÖNDERİCİ
+-----------------------------------------------------------
+/*
+   EN: p_scope is a JSON array of {site_id, unit_id} objects. Each distinct scope is
+       sent once; a site with more than p_unit_limit distinct units gets a single
+       site-wide event instead (bulk imports would otherwise flood the channel).
+   TR: p_scope, {site_id, unit_id} nesnelerinden oluşan bir JSON dizisidir. Her farklı
+       kapsam bir kez gönderilir; p_unit_limit'ten fazla farklı dairesi olan site için
+       tek bir site geneli olay gönderilir (toplu yüklemeler kanalı boğmasın diye).
+*/
+CREATE OR REPLACE FUNCTION fn_cache_notify(p_table TEXT, p_scope JSONB, p_unit_limit INTEGER DEFAULT 50)
+RETURNS VOID AS $$
+BEGIN
+    PERFORM pg_notify('onbellek_olaylari',
+                      json_build_object('tablo', p_table, 'site_id', site_id, 'unit_id', unit_id)::text)
+    FROM (
+        SELECT DISTINCT site_id,
+               CASE WHEN COUNT(*) OVER (PARTITION BY site_id) > p_unit_limit THEN NULL ELSE unit_id END AS unit_id
+        FROM (
+            SELECT DISTINCT site_id, unit_id
+            FROM jsonb_to_recordset(p_scope) AS r(site_id INTEGER, unit_id INTEGER)
+            WHERE site_id IS NOT NULL
+        ) kapsam
+    ) olay;
+END;
+$$ LANGUAGE plpgsql;
+
+-----------------------------------------------------------
+-- 2) TRIGGER FUNCTIONS / TETİKLEYİCİ FONKSİYONLAR
+-----------------------------------------------------------
+/*
+   EN: Both old and new rows are reported, so moving a row between units or sites
+       evicts both sides. Transition tables are named new_rows / old_rows.
+   TR: Hem eski hem yeni satırlar bildirilir; bir satır daireler veya siteler arasında
+       taşındığında iki taraf da silinir. Geçiş tabloları new_rows / old_rows adını taşır.
+*/
+CREATE OR REPLACE FUNCTION fn_cache_notify_payment()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM fn_cache_notify('payment', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('site_id', complex_id, 'unit_id', unit_id))
+            FROM new_rows), '[]'));
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM fn_cache_notify('payment', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('site_id', complex_id, 'unit_id', unit_id))
+            FROM old_rows), '[]'));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_cache_notify_debt_item()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- debt_item'da complex_id olmadığı için site, daire -> blok üzerinden bulunur
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM fn_cache_notify('debt_item', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('site_id', b.complex_id, 'unit_id', n.unit_id))
+            FROM new_rows n
+            JOIN unit u ON u.id = n.unit_id
+            JOIN building b ON b.id = u.building_id), '[]'));
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM fn_cache_notify('debt_item', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('site_id', b.complex_id, 'unit_id', o.unit_id))
+            FROM old_rows o
+            JOIN unit u ON u.id = o.unit_id
+            JOIN building b ON b.id = u.building_id), '[]'));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_cache_notify_account_transaction()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Gelir/gider kayıtları daireye bağlı değildir; olaylar site genelidir
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM fn_cache_notify('account_transaction', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('site_id', complex_id))
+            FROM new_rows), '[]'));
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM fn_cache_notify('account_transaction', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('site_id', complex_id))
+            FROM old_rows), '[]'));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-----------------------------------------------------------
+-- 3) TRIGGERS / TETİKLEYİCİLER
+-----------------------------------------------------------
+/*
+   EN: One statement-level trigger per table and event (transition tables do not
+       allow multi-event triggers), so a bulk statement sends its events once.
+   TR: Tablo ve olay başına bir cümle seviyesi tetikleyici (geçiş tabloları çok olaylı
+       tetikleyicilere izin vermez); toplu bir cümle olaylarını bir kez gönderir.
+*/
+DROP TRIGGER IF EXISTS trg_cache_notify_payment_ins ON payment;
+DROP TRIGGER IF EXISTS trg_cache_notify_payment_upd ON payment;
+DROP TRIGGER IF EXISTS trg_cache_notify_payment_del ON payment;
+
+CREATE TRIGGER trg_cache_notify_payment_ins
+AFTER INSERT ON payment
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_cache_notify_payment();
+
+CREATE TRIGGER trg_cache_notify_payment_upd
+AFTER UPDATE ON payment
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_cache_notify_payment();
+
+CREATE TRIGGER trg_cache_notify_payment_del
+AFTER DELETE ON payment
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_cache_notify_payment();
+
+DROP TRIGGER IF EXISTS trg_cache_notify_debt_item_ins ON debt_item;
+DROP TRIGGER IF EXISTS trg_cache_notify_debt_item_upd ON debt_item;
+DROP TRIGGER IF EXISTS trg_cache_notify_debt_item_del ON debt_item;
+
+CREATE TRIGGER trg_cache_notify_debt_item_ins
+AFTER INSERT ON debt_item
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_cache_notify_debt_item();
+
+CREATE TRIGGER trg_cache_notify_debt_item_upd
+AFTER UPDATE ON debt_item
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_cache_notify_debt_item();
+
+CREATE TRIGGER trg_cache_notify_debt_item_del
+AFTER DELETE ON debt_item
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_cache_notify_debt_item();
+
+DROP TRIGGER IF EXISTS trg_cache_notify_account_transaction_ins ON account_transaction;
+DROP TRIGGER IF EXISTS trg_cache_notify_account_transaction_upd ON account_transaction;
+DROP TRIGGER IF EXISTS trg_cache_notify_account_transaction_del ON account_transaction;
+
+CREATE TRIGGER trg_cache_notify_account_transaction_ins
+AFTER INSERT ON account_transaction
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_cache_notify_account_transaction();
+
+CREATE TRIGGER trg_cache_notify_account_transaction_upd
+AFTER UPDATE ON account_transaction
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_cache_notify_account_transaction();
+
+CREATE TRIGGER trg_cache_notify_account_transaction_del
+AFTER DELETE ON account_transaction
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_cache_notify_account_transaction();
@@ -0,0 +1,312 @@
+/*
+   FILE NAME / DOSYA ADI : create_monthly_summary_rollup.sql
+   PROJECT / PROJE      : Sellable Site Management Accounting Interface
+                          Satılabilir Site Yönetimi Muhasebe Arayüzü
+
+   PURPOSE / AMAÇ:
+   EN: Keeps a per-site, per-calendar-month summary of collections (payment),
+       expenses (account_transaction EXPENSE) and newly billed debt (debt_item).
+       The overview trend chart reads a few dozen rows from this table instead of
+       grouping the whole payment history on every render.
+
+   TR: Site ve takvim ayı bazında tahsilat (payment), gider (account_transaction
+       EXPENSE) ve yeni borç (debt_item) toplamlarını tutar. Genel bakış trend
+       grafiği her açılışta tüm ödeme geçmişini gruplamak yerine bu tablodan
+       birkaç düzine satır okur.
+
+   WHEN IT RUNS? / NE ZAMAN ÇALIŞIR?
+   EN: After every INSERT / UPDATE / DELETE statement on the three source tables.
+       Statement-level triggers with transition tables are used so that bulk
+       loads (COPY, INSERT ... SELECT) update each month once per statement.
+   TR: Üç kaynak tablodaki her INSERT / UPDATE / DELETE cümlesinden sonra.
+       Geçiş tablolu (transition table) cümle seviyesi tetikleyiciler kullanılır;
+       toplu yüklemelerde (COPY, INSERT ... SELECT) her ay cümle başına bir kez güncellenir.
+
+   NOTES / NOTLAR:
+   - EN: Run after revised_create_tables.sql. For an existing database, fill the
+         table once with: SELECT fn_rebuild_monthly_site_summary();
+         Each site-month is spread over up to 16 counter rows; readers SUM them
+         (see section 1).
+   - TR: revised_create_tables.sql'den sonra çalıştırılır. Mevcut bir veritabanında
+         tablo bir kez şu komutla doldurulur: SELECT fn_rebuild_monthly_site_summary();
+         Her site-ay birden çok sayaç satırına dağıtılır; okuyanlar bunları toplar
+         (bkz. bölüm 1).
+*/
+
+-----------------------------------------------------------
+-- 1) ROLLUP TABLE / ÖZET TABLO
+-----------------------------------------------------------
+/*
+    TABLE / TABLO : monthly_site_summary
+
+    PURPOSE / AMAÇ:
+    Up to 16 counter rows (slot 0-15) per site and calendar month
+    (period_month = first day of the month). A site-month total is the SUM over
+    its slots: SELECT ... SUM(collected) ... GROUP BY complex_id, period_month.
+    Site ve takvim ayı başına en fazla 16 sayaç satırı (slot 0-15; period_month =
+    ayın ilk günü). Site-ay toplamı, slotlarının toplamıdır (GROUP BY complex_id,
+    period_month).
+
+    NOTE / NOT:
+    Collections and expenses are bucketed by process_date, new debt by the
+    debt's own period_month. Each database session writes to its own slot, so
+    payments of the same site in different sessions do not wait for one row lock.
+    Tahsilat ve gider process_date'e, yeni borç ise borcun kendi dönemine göre yazılır.
+    Her veritabanı oturumu kendi slotuna yazar; aynı sitenin farklı oturumlardaki
+    ödemeleri tek bir satır kilidini beklemez.
+*/
+CREATE TABLE IF NOT EXISTS monthly_site_summary (
+    complex_id INTEGER REFERENCES complex_properties(id)
+        ON DELETE CASCADE NOT NULL,               -- Site reference / Site referansı
+    period_month DATE NOT NULL,                   -- Calendar month / Takvim ayı
+    collected NUMERIC(14,2) NOT NULL DEFAULT 0,   -- Collections / Tahsilat
+    expense NUMERIC(14,2) NOT NULL DEFAULT 0,     -- Expenses / Gider
+    new_debt NUMERIC(14,2) NOT NULL DEFAULT 0,    -- Billed debt / Yeni borç
+    slot SMALLINT NOT NULL DEFAULT 0,             -- Counter row / Sayaç satırı
+    PRIMARY KEY (complex_id, period_month, slot)
+);
+
+-----------------------------------------------------------
+-- 2) SHARED UPSERT / ORTAK EKLEME-GÜNCELLEME
+-----------------------------------------------------------
+/*
+   EN: Adds signed deltas to the calling session's slot rows (backend pid mod 16).
+       p_rows is a JSON array of {complex_id, period_month, collected, expense,
+       new_debt} objects.
+   TR: İşaretli farkları çağıran oturumun slot satırlarına ekler (backend pid mod 16).
+       p_rows, {complex_id, period_month, collected, expense, new_debt} nesnelerinden
+       oluşan bir JSON dizisidir.
+*/
+CREATE OR REPLACE FUNCTION fn_monthly_site_summary_apply(p_rows JSONB)
+RETURNS VOID AS $$
+    INSERT INTO monthly_site_summary AS m (complex_id, period_month, slot, collected, expense, new_debt)
+    SELECT complex_id, period_month, pg_backend_pid() % 16,
+           SUM(COALESCE(collected, 0)), SUM(COALESCE(expense, 0)), SUM(COALESCE(new_debt, 0))
+    FROM jsonb_to_recordset(p_rows)
+         AS r(complex_id INTEGER, period_month DATE, collected NUMERIC, expense NUMERIC, new_debt NUMERIC)
+    WHERE complex_id IS NOT NULL
+    GROUP BY complex_id, period_month
+    -- Aynı cümlede aynı ay birden çok kez geçebilir; GROUP BY ile tek satıra indiriliyor
+    ON CONFLICT (complex_id, period_month, slot) DO UPDATE
+    SET collected = m.collected + EXCLUDED.collected,
+        expense   = m.expense   + EXCLUDED.expense,
+        new_debt  = m.new_debt  + EXCLUDED.new_debt;
+$$ LANGUAGE sql;
+
+-----------------------------------------------------------
+-- 3) TRIGGER FUNCTIONS / TETİKLEYİCİ FONKSİYONLAR
+-----------------------------------------------------------
+/*
+   EN: New rows add, old rows subtract; an UPDATE therefore moves amounts between
+       months or sites correctly. Transition tables are named new_rows / old_rows.
+   TR: Yeni satırlar ekler, eski satırlar düşer; böylece UPDATE tutarı aylar veya
+       siteler arasında doğru taşır. Geçiş tabloları new_rows / old_rows adını taşır.
+*/
+CREATE OR REPLACE FUNCTION fn_monthly_summary_payment()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM fn_monthly_site_summary_apply(COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                       'complex_id', complex_id,
+                       'period_month', date_trunc('month', process_date)::date,
+                       'collected', amount))
+            FROM new_rows), '[]'));
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM fn_monthly_site_summary_apply(COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                       'complex_id', complex_id,
+                       'period_month', date_trunc('month', process_date)::date,
+                       'collected', -amount))
+            FROM old_rows), '[]'));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_monthly_summary_expense()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM fn_monthly_site_summary_apply(COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                       'complex_id', complex_id,
+                       'period_month', date_trunc('month', process_date)::date,
+                       'expense', amount))
+            FROM new_rows
+            WHERE type = 'EXPENSE'), '[]'));
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM fn_monthly_site_summary_apply(COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                       'complex_id', complex_id,
+                       'period_month', date_trunc('month', process_date)::date,
+                       'expense', -amount))
+            FROM old_rows
+            WHERE type = 'EXPENSE'), '[]'));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_monthly_summary_debt()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- debt_item'da complex_id olmadığı için site, daire -> blok üzerinden bulunur
+    IF TG_OP = 'INSERT' THEN
+        PERFORM fn_monthly_site_summary_apply(COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                       'complex_id', b.complex_id,
+                       'period_month', date_trunc('month', n.period_month)::date,
+                       'new_debt', n.expected_amount))
+            FROM new_rows n
+            JOIN unit u ON u.id = n.unit_id
+            JOIN building b ON b.id = u.building_id), '[]'));
+    ELSIF TG_OP = 'UPDATE' THEN
+        /*
+          EN: Payment allocation updates paid_amount/status on every payment; only rows
+              whose amount, period or unit changed are applied, so those updates do
+              not touch (or lock) the summary.
+          TR: Ödeme dağıtımı her ödemede paid_amount/status günceller; yalnızca tutarı,
+              dönemi veya dairesi değişen satırlar işlenir, böylece özet tablo kilitlenmez.
+        */
+        PERFORM fn_monthly_site_summary_apply(COALESCE((
+            SELECT jsonb_agg(fark.satir)
+            FROM old_rows o
+            JOIN new_rows n ON n.id = o.id
+            CROSS JOIN LATERAL (
+                SELECT jsonb_build_object(
+                           'complex_id', b.complex_id,
+                           'period_month', date_trunc('month', x.period_month)::date,
+                           'new_debt', x.isaret * x.expected_amount) AS satir
+                FROM (VALUES (o.unit_id, o.period_month, o.expected_amount, -1),
+                             (n.unit_id, n.period_month, n.expected_amount, 1))
+                     AS x(unit_id, period_month, expected_amount, isaret)
+                JOIN unit u ON u.id = x.unit_id
+                JOIN building b ON b.id = u.building_id
+            ) fark
+            WHERE (o.unit_id, o.period_month, o.expected_amount)
+                  IS DISTINCT FROM (n.unit_id, n.period_month, n.expected_amount)), '[]'));
+    ELSE
+        PERFORM fn_monthly_site_summary_apply(COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                       'complex_id', b.complex_id,
+                       'period_month', date_trunc('month', o.period_month)::date,
+                       'new_debt', -o.expected_amount))
+            FROM old_rows o
+            JOIN unit u ON u.id = o.unit_id
+            JOIN building b ON b.id = u.building_id), '[]'));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-----------------------------------------------------------
+-- 4) TRIGGERS / TETİKLEYİCİLER
+-----------------------------------------------------------
+/*
+   EN: PostgreSQL allows transition tables only on single-event triggers,
+       so each table gets one trigger per event.
+   TR: PostgreSQL geçiş tablolarına yalnızca tek olaylı tetikleyicilerde izin verir;
+       bu yüzden her tabloda olay başına bir tetikleyici vardır.
+*/
+DROP TRIGGER IF EXISTS trg_monthly_summary_payment_ins ON payment;
+DROP TRIGGER IF EXISTS trg_monthly_summary_payment_upd ON payment;
+DROP TRIGGER IF EXISTS trg_monthly_summary_payment_del ON payment;
+
+CREATE TRIGGER trg_monthly_summary_payment_ins
+AFTER INSERT ON payment
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_monthly_summary_payment();
+
+CREATE TRIGGER trg_monthly_summary_payment_upd
+AFTER UPDATE ON payment
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_monthly_summary_payment();
+
+CREATE TRIGGER trg_monthly_summary_payment_del
+AFTER DELETE ON payment
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_monthly_summary_payment();
+
+DROP TRIGGER IF EXISTS trg_monthly_summary_expense_ins ON account_transaction;
+DROP TRIGGER IF EXISTS trg_monthly_summary_expense_upd ON account_transaction;
+DROP TRIGGER IF EXISTS trg_monthly_summary_expense_del ON account_transaction;
+
+CREATE TRIGGER trg_monthly_summary_expense_ins
+AFTER INSERT ON account_transaction
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_monthly_summary_expense();
+
+CREATE TRIGGER trg_monthly_summary_expense_upd
+AFTER UPDATE ON account_transaction
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_monthly_summary_expense();
+
+CREATE TRIGGER trg_monthly_summary_expense_del
+AFTER DELETE ON account_transaction
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_monthly_summary_expense();
+
+DROP TRIGGER IF EXISTS trg_monthly_summary_debt_ins ON debt_item;
+DROP TRIGGER IF EXISTS trg_monthly_summary_debt_upd ON debt_item;
+DROP TRIGGER IF EXISTS trg_monthly_summary_debt_del ON debt_item;
+
+CREATE TRIGGER trg_monthly_summary_debt_ins
+AFTER INSERT ON debt_item
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_monthly_summary_debt();
+
+CREATE TRIGGER trg_monthly_summary_debt_upd
+AFTER UPDATE ON debt_item
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_monthly_summary_debt();
+
+CREATE TRIGGER trg_monthly_summary_debt_del
+AFTER DELETE ON debt_item
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_monthly_summary_debt();
+
+-----------------------------------------------------------
+-- 5) REBUILD / YENİDEN OLUŞTURMA
+-----------------------------------------------------------
+/*
+   EN: Recomputes the summary from the source tables (all sites, or one site) into
+       slot 0. Used to backfill an existing database or to repair drift.
+   TR: Özeti kaynak tablolardan yeniden hesaplar (tüm siteler veya tek site), slot 0'a
+       yazar. Mevcut veritabanını doldurmak ya da sapmaları onarmak için kullanılır.
+*/
+CREATE OR REPLACE FUNCTION fn_rebuild_monthly_site_summary(p_complex_id INTEGER DEFAULT NULL)
+RETURNS VOID AS $$
+    DELETE FROM monthly_site_summary
+    WHERE p_complex_id IS NULL OR complex_id = p_complex_id;
+
+    INSERT INTO monthly_site_summary (complex_id, period_month, collected, expense, new_debt)
+    SELECT complex_id, period_month, SUM(collected), SUM(expense), SUM(new_debt)
+    FROM (
+        SELECT complex_id, date_trunc('month', process_date)::date AS period_month,
+               amount AS collected, 0 AS expense, 0 AS new_debt
+        FROM payment
+        UNION ALL
+        SELECT complex_id, date_trunc('month', process_date)::date, 0, amount, 0
+        FROM account_transaction
+        WHERE type = 'EXPENSE'
+        UNION ALL
+        SELECT b.complex_id, date_trunc('month', d.period_month)::date, 0, 0, d.expected_amount
+        FROM debt_item d
+        JOIN unit u ON u.id = d.unit_id
+        JOIN building b ON b.id = u.building_id
+    ) kaynak
+    WHERE p_complex_id IS NULL OR complex_id = p_complex_id
+    GROUP BY complex_id, period_month;
+$$ LANGUAGE sql;
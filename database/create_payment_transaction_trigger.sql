@@ -113,65 +113,90 @@ EXECUTE FUNCTION fn_create_payment_transaction();
 -- AUTOMATIC DEBT DISTRIBUTION TRIGGER / OTOMATİK BORÇ DAĞITIMI
 -----------------------------------------------------------
 
+/*
+   EN:
+   Serializes debt allocation per unit with a transaction-scoped advisory lock
+   (key pair: namespace 1 = debt allocation, unit id). Payments for the same unit
+   wait for each other until commit; payments for different units never block.
+   The lock is re-entrant, so the application may take it before inserting the
+   payment (to measure the wait) and the trigger takes it again for free.
+
+   TR:
+   Borç dağıtımını daire bazında, işlem süresince tutulan bir advisory kilit ile
+   sıraya sokar (anahtar çifti: isim alanı 1 = borç dağıtımı, daire id). Aynı daireye
+   gelen ödemeler commit'e kadar birbirini bekler; farklı dairelerin ödemeleri hiç
+   beklemez. Kilit yeniden girilebilirdir; uygulama ödemeyi eklemeden önce alabilir
+   (bekleme süresini ölçmek için), tetikleyicinin tekrar alması ek maliyet getirmez.
+*/
+CREATE OR REPLACE FUNCTION fn_lock_unit_debts(p_unit_id INTEGER)
+RETURNS VOID AS $$
+    SELECT pg_advisory_xact_lock(1, p_unit_id);
+$$ LANGUAGE sql;
+
+/*
+   EN:
+   Allocates a new payment to the unit's open debts (oldest first, FIFO) in a single
+   set-based statement. Running totals are computed with a window function, so the cost
+   is one statement per payment no matter how many months the unit is behind.
+   Allocated amounts are also added to debt_item.paid_amount.
+   This trigger is the only allocation path; the application just inserts the payment.
+
+   TR:
+   Yeni ödemeyi dairenin açık borçlarına (eskiden yeniye, FIFO) tek bir küme tabanlı
+   sorguyla dağıtır. Kümülatif toplamlar pencere fonksiyonu ile hesaplanır; daire kaç ay
+   geride olursa olsun ödeme başına tek sorgu çalışır. Dağıtılan tutar debt_item.paid_amount
+   alanına da eklenir.
+   Tek dağıtım yolu bu tetikleyicidir; uygulama yalnızca ödemeyi ekler.
+*/
 CREATE OR REPLACE FUNCTION fn_distribute_payment_to_debts()
 RETURNS TRIGGER AS $$
-DECLARE
-    r_debt RECORD;
-    v_remaining_payment NUMERIC(10,2);
-    v_debt_balance NUMERIC(10,2);
-    v_pay_amount NUMERIC(10,2);
-    v_already_paid NUMERIC(10,2);
 BEGIN
-    -- 1. Ödenen tutarı değişkene al
-    v_remaining_payment := NEW.amount;
+    /*
+      EN: Without the lock two concurrent payments for one unit read the same open
+          debts and both allocate against the oldest one. The allocation query below
+          runs with a fresh snapshot after the lock is granted, so it sees what the
+          previous payment committed.
+      TR: Kilit olmadan aynı daireye eşzamanlı iki ödeme aynı açık borçları okur ve
+          ikisi de en eski borca dağıtılır. Aşağıdaki dağıtım sorgusu kilit alındıktan
+          sonra yeni bir anlık görüntüyle çalışır; önceki ödemenin commit ettiğini görür.
+    */
+    PERFORM fn_lock_unit_debts(NEW.unit_id);
 
-    -- 2. Bu dairenin ödenmemiş veya kısmi ödenmiş borçlarını getir (Eskiden yeniye)
-    FOR r_debt IN 
-        SELECT d.id, d.expected_amount, d.status 
+    WITH sirali AS (
+        -- 1. Dairenin açık borçları ve bu borçtan önceki borçların toplamı
+        --    (kalan bakiye debt_item.remaining_amount'tan okunur, payment_debt yeniden toplanmaz)
+        SELECT d.id,
+               d.remaining_amount AS bakiye,
+               SUM(GREATEST(d.remaining_amount, 0)) OVER (ORDER BY d.period_month ASC, d.id ASC)
+                   - GREATEST(d.remaining_amount, 0) AS onceki_toplam
         FROM debt_item d
-        WHERE d.unit_id = NEW.unit_id 
+        WHERE d.unit_id = NEW.unit_id
           AND d.status IN ('UNPAID', 'PARTIAL')
-        ORDER BY d.period_month ASC, d.id ASC
-    LOOP
-        -- Eğer dağıtılacak para bittiyse döngüden çık
-        IF v_remaining_payment <= 0 THEN
-            EXIT;
-        END IF;
-
-        -- 3. Bu borç kalemi için daha önce ne kadar ödenmiş?
-        SELECT COALESCE(SUM(covered_amount), 0) 
-        INTO v_already_paid
-        FROM payment_debt 
-        WHERE debt_item_id = r_debt.id;
-
-        -- 4. Bu borcun kapanması için kalan tutar nedir?
-        v_debt_balance := r_debt.expected_amount - v_already_paid;
-
-        -- Eğer bakiye 0 veya negatifse (hata/tutarsızlık varsa) bu satırı geç
-        IF v_debt_balance <= 0 THEN
-            -- Durumu PAID yaparak düzelt
-            UPDATE debt_item SET status = 'PAID' WHERE id = r_debt.id;
-            CONTINUE;
-        END IF;
-
-        -- 5. Ne kadar ödeyeceğiz? (Elimizdeki para mı küçük, borç mu?)
-        v_pay_amount := LEAST(v_remaining_payment, v_debt_balance);
-
-        -- 6. İlişki tablosuna (payment_debt) kayıt at
+    ),
+    dagitim AS (
+        -- 2. Ödemenin yettiği borçlar ve her birine düşen tutar
+        SELECT id, LEAST(bakiye, NEW.amount - onceki_toplam) AS tutar
+        FROM sirali
+        WHERE bakiye > 0
+          AND onceki_toplam < NEW.amount
+    ),
+    eklenen AS (
+        -- 3. İlişki tablosuna (payment_debt) toplu kayıt
         INSERT INTO payment_debt (payment_id, debt_item_id, covered_amount)
-        VALUES (NEW.id, r_debt.id, v_pay_amount);
-
-        -- 7. Borç tablosunun durumunu güncelle
-        IF (v_already_paid + v_pay_amount) >= r_debt.expected_amount THEN
-            UPDATE debt_item SET status = 'PAID' WHERE id = r_debt.id;
-        ELSE
-            UPDATE debt_item SET status = 'PARTIAL' WHERE id = r_debt.id;
-        END IF;
-
-        -- 8. Elimizdeki parayı düş
-        v_remaining_payment := v_remaining_payment - v_pay_amount;
-
-    END LOOP;
+        SELECT NEW.id, id, tutar FROM dagitim
+        RETURNING debt_item_id, covered_amount
+    )
+    -- 4. Ödenen tutarı ve durumu toplu güncelle (bakiyesi zaten sıfırlanmış satırlar da PAID olur)
+    UPDATE debt_item d
+    SET paid_amount = d.paid_amount + COALESCE(e.covered_amount, 0),
+        status = CASE
+                     WHEN s.bakiye - COALESCE(e.covered_amount, 0) <= 0 THEN 'PAID'
+                     ELSE 'PARTIAL'
+                 END
+    FROM sirali s
+    LEFT JOIN eklenen e ON e.debt_item_id = s.id
+    WHERE d.id = s.id
+      AND (e.debt_item_id IS NOT NULL OR s.bakiye <= 0);
 
     RETURN NEW;
 END;
@@ -184,3 +209,72 @@ CREATE TRIGGER trg_auto_distribute_payment
 AFTER INSERT ON payment
 FOR EACH ROW
 EXECUTE FUNCTION fn_distribute_payment_to_debts();
+
+-----------------------------------------------------------
+-- PAID AMOUNT VERIFICATION / ÖDENEN TUTAR DOĞRULAMA
+-----------------------------------------------------------
+/*
+   EN:
+   Recomputes paid_amount and status of every debt (optionally of one site) from
+   payment_debt in a single grouped pass and returns the rows that drifted.
+   With p_fix = TRUE the drifted rows are corrected in the same statement.
+   Debts without any allocation may legitimately be PAID (exempt units, legacy data).
+
+   TR:
+   Tüm borçların (isteğe bağlı olarak tek sitenin) paid_amount ve durumunu payment_debt
+   üzerinden tek gruplu sorguyla yeniden hesaplar ve sapan satırları döner.
+   p_fix = TRUE verilirse sapmalar aynı sorguda düzeltilir.
+   Hiç eşleşmesi olmayan borçlar PAID olabilir (muaf daireler, eski veriler).
+
+   USAGE / KULLANIM:
+   SELECT * FROM fn_verify_debt_paid_amounts();          -- rapor
+   SELECT * FROM fn_verify_debt_paid_amounts(1, TRUE);   -- 1 numaralı siteyi düzelt
+*/
+CREATE OR REPLACE FUNCTION fn_verify_debt_paid_amounts(
+    p_complex_id INTEGER DEFAULT NULL,
+    p_fix BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (
+    debt_item_id INTEGER,
+    unit_id INTEGER,
+    stored_paid NUMERIC,
+    actual_paid NUMERIC,
+    stored_status VARCHAR,
+    actual_status VARCHAR
+) AS $$
+    WITH gercek AS (
+        SELECT d.id, d.unit_id, d.expected_amount, d.paid_amount, d.status,
+               COALESCE(SUM(pd.covered_amount), 0) AS odenen
+        FROM debt_item d
+        JOIN unit u ON u.id = d.unit_id
+        JOIN building b ON b.id = u.building_id
+        LEFT JOIN payment_debt pd ON pd.debt_item_id = d.id
+        WHERE p_complex_id IS NULL OR b.complex_id = p_complex_id
+        GROUP BY d.id
+    ),
+    beklenen AS (
+        SELECT g.*,
+               CASE
+                   WHEN g.odenen >= g.expected_amount THEN 'PAID'
+                   WHEN g.odenen > 0 THEN 'PARTIAL'
+                   WHEN g.status = 'PARTIAL' THEN 'UNPAID'
+                   ELSE g.status
+               END AS dogru_durum
+        FROM gercek g
+    ),
+    sapma AS (
+        SELECT * FROM beklenen
+        WHERE paid_amount <> odenen OR status <> dogru_durum
+    ),
+    duzeltilen AS (
+        UPDATE debt_item d
+        SET paid_amount = s.odenen,
+            status = s.dogru_durum
+        FROM sapma s
+        WHERE p_fix AND d.id = s.id
+        RETURNING d.id
+    )
+    SELECT id, unit_id, paid_amount, odenen, status, dogru_durum::VARCHAR
+    FROM sapma
+    ORDER BY unit_id, id;
+$$ LANGUAGE sql;
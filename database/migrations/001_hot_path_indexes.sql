@@ -0,0 +1,74 @@
+/*
+   FILE NAME / DOSYA ADI : 001_hot_path_indexes.sql
+   PROJECT / PROJE      : Sellable Site Management Accounting Interface
+                          Satılabilir Site Yönetimi Muhasebe Arayüzü
+
+   PURPOSE / AMAÇ:
+   EN: Adds the indexes reported by benchmarks/explain_plans.py for the hot
+       filters that fell back to sequential scans as data grew:
+       payments of a unit (newest first), payments / expenses of a complex
+       (monthly summary rebuild) and the expense list of a complex.
+
+   TR: benchmarks/explain_plans.py'nin, veri büyüdükçe sıralı taramaya düşen
+       sıcak süzgeçler için raporladığı indeksleri ekler: bir dairenin ödemeleri
+       (en yeniden eskiye), bir sitenin ödemeleri / giderleri (aylık özetin
+       yeniden oluşturulması) ve bir sitenin gider listesi.
+
+   NOTES / NOTLAR:
+   - EN: Indexes are built CONCURRENTLY so a live database keeps accepting writes;
+         run the file with plain psql -f (NOT inside a transaction, i.e. without -1).
+         Safe to re-run. Apply after all files in database/ have been run.
+         A unit's open debts in FIFO order are already served by the partial
+         index idx_debt_item_unit_open (revised_create_tables.sql).
+   - TR: İndeksler CONCURRENTLY ile oluşturulur, çalışan veritabanı yazma almaya devam
+         eder; dosya düz psql -f ile çalıştırılmalıdır (işlem içinde DEĞİL, -1 olmadan).
+         Tekrar çalıştırılabilir. database/ altındaki tüm dosyalardan sonra uygulanır.
+         Bir dairenin FIFO sıralı açık borçları zaten idx_debt_item_unit_open kısmi
+         indeksiyle karşılanır (revised_create_tables.sql).
+*/
+
+-----------------------------------------------------------
+-- 1) MIGRATION LOG / GÖÇ KAYDI
+-----------------------------------------------------------
+/*
+   EN: One row per applied migration file.
+   TR: Uygulanan her göç dosyası için bir satır.
+*/
+CREATE TABLE IF NOT EXISTS schema_migration (
+    version VARCHAR(20) PRIMARY KEY,              -- File number / Dosya numarası
+    name VARCHAR(100) NOT NULL,                   -- File name / Dosya adı
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP -- Applied at / Uygulanma zamanı
+);
+
+-----------------------------------------------------------
+-- 2) INDEXES / İNDEKSLER
+-----------------------------------------------------------
+/*
+   EN: Payment history of a unit, newest first (get_daire_odemeleri).
+   TR: Bir dairenin ödeme geçmişi, en yeniden eskiye (get_daire_odemeleri).
+*/
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_payment_unit_date
+    ON payment (unit_id, process_date);
+
+/*
+   EN: Payments of a complex by date (fn_rebuild_monthly_site_summary, site reports).
+   TR: Bir sitenin tarihe göre ödemeleri (fn_rebuild_monthly_site_summary, site raporları).
+*/
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_payment_complex_date
+    ON payment (complex_id, process_date);
+
+/*
+   EN: Expense list of a complex, newest first (get_giderler), and the expense
+       side of the monthly summary rebuild.
+   TR: Bir sitenin gider listesi, en yeniden eskiye (get_giderler) ve aylık özetin
+       yeniden oluşturulmasındaki gider tarafı.
+*/
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_account_transaction_complex_type
+    ON account_transaction (complex_id, type, process_date);
+
+-- EN: A failed CONCURRENTLY build leaves an INVALID index behind; drop it and re-run the file.
+-- TR: Yarıda kalan CONCURRENTLY oluşturma INVALID bir indeks bırakır; indeksi silip dosyayı tekrar çalıştırın.
+
+INSERT INTO schema_migration (version, name)
+VALUES ('001', 'hot_path_indexes')
+ON CONFLICT (version) DO NOTHING;
@@ -276,3 +276,77 @@ ADD COLUMN IF NOT EXISTS is_exempt BOOLEAN DEFAULT FALSE;
 */
 ALTER TABLE unit
 ADD COLUMN IF NOT EXISTS custom_dues_amount NUMERIC(10,2) DEFAULT NULL;
+
+/*
+    TABLE: debt_item (Paid / Remaining Amount)
+    PURPOSE (EN): Denormalized running total of payment_debt.covered_amount per debt.
+                  Maintained by the payment allocation trigger so open balances can be
+                  read without re-summing payment history. remaining_amount is derived.
+    PURPOSE (TR): Borç başına payment_debt.covered_amount toplamının tutulan kopyası.
+                  Ödeme dağıtım tetikleyicisi günceller; açık bakiye ödeme geçmişi
+                  yeniden toplanmadan okunur. remaining_amount otomatik hesaplanır.
+
+    CHECK (EN/TR): SELECT * FROM fn_verify_debt_paid_amounts(); -- drift / sapma raporu
+*/
+ALTER TABLE debt_item
+ADD COLUMN IF NOT EXISTS paid_amount NUMERIC(10,2) NOT NULL DEFAULT 0;
+
+ALTER TABLE debt_item
+ADD COLUMN IF NOT EXISTS remaining_amount NUMERIC(10,2)
+    GENERATED ALWAYS AS (expected_amount - paid_amount) STORED;
+
+/*
+    INDEXES / İNDEKSLER
+    EN: Open debts of a unit in FIFO order, and allocations per debt.
+    TR: Bir dairenin açık borçları (FIFO sırası) ve borç başına ödeme eşleşmeleri.
+*/
+CREATE INDEX IF NOT EXISTS idx_debt_item_unit_open
+    ON debt_item (unit_id, period_month, id)
+    WHERE status IN ('UNPAID', 'PARTIAL');
+
+CREATE INDEX IF NOT EXISTS idx_payment_debt_debt_item
+    ON payment_debt (debt_item_id);
+
+/*
+    TABLE / TABLO : background_job
+
+    PURPOSE / AMAÇ:
+    Tracks long-running bulk operations (imports, dues runs) executed by the
+    application's background job runner, so progress and results survive page
+    reruns and several jobs can run at the same time.
+    Arka planda çalışan uzun toplu işlemleri (aktarımlar, aidat yansıtma) izler;
+    ilerleme ve sonuçlar sayfa yenilense de kaybolmaz, birden çok iş aynı anda çalışabilir.
+
+    NOTE / NOT:
+    result holds the service's structured result as JSON. updated_at is refreshed
+    on every progress report and by a periodic heartbeat; RUNNING jobs that stop
+    refreshing it are marked FAILED.
+    result, servisin yapılandırılmış sonucunu JSON olarak tutar. updated_at her
+    ilerleme bildiriminde ve düzenli nabızla yenilenir; yenilenmesi kesilen
+    RUNNING işler FAILED sayılır.
+    runner is the host:pid:random id of the process that queued the job; QUEUED
+    jobs are only failed when another (restarted) process left them behind.
+    runner, işi kuyruğa alan sürecin host:pid:rastgele kimliğidir; QUEUED işler
+    yalnızca başka (yeniden başlatılmış) bir süreçten kalmışsa FAILED sayılır.
+*/
+CREATE TABLE IF NOT EXISTS background_job (
+    id SERIAL PRIMARY KEY,
+    complex_id INTEGER REFERENCES complex_properties(id)
+        ON DELETE CASCADE,                        -- Site reference / Site referansı
+    kind VARCHAR(50) NOT NULL,                    -- Job kind / İş türü
+    status VARCHAR(10) NOT NULL DEFAULT 'QUEUED'
+        CHECK (status IN ('QUEUED', 'RUNNING', 'DONE', 'FAILED')), -- Status / Durum
+    progress NUMERIC(5,4) NOT NULL DEFAULT 0,     -- 0..1 progress / İlerleme oranı
+    message TEXT,                                 -- Last progress message / Son ilerleme mesajı
+    params JSONB,                                 -- Job parameters / İş parametreleri
+    result JSONB,                                 -- Structured result / Sonuç
+    error TEXT,                                   -- Error message / Hata mesajı
+    runner VARCHAR(100),                          -- Owning process / Sahip süreç
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, -- Queued at / Kuyruğa alınma
+    started_at TIMESTAMP,                         -- Started at / Başlama
+    finished_at TIMESTAMP,                        -- Finished at / Bitiş
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP  -- Heartbeat / Son bildirim
+);
+
+CREATE INDEX IF NOT EXISTS idx_background_job_complex
+    ON background_job (complex_id, created_at DESC);
@@ -1,45 +1,57 @@
+import importlib
+
 import streamlit as st
-import pandas as pd
 from dotenv import load_dotenv
 
-# Import connections
-from src.database.connection import get_db_engine
+# Import services
+from src.services.directory_service import get_siteler
+from src.services.notify_service import dinleyiciyi_baslat
+from src.services.profile_service import sayfa_profili
+from src.services.warmup_service import isitmayi_baslat, get_isitma_durumu
 
 # Import Auth
 from src.auth.auth import check_password
 
-# Import Views
-from src.views.overview import render_overview_page
-from src.views.buildings import render_buildings_page
-from src.views.payments import render_payments_page
-from src.views.expenses import render_expenses_page
-from src.views.personnel import render_personnel_page
-from src.views.bulk_ops import render_bulk_ops_page
-
 load_dotenv()
 
+# Menü -> (görünüm modülü, çizim fonksiyonu). Görünümler (ve servisleri, pandas) menüden ilk
+# seçildiklerinde yüklenir; giriş ekranı bunları beklemez. Sıra, menüdeki sıradır.
+SAYFALAR = {
+    "📊 Genel Bakış": ("src.views.overview", "render_overview_page"),
+    "💰 Kasa (Tahsilat)": ("src.views.payments", "render_payments_page"),
+    "🏢 Bloklar ve Daireler": ("src.views.buildings", "render_buildings_page"),
+    "📜 Giderler": ("src.views.expenses", "render_expenses_page"),
+    "👷 Personeller": ("src.views.personnel", "render_personnel_page"),
+    "📢 Toplu İşlemler": ("src.views.bulk_ops", "render_bulk_ops_page"),
+}
+
+def gorunum_fonksiyonu(modul, fonksiyon):
+    """Görünüm modülünü ilk çağrıda içe aktarır (sonrakilerde sys.modules'ten gelir)."""
+    return getattr(importlib.import_module(modul), fonksiyon)
+
 # Sayfa Genişlik Ayarı
 st.set_page_config(page_title="Site Yönetim Paneli", layout="wide")
 
+# Diğer sunucu süreçlerinin yazmalarını önbelleğe yansıtan dinleyici (süreç başına bir kez başlar)
+dinleyiciyi_baslat()
+# Rehberleri ve borç haritalarını tüm siteler için arka planda önbelleğe yükler (süreç başına bir kez)
+isitmayi_baslat()
+
 # --- SİTE SEÇİM MANTIĞI ---
 if 'selected_site_id' not in st.session_state:
     # Karşılama Ekranı
     st.title("🏙️ Site Yönetim Sistemine Hoş Geldiniz")
     st.info("Devam etmek için lütfen yönetmek istediğiniz siteyi seçin.")
     
-    engine = get_db_engine()
-    if engine:
-        query = "SELECT id, name FROM complex_properties"
-        sites_df = pd.read_sql(query, engine)
-
-        if not sites_df.empty:
-            secilen_ad = st.selectbox("Site Seçiniz:", sites_df['name'])
-            site_id = int(sites_df[sites_df['name'] == secilen_ad]['id'].values[0])
-            
-            if st.button("Sisteme Giriş Yap"):
-                st.session_state.selected_site_id = site_id
-                st.session_state.selected_site_name = secilen_ad
-                st.rerun()
+    sites_df = get_siteler()
+    if not sites_df.empty:
+        secilen_ad = st.selectbox("Site Seçiniz:", sites_df['name'])
+        site_id = int(sites_df[sites_df['name'] == secilen_ad]['id'].values[0])
+        
+        if st.button("Sisteme Giriş Yap"):
+            st.session_state.selected_site_id = site_id
+            st.session_state.selected_site_name = secilen_ad
+            st.rerun()
 else:
 
     if not check_password():
@@ -51,31 +63,27 @@ else:
     st.sidebar.success(f"🔓 Giriş: nidakd")
     
     # Sol Menü Modülleri
-    menu = st.sidebar.radio(
-    "Menü",
-    ["📊 Genel Bakış", "💰 Kasa (Tahsilat)", "🏢 Bloklar ve Daireler", "📜 Giderler", "👷 Personeller", "📢 Toplu İşlemler"]
-    )
+    menu = st.sidebar.radio("Menü", list(SAYFALAR))
 
     if st.sidebar.button("🔄 Site Değiştir"):
         del st.session_state.selected_site_id
         st.session_state["password_correct"] = False
         st.rerun()
 
-    # View Routing
-    if menu == "📊 Genel Bakış":
-        render_overview_page()
-        
-    elif menu == "🏢 Bloklar ve Daireler":
-        render_buildings_page()
-
-    elif menu == "💰 Kasa (Tahsilat)":
-        render_payments_page()
-
-    elif menu == "👷 Personeller":
-        render_personnel_page()
-
-    elif menu == "📜 Giderler":
-        render_expenses_page()
-
-    elif menu == "📢 Toplu İşlemler":
-        render_bulk_ops_page()
+    if st.sidebar.button("🔥 Önbelleği Isıt"):
+        if isitmayi_baslat(elle=True):
+            st.sidebar.info("Önbellek arka planda ısıtılıyor.")
+        else:
+            st.sidebar.warning("Isıtma zaten sürüyor.")
+    isitma = get_isitma_durumu()
+    if isitma["son_hata"]:
+        st.sidebar.caption(f"⚠️ Son ısıtma başarısız: {isitma['son_hata']}")
+    elif isitma["son_calisma"]:
+        st.sidebar.caption(f"Son ısıtma: {isitma['son_calisma']} ({isitma['site']} site, {isitma['sure_ms'] / 1000:.1f} sn)")
+
+    # View Routing (PROFILER_ENABLED=1 ise sayfanın yüklenme + çizim süresi ve sorguları ölçülür)
+    with sayfa_profili(menu, st.session_state.selected_site_id) as profil:
+        gorunum_fonksiyonu(*SAYFALAR[menu])()
+
+    if profil is not None:
+        gorunum_fonksiyonu("src.views.profiler", "render_profil_paneli")(profil)
@@ -0,0 +1,13 @@
+import io
+
+def copy_dataframe(cur, df, tablo, sutunlar):
+    """
+    DataFrame'in verilen sütunlarını COPY ... FROM STDIN ile tek seferde tabloya yükler.
+    Satır satır INSERT yerine kullanılır; NaN/None değerler NULL olarak yazılır.
+    """
+    tampon = io.StringIO()
+    df[sutunlar].to_csv(tampon, index=False, header=False, na_rep="")
+    tampon.seek(0)
+    sutun_listesi = ", ".join(sutunlar)
+    cur.copy_expert(f"COPY {tablo} ({sutun_listesi}) FROM STDIN WITH (FORMAT csv)", tampon)
+    return len(df)
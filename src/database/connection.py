@@ -1,32 +1,247 @@
 import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
 import psycopg2
+import psycopg2.extensions
 import streamlit as st
-from sqlalchemy import create_engine
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# --- HAVUZ AYARLARI (.env üzerinden değiştirilebilir) ---
+HAVUZ_MIN = int(os.getenv("DB_POOL_MIN", "2"))
+HAVUZ_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+HAVUZ_ZAMAN_ASIMI = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+HAVUZ_YENILEME_SN = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+BAGLANTI_DENEME = int(os.getenv("DB_CONNECT_RETRIES", "3"))
+
+_metrik_kilidi = threading.Lock()
+_metrikler = {"checkout": 0, "toplam_bekleme_ms": 0.0, "max_bekleme_ms": 0.0,
+              "kilit_sayisi": 0, "toplam_kilit_bekleme_ms": 0.0, "max_kilit_bekleme_ms": 0.0,
+              "sorgu_sayisi": 0}
+
+
+# Sorgu dinleyicileri: dinleyici(sorgu, sure_ms, satir) havuz bağlantılarındaki her sorgudan sonra,
+# sorguyu çalıştıran iş parçacığında çağrılır (bkz. sorgu_dinleyicisi_ekle). Sorgu parametreleri
+# yerleştirilmiş hâliyle verilir.
+_sorgu_dinleyicileri = []
+
+
+def _sorgu_say(adet=1):
+    with _metrik_kilidi:
+        _metrikler["sorgu_sayisi"] += adet
+
+
+def _sorguyu_bildir(imlec, sorgu, sure_ms):
+    if isinstance(sorgu, bytes):
+        sorgu = sorgu.decode(psycopg2.extensions.encodings.get(imlec.connection.encoding, "utf-8"), "replace")
+    for dinleyici in list(_sorgu_dinleyicileri):
+        try:
+            dinleyici(str(sorgu), sure_ms, imlec.rowcount)
+        except Exception:
+            # Ölçüm kodu hatası sorguyu bozmasın
+            logger.exception("Sorgu dinleyicisi hatası")
+
+
+class _SayacliImlec(psycopg2.extensions.cursor):
+    """
+    Havuzdaki bağlantıların varsayılan cursor sınıfı: veritabanına giden her gidiş-dönüşü sayar
+    (pd.read_sql de bu cursor'ı kullanır). executemany her parametre satırı için ayrı gidiş-dönüştür.
+    Kayıtlı sorgu dinleyicisi varsa her sorgunun süresini ölçüp dinleyicilere bildirir.
+    """
+
+    def _calistir(self, calistirici, sorgu):
+        if not _sorgu_dinleyicileri:
+            return calistirici()
+        baslangic = time.perf_counter()
+        try:
+            return calistirici()
+        finally:
+            _sorguyu_bildir(self, self.query or sorgu, (time.perf_counter() - baslangic) * 1000)
+
+    def execute(self, query, vars=None):
+        _sorgu_say()
+        return self._calistir(lambda: super(_SayacliImlec, self).execute(query, vars), query)
+
+    def executemany(self, query, vars_list):
+        vars_list = list(vars_list)
+        _sorgu_say(len(vars_list))
+        return self._calistir(lambda: super(_SayacliImlec, self).executemany(query, vars_list), query)
+
+    def copy_expert(self, sql, file, size=8192):
+        _sorgu_say()
+        return self._calistir(lambda: super(_SayacliImlec, self).copy_expert(sql, file, size), sql)
+
+
+def sorgu_dinleyicisi_ekle(dinleyici):
+    """
+    dinleyici(sorgu, sure_ms, satir) fonksiyonunu kaydeder; havuz bağlantılarından çalıştırılan her
+    sorgudan sonra (hata verse de) çağrılır. Profil ve plan analizi araçları için; dinleyici hızlı olmalıdır.
+    """
+    if dinleyici not in _sorgu_dinleyicileri:
+        _sorgu_dinleyicileri.append(dinleyici)
+
+
+def sorgu_dinleyicisi_kaldir(dinleyici):
+    if dinleyici in _sorgu_dinleyicileri:
+        _sorgu_dinleyicileri.remove(dinleyici)
+
+
+def _olcumlu_havuz_sinifi():
+    """Her bağlantı alımının bekleme süresini ölçen QueuePool alt sınıfı."""
+    from sqlalchemy.pool import QueuePool
+
+    class _OlcumluHavuz(QueuePool):
+        def connect(self):
+            baslangic = time.perf_counter()
+            conn = super().connect()
+            bekleme_ms = (time.perf_counter() - baslangic) * 1000
+            with _metrik_kilidi:
+                _metrikler["checkout"] += 1
+                _metrikler["toplam_bekleme_ms"] += bekleme_ms
+                _metrikler["max_bekleme_ms"] = max(_metrikler["max_bekleme_ms"], bekleme_ms)
+            return conn
+
+    return _OlcumluHavuz
+
+
 @st.cache_resource
 def get_db_engine():
-    """SQLAlchemy engine oluşturur ve önbelleğe alır."""
+    """
+    SQLAlchemy engine oluşturur ve önbelleğe alır. psycopg2 bağlantıları da aynı havuzdan gelir.
+    SQLAlchemy ilk çağrıda (ilk sorguda) yüklenir; uygulamanın açılışını yavaşlatmaz.
+    """
     try:
+        from sqlalchemy import create_engine
+
         db_url = f"postgresql+psycopg2://{os.getenv('DB_USER')}:{os.getenv('DB_PASS')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-        engine = create_engine(db_url)
+        engine = create_engine(
+            db_url,
+            poolclass=_olcumlu_havuz_sinifi(),
+            pool_size=HAVUZ_MIN,
+            max_overflow=max(HAVUZ_MAX - HAVUZ_MIN, 0),
+            pool_timeout=HAVUZ_ZAMAN_ASIMI,
+            pool_recycle=HAVUZ_YENILEME_SN,
+            pool_pre_ping=True,  # Kopmuş bağlantıları kullanmadan önce yakalar (sağlık kontrolü)
+            connect_args={"cursor_factory": _SayacliImlec},
+        )
         return engine
     except Exception as e:
         st.error(f"Veritabanı bağlantı hatası (Engine): {e}")
         return None
 
+
+def _gecici_hata_mi(hata):
+    if isinstance(hata, psycopg2.OperationalError):
+        return True
+    # Engine kurulduysa SQLAlchemy zaten yüklüdür
+    from sqlalchemy import exc
+    return isinstance(hata, exc.OperationalError)
+
+
+@retry(
+    retry=retry_if_exception(_gecici_hata_mi),
+    stop=stop_after_attempt(BAGLANTI_DENEME),
+    wait=wait_exponential(multiplier=0.2, max=2),
+    reraise=True,
+)
+def _havuzdan_al():
+    """Havuzdan ham psycopg2 bağlantısı alır; geçici ağ hatalarında yeniden dener."""
+    engine = get_db_engine()
+    if engine is None:
+        raise RuntimeError("Veritabanı engine oluşturulamadı.")
+    return engine.raw_connection()
+
+
+@contextmanager
+def db_connection():
+    """
+    Havuzdan bir bağlantı verir. Blok hatasız biterse commit, hata olursa rollback yapılır;
+    her iki durumda da bağlantı kapatılmaz, havuza iade edilir.
+    """
+    conn = _havuzdan_al()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+@contextmanager
+def db_cursor():
+    """db_connection() üzerinde kısa yoldan cursor açar."""
+    with db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            yield cur
+        finally:
+            cur.close()
+
+
+def daire_kilidi_al(cur, unit_id):
+    """
+    Dairenin borç dağıtımı kilidini (fn_lock_unit_debts) işlem sonuna kadar alır ve kilit için
+    beklenen süreyi metriklere ekler. Aynı daireye eşzamanlı ödemeler burada sıraya girer.
+    """
+    baslangic = time.perf_counter()
+    cur.execute("SELECT fn_lock_unit_debts(%s)", (unit_id,))
+    bekleme_ms = (time.perf_counter() - baslangic) * 1000
+    with _metrik_kilidi:
+        _metrikler["kilit_sayisi"] += 1
+        _metrikler["toplam_kilit_bekleme_ms"] += bekleme_ms
+        _metrikler["max_kilit_bekleme_ms"] = max(_metrikler["max_kilit_bekleme_ms"], bekleme_ms)
+    return bekleme_ms
+
+
+def havuz_disi_baglanti():
+    """
+    Havuza girmeyen, uzun ömürlü psycopg2 bağlantısı açar (LISTEN gibi süreç boyu tutulan
+    bağlantılar için). Kapatmak çağıranın sorumluluğundadır.
+    """
+    return psycopg2.connect(
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASS"),
+    )
+
+
 def get_connection():
+    """Geriye dönük uyumluluk: havuzdan bağlantı döner, conn.close() bağlantıyı havuza iade eder."""
     try:
-        conn = psycopg2.connect(
-            host=os.getenv("DB_HOST"),
-            database=os.getenv("DB_NAME"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASS"),
-            port=os.getenv("DB_PORT")
-        )
-        return conn
+        return _havuzdan_al()
     except Exception as e:
         st.error(f"Veritabanı bağlantı hatası: {e}")
         return None
+
+
+def get_pool_metrics():
+    """
+    Havuz istatistiklerinin anlık kopyasını döner (checkout sayısı, bekleme süreleri, kullanımdaki bağlantılar)
+    ve daire borç dağıtımı kilidi için bekleme süreleri (kilit_sayisi, *_kilit_bekleme_ms).
+    sorgu_sayisi havuz bağlantılarından veritabanına yapılan toplam gidiş-dönüş sayısıdır.
+    """
+    with _metrik_kilidi:
+        metrikler = dict(_metrikler)
+    metrikler["ort_bekleme_ms"] = metrikler["toplam_bekleme_ms"] / metrikler["checkout"] if metrikler["checkout"] else 0.0
+    metrikler["ort_kilit_bekleme_ms"] = (metrikler["toplam_kilit_bekleme_ms"] / metrikler["kilit_sayisi"]
+                                         if metrikler["kilit_sayisi"] else 0.0)
+
+    engine = get_db_engine()
+    if engine is not None:
+        havuz = engine.pool
+        metrikler["kullanimda"] = havuz.checkedout()
+        metrikler["bosta"] = havuz.checkedin()
+        metrikler["havuz_boyutu"] = havuz.size()
+        metrikler["tasma"] = havuz.overflow()
+    return metrikler
@@ -1,151 +1,536 @@
-import streamlit as st
 import pandas as pd
-from src.database.connection import get_connection, get_db_engine
-
-def toplu_yakit_yukle(data_df, donem):
-    # This was defined in main.py but seemingly not used inside the tab implementation in main.py?
-    # Actually in main.py tab logic, it implemented its own loop.
-    # I'll rewrite the unified logic here.
-    conn = get_connection()
-    if conn:
-        try:
-            cur = conn.cursor()
-            for index, row in data_df.iterrows():
-                # Daire numarasına göre unit_id'yi buluyoruz
-                cur.execute("SELECT id FROM unit WHERE unit_number = %s", (str(row['Daire No']),))
-                unit_res = cur.fetchone()
-                if unit_res:
-                    unit_id = unit_res[0]
-                    tutar = row['Tutar']
-                    cur.execute("""
-                        INSERT INTO debt_item (unit_id, type, expected_amount, period_month, status)
-                        VALUES (%s, 'FUEL', %s, %s, 'UNPAID')
-                    """, (unit_id, tutar, donem))
-            conn.commit()
-            cur.close()
-            conn.close()
-            return True
-        except Exception as e:
-            st.error(f"Yükleme hatası: {e}")
-            return False
+from src.database.connection import db_cursor, get_db_engine
+from src.database.bulk_load import copy_dataframe
+from src.services.cache_service import olay_gecersiz_kil
+from src.utils.csv_utils import tr_sayiya_cevir, csv_yapisini_kokla, csv_parcalari
 
-def add_bulk_dues(site_id, amount, period_date):
-    conn = get_connection()
-    success_count = 0
-    if conn:
-        try:
-            cur = conn.cursor()
+_ANAHTAR_AYIRAC = "\x1f"
+PARCA_BOYUTU = 5000
+
+def _site_daire_haritasi(cur, site_id):
+    """Sitedeki tüm daireleri tek sorguda getirir: DataFrame[unit_id, Blok, Daire No]."""
+    cur.execute("""
+        SELECT u.id, b.name, u.unit_number
+        FROM unit u
+        JOIN building b ON u.building_id = b.id
+        WHERE b.complex_id = %s
+    """, (site_id,))
+    return pd.DataFrame(cur.fetchall(), columns=["unit_id", "Blok", "Daire No"])
+
+def _metin_sutunu(seri):
+    """Excel'den gelen '3', 3, '3.0' gibi değerleri aynı metne ('3') indirger."""
+    return seri.astype("string").str.strip().str.replace(r"\.0$", "", regex=True).fillna("")
+
+def _daireleri_esle(df, daireler):
+    """
+    Yüklenen satırları tek seferde çekilen daire haritasıyla pandas içinde eşler ve 'unit_id'
+    sütununu ekler. 'Blok' doluysa blok + daire no ile, değilse yalnızca daire no ile eşlenir;
+    daire no sitede birden fazla blokta varsa satır belirsiz sayılır. Eşleşmeyen satırlar için
+    'Neden' sütunu doldurulur.
+    """
+    daire_no = _metin_sutunu(df["Daire No"])
+    blok = _metin_sutunu(df["Blok"]) if "Blok" in df.columns else pd.Series("", index=df.index, dtype="string")
+    bloklu = blok != ""
+
+    harita_daire = daireler["Daire No"].astype(str)
+    bloklu_harita = pd.Series(daireler["unit_id"].values, index=daireler["Blok"].astype(str) + _ANAHTAR_AYIRAC + harita_daire)
+    tekrar_eden = harita_daire.duplicated(keep=False)
+    tekil_harita = pd.Series(daireler["unit_id"][~tekrar_eden].values, index=harita_daire[~tekrar_eden])
+
+    unit_id = (blok + _ANAHTAR_AYIRAC + daire_no).map(bloklu_harita).where(bloklu, daire_no.map(tekil_harita))
+    df["unit_id"] = unit_id.astype("Int64")
+
+    df["Neden"] = pd.NA
+    eslesmedi = df["unit_id"].isna()
+    belirsiz = eslesmedi & ~bloklu & daire_no.isin(set(harita_daire[tekrar_eden]))
+    df.loc[eslesmedi, "Neden"] = "Daire bulunamadı"
+    df.loc[belirsiz, "Neden"] = "Daire no birden fazla blokta var, 'Blok' sütununu doldurun"
+    return df
+
+def _tekrar_edenler(df, gorulen_anahtarlar=None):
+    """
+    (unit_id, type, period_month) anahtarı daha önce geçmiş satırların maskesi: aynı tabloda ilk
+    geçişten sonrakiler ve gorulen_anahtarlar verilirse (parça parça aktarımda önceki parçalar)
+    orada zaten bulunanlar. Yeni anahtarlar gorulen_anahtarlar'a eklenir; böylece aynı borç
+    dosyanın farklı parçalarında geçse de ilki yazılır, sonrakiler 'tekrarlanan' olarak raporlanır.
+    """
+    anahtarlar = pd.Series(list(zip(df["unit_id"].astype("int64"), df["type"], df["period_month"])),
+                           index=df.index, dtype="object")
+    tekrar = anahtarlar.duplicated(keep="first")
+    if gorulen_anahtarlar is not None:
+        tekrar |= anahtarlar.map(lambda anahtar: anahtar in gorulen_anahtarlar).astype(bool)
+        gorulen_anahtarlar.update(anahtarlar[~tekrar])
+    return tekrar
+
+def _borc_aktarim_tablosu(cur):
+    """İşlem sonunda kendiliğinden silinen geçici aktarım (staging) tablosunu oluşturur."""
+    cur.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS tmp_borc_aktarim (
+            unit_id INTEGER NOT NULL,
+            type VARCHAR(10) NOT NULL,
+            period_month DATE NOT NULL,
+            expected_amount NUMERIC(10,2) NOT NULL
+        ) ON COMMIT DROP
+    """)
+
+def _borc_aktarimini_birlestir(cur):
+    """
+    Aktarım tablosunu debt_item'a tek INSERT ... ON CONFLICT ile işler. Mevcut borçların tutarı
+    yalnızca henüz hiç ödeme almamışlarsa güncellenir. Dönüş: (eklenen, guncellenen)
+    """
+    cur.execute("""
+        WITH yazilan AS (
+            INSERT INTO debt_item (unit_id, type, expected_amount, period_month, status)
+            SELECT unit_id, type, expected_amount, period_month, 'UNPAID'
+            FROM tmp_borc_aktarim
+            ON CONFLICT (unit_id, type, period_month) DO UPDATE SET expected_amount = EXCLUDED.expected_amount
+            WHERE debt_item.status = 'UNPAID'
+              AND debt_item.paid_amount = 0
+              AND debt_item.expected_amount <> EXCLUDED.expected_amount
+            RETURNING (xmax = 0) AS yeni
+        )
+        SELECT COUNT(*) FILTER (WHERE yeni), COUNT(*) FILTER (WHERE NOT yeni) FROM yazilan
+    """)
+    return cur.fetchone()
+
+def _bos_aktarim_sonucu():
+    return {
+        "eklenen": 0, "guncellenen": 0, "degismeyen": 0,
+        "eslesmeyen": pd.DataFrame(), "tekrarlanan": pd.DataFrame(), "gecersiz": pd.DataFrame(),
+        "fark": pd.DataFrame(), "hata": None,
+    }
+
+# Kuru çalıştırmada (dry-run) her aday satırın debt_item'a karşı ne olacağını hesaplayan sorgu.
+# {kaynak}: unit_id, type, period_month, expected_amount sütunlarını veren tablo/alt sorgu.
+# %(sinir)s verilirse o tarihten önceki, ödeme almamış borçlar silinmiş sayılır (geçmiş borç temizliği);
+# %(silinecekler)s False ise bu borçlar rapora ayrıca SİLİNECEK satırı olarak eklenmez.
+_FARK_SORGUSU = """
+    WITH kaynak AS ({kaynak}),
+    silinecek AS (
+        SELECT d.*
+        FROM debt_item d
+        JOIN unit u ON u.id = d.unit_id
+        JOIN building b ON b.id = u.building_id
+        WHERE %(sinir)s::date IS NOT NULL
+          AND b.complex_id = %(site_id)s
+          AND d.period_month < %(sinir)s::date
+          AND d.status = 'UNPAID' AND d.paid_amount = 0
+    )
+    SELECT b.name AS "Blok", u.unit_number AS "Daire No", a.type AS "Borç Türü", a.period_month AS "Dönem",
+           d.expected_amount AS "Mevcut Tutar", a.expected_amount AS "Yeni Tutar", d.status AS "Mevcut Durum",
+           CASE
+               WHEN d.id IS NULL THEN 'EKLENECEK'
+               WHEN %(guncelle)s AND d.status = 'UNPAID' AND d.paid_amount = 0
+                    AND d.expected_amount <> a.expected_amount THEN 'GÜNCELLENECEK'
+               ELSE 'DEĞİŞMEYECEK'
+           END AS "İşlem"
+    FROM kaynak a
+    JOIN unit u ON u.id = a.unit_id
+    JOIN building b ON b.id = u.building_id
+    LEFT JOIN debt_item d
+           ON d.unit_id = a.unit_id AND d.type = a.type AND d.period_month = a.period_month
+          AND d.id NOT IN (SELECT id FROM silinecek)
+    UNION ALL
+    SELECT b.name, u.unit_number, s.type, s.period_month, s.expected_amount, NULL, s.status, 'SİLİNECEK'
+    FROM silinecek s
+    JOIN unit u ON u.id = s.unit_id
+    JOIN building b ON b.id = u.building_id
+    WHERE %(silinecekler)s
+"""
+
+_FARK_ISLEMLERI = {"EKLENECEK": "eklenen", "GÜNCELLENECEK": "guncellenen", "DEĞİŞMEYECEK": "degismeyen"}
+
+def _fark_hesapla(cur, site_id, kaynak, parametreler=None, guncelle=True, sinir=None, silinecekler=True):
+    """
+    Kuru çalıştırma: hiçbir şey yazmadan, tek sorguyla hangi borçların ekleneceğini,
+    güncelleneceğini, değişmeyeceğini (ve temizlikte silineceğini) satır satır döner.
+    silinecekler=False ise temizlik hesaba katılır ama silinecek borçlar listelenmez
+    (parça parça aktarımda yalnızca ilk parça listeler).
+    """
+    cur.execute(_FARK_SORGUSU.format(kaynak=kaynak),
+                {**(parametreler or {}), "site_id": site_id, "guncelle": guncelle, "sinir": sinir,
+                 "silinecekler": silinecekler})
+    sutunlar = [c.name for c in cur.description]
+    return pd.DataFrame(cur.fetchall(), columns=sutunlar)
+
+def _fark_sayilari(sonuc, fark):
+    """Fark raporundaki işlemleri sonuç sözlüğündeki sayaçlara yazar."""
+    sayilar = fark["İşlem"].value_counts() if not fark.empty else pd.Series(dtype=int)
+    for islem, alan in _FARK_ISLEMLERI.items():
+        sonuc[alan] = int(sayilar.get(islem, 0))
+    return sonuc
+
+def _eslesmeyenleri_farka_ekle(sonuc):
+    """Daireyle eşleşmeyen ve dosyada tekrarlanan (yazılmayacak) yükleme satırlarını da fark raporuna ekler."""
+    for alan, islem in (("eslesmeyen", "EŞLEŞMEYEN SATIR"), ("tekrarlanan", "TEKRARLANAN SATIR")):
+        if not sonuc[alan].empty:
+            satirlar = sonuc[alan].reindex(columns=["Blok", "Daire No"]).assign(**{"İşlem": islem})
+            sonuc["fark"] = pd.concat([sonuc["fark"], satirlar], ignore_index=True)
+    return sonuc
+
+
+def _aktarim_sonuclarini_birlestir(toplam, sonuc):
+    """Parça parça yapılan aktarımların sonuçlarını tek raporda toplar."""
+    birlesik = {}
+    for alan, deger in toplam.items():
+        if isinstance(deger, pd.DataFrame):
+            birlesik[alan] = pd.concat([deger, sonuc[alan]], ignore_index=True) if not sonuc[alan].empty else deger
+        elif alan == "hata":
+            birlesik[alan] = deger or sonuc[alan]
+        else:
+            birlesik[alan] = deger + sonuc[alan]
+    return birlesik
+
+def akisla_aktar(dosya, parca_isleyici, parca_boyutu=None, ilerleme=None, hazirlik=None, kuru_calistirma=False):
+    """
+    Büyük CSV dosyalarını belleğe tamamen açmadan işler: kodlama, ayırıcı ve başlık satırı
+    dosyanın başından koklanır, dosya C ayrıştırıcısıyla parça parça okunur ve her parça
+    parca_isleyici(df_parca, ilk_parca, gorulen_anahtarlar) ile toplu yükleyiciye verilir.
+    gorulen_anahtarlar tüm parçalarca paylaşılan kümedir; yükleyici önceki parçalarda geçen borç
+    anahtarlarını tekrar sayar (bkz. _tekrar_edenler). Her parça kendi işleminde yazılır. ilerleme(oran, mesaj) verilirse her parçadan sonra çağrılır.
+    hazirlik() verilirse dosya yapısı çözüldükten sonra, ilk parçadan önce bir kez çağrılır
+    (ör. eski borç temizliği); hata metni dönerse hiçbir parça işlenmez.
+    Bir parça hata verirse sonraki parçalar işlenmez; önceki parçalar yazılmış kalır (kuru_calistirma=True
+    ise yalnızca incelenmiş sayılır, hata metni de buna göre yazılır).
+    """
+    toplam = _bos_aktarim_sonucu()
+    yapi = csv_yapisini_kokla(dosya)
+    if hazirlik is not None:
+        toplam["hata"] = hazirlik()
+        if toplam["hata"]:
+            return toplam
+    islenen = 0
+    gorulen_anahtarlar = set()
+    for sira, (parca, oran) in enumerate(csv_parcalari(dosya, yapi, parca_boyutu or PARCA_BOYUTU)):
+        toplam = _aktarim_sonuclarini_birlestir(toplam, parca_isleyici(parca, sira == 0, gorulen_anahtarlar))
+        islenen += len(parca)
+        if toplam["hata"]:
+            eylem = "incelendi" if kuru_calistirma else "yazıldı"
+            toplam["hata"] = f"{toplam['hata']} (hata öncesinde {islenen - len(parca):,} satır {eylem})"
+            break
+        if ilerleme:
+            ilerleme(oran, f"{islenen:,} satır işlendi")
+    return toplam
+
+# Dönem x daire aday kümesi: her dönem için muaf olmayan her dairenin aidat tutarı.
+# Tutar önceliği: dairenin özel aidatı -> daire tipinin varsayılan aidatı -> dönemin plan tutarı.
+_AIDAT_ADAYLARI_CTE = """
+    donemler AS (
+        SELECT g::date AS donem
+        FROM generate_series(date_trunc('month', %(baslangic)s::date),
+                             date_trunc('month', %(bitis)s::date),
+                             interval '1 month') AS g
+    ),
+    plan AS (
+        SELECT date_trunc('month', p.donem)::date AS donem, p.tutar
+        FROM unnest(%(plan_donemleri)s::date[], %(plan_tutarlari)s::numeric[]) AS p(donem, tutar)
+    ),
+    adaylar AS (
+        SELECT u.id AS unit_id,
+               dn.donem,
+               COALESCE(u.custom_dues_amount, NULLIF(ut.default_dues, 0), pl.tutar) AS tutar
+        FROM donemler dn
+        CROSS JOIN unit u
+        JOIN building b ON u.building_id = b.id
+        LEFT JOIN unit_type ut ON ut.id = u.unit_type_id
+        LEFT JOIN plan pl ON pl.donem = dn.donem
+        WHERE b.complex_id = %(site_id)s
+          AND (u.is_exempt IS DISTINCT FROM TRUE)
+    )
+"""
+
+def _aidat_parametreleri(site_id, baslangic, bitis, tutar_plani):
+    donemler = list(tutar_plani.keys())
+    return {
+        "site_id": site_id,
+        "baslangic": baslangic,
+        "bitis": bitis,
+        "plan_donemleri": donemler,
+        "plan_tutarlari": [tutar_plani[d] for d in donemler],
+    }
+
+def add_bulk_dues_range(site_id, baslangic, bitis, tutar_plani, guncelle=True, kuru_calistirma=False):
+    """
+    baslangic..bitis arasındaki her ay için sitedeki muaf olmayan tüm dairelere aidat borcunu
+    generate_series ile tek INSERT ... SELECT ... ON CONFLICT sorgusunda, tek işlemde yazar.
+    tutar_plani: {dönem (tarih): aylık tutar}. Planda tutarı olmayan ve özel/tip aidatı da
+    bulunmayan satırlar atlanır.
+    guncelle=True ise o döneme ait, henüz hiç ödeme almamış mevcut aidatların tutarı plana göre
+    güncellenir; aynı plan tekrar çalıştırıldığında hiçbir şey değişmez.
+    kuru_calistirma=True ise hiçbir şey yazılmaz; sayılar ve satır bazlı "fark" raporu döner.
+    Dönüş: {"eklenen": int, "guncellenen": int, "atlanan": int, "fark": DataFrame, "hata": str | None}
+    """
+    sonuc = {"eklenen": 0, "guncellenen": 0, "atlanan": 0, "fark": pd.DataFrame(), "hata": None}
+    cakisma = """
+        DO UPDATE SET expected_amount = EXCLUDED.expected_amount
+        WHERE debt_item.status = 'UNPAID'
+          AND debt_item.paid_amount = 0
+          AND debt_item.expected_amount <> EXCLUDED.expected_amount
+    """ if guncelle else "DO NOTHING"
+    try:
+        if kuru_calistirma:
+            with db_cursor() as cur:
+                kaynak = f"""
+                    WITH {_AIDAT_ADAYLARI_CTE}
+                    SELECT unit_id, 'DUES' AS type, donem AS period_month, tutar AS expected_amount
+                    FROM adaylar WHERE tutar IS NOT NULL
+                """
+                sonuc["fark"] = _fark_hesapla(cur, site_id, kaynak, _aidat_parametreleri(site_id, baslangic, bitis, tutar_plani), guncelle)
+            _fark_sayilari(sonuc, sonuc["fark"])
+            sonuc["atlanan"] = sonuc.pop("degismeyen")
+            return sonuc
+
+        with db_cursor() as cur:
             # --- unit tablosunda complex_id olmadığı için JOIN kullanıyoruz ---
-            cur.execute("""
-                SELECT u.id 
-                FROM unit u
-                JOIN building b ON u.building_id = b.id
-                WHERE b.complex_id = %s 
-                AND (u.is_exempt IS DISTINCT FROM TRUE)
-            """, (site_id,))
-            
-            daireler = cur.fetchall()
-            
-            for d in daireler:
-                cur.execute("""
+            cur.execute(f"""
+                WITH {_AIDAT_ADAYLARI_CTE},
+                yazilan AS (
                     INSERT INTO debt_item (unit_id, type, expected_amount, period_month, status)
-                    VALUES (%s, 'DUES', %s, %s, 'UNPAID')
-                """, (d[0], amount, period_date))
-            
-            conn.commit()
-            success_count = len(daireler)
-            cur.close()
-            conn.close()
-            return success_count
-        except Exception as e:
-            st.error(f"Hata: {e}")
-            return 0
-    return 0
-
-def process_bulk_fuel_csv(site_id, df_yuklenen):
-    conn = get_connection()
-    success_count = 0
-    if conn:
-        try:
-            cur = conn.cursor()
-            for index, row in df_yuklenen.iterrows():
-                # Daire numarasına göre ID bul
-                cur.execute("""
-                    SELECT u.id FROM unit u 
-                    JOIN building b ON u.building_id = b.id 
-                    WHERE u.unit_number = %s AND b.complex_id = %s
-                """, (str(row['Daire No']), site_id))
-                unit_res = cur.fetchone()
-                
-                # Tutar 0'dan büyükse kaydet
-                if unit_res and float(row['Tutar']) > 0:
-                    # Excel'deki 'Donem' sütununu kullanıyoruz
-                    cur.execute("""
-                        INSERT INTO debt_item (unit_id, type, expected_amount, period_month, status)
-                        VALUES (%s, 'FUEL', %s, %s, 'UNPAID')
-                    """, (unit_res[0], row['Tutar'], row['Donem']))
-                    success_count += 1
-            
-            conn.commit()
-            cur.close()
-            conn.close()
-            return success_count
-        except Exception as e:
-            st.error(f"Dosya işlenirken hata oluştu: {e}")
-            return 0
-    return 0
-
-def process_past_debts_csv(site_id, df_gecmis):
-    conn = get_connection()
-    success_count = 0
-    if conn:
+                    SELECT unit_id, 'DUES', tutar, donem, 'UNPAID'
+                    FROM adaylar
+                    WHERE tutar IS NOT NULL
+                    ON CONFLICT (unit_id, type, period_month) {cakisma}
+                    RETURNING (xmax = 0) AS yeni
+                )
+                SELECT (SELECT COUNT(*) FROM adaylar),
+                       COUNT(*) FILTER (WHERE yeni),
+                       COUNT(*) FILTER (WHERE NOT yeni)
+                FROM yazilan
+            """, _aidat_parametreleri(site_id, baslangic, bitis, tutar_plani))
+            aday_sayisi, eklenen_sayisi, guncellenen_sayisi = cur.fetchone()
+        if eklenen_sayisi or guncellenen_sayisi:
+            olay_gecersiz_kil("debt_item", site_id)
+
+        sonuc["eklenen"] = eklenen_sayisi
+        sonuc["guncellenen"] = guncellenen_sayisi
+        sonuc["atlanan"] = aday_sayisi - eklenen_sayisi - guncellenen_sayisi
+        return sonuc
+    except Exception as e:
+        sonuc["hata"] = f"Hata: {e}"
+        return sonuc
+
+def onizle_bulk_dues_range(site_id, baslangic, bitis, tutar_plani):
+    """
+    add_bulk_dues_range çalıştırılırsa ne olacağını yazmadan tek sorguda sayar.
+    Dönüş: {"donem": int, "daire": int, "eklenecek": int, "guncellenecek": int,
+            "degismeyecek": int, "tutarsiz": int, "toplam_tutar": float, "hata": str | None}
+    """
+    try:
+        with db_cursor() as cur:
+            cur.execute(f"""
+                WITH {_AIDAT_ADAYLARI_CTE}
+                SELECT COUNT(DISTINCT a.donem),
+                       COUNT(DISTINCT a.unit_id),
+                       COUNT(*) FILTER (WHERE a.tutar IS NOT NULL AND d.id IS NULL),
+                       COUNT(*) FILTER (WHERE a.tutar IS NOT NULL AND d.status = 'UNPAID' AND d.paid_amount = 0
+                                          AND d.expected_amount <> a.tutar),
+                       COUNT(*) FILTER (WHERE a.tutar IS NOT NULL AND d.id IS NOT NULL
+                                          AND NOT (d.status = 'UNPAID' AND d.paid_amount = 0
+                                                   AND d.expected_amount <> a.tutar)),
+                       COUNT(*) FILTER (WHERE a.tutar IS NULL),
+                       COALESCE(SUM(a.tutar) FILTER (WHERE d.id IS NULL), 0)
+                FROM adaylar a
+                LEFT JOIN debt_item d
+                       ON d.unit_id = a.unit_id AND d.type = 'DUES' AND d.period_month = a.donem
+            """, _aidat_parametreleri(site_id, baslangic, bitis, tutar_plani))
+            donem, daire, eklenecek, guncellenecek, degismeyecek, tutarsiz, toplam = cur.fetchone()
+        return {"donem": donem, "daire": daire, "eklenecek": eklenecek, "guncellenecek": guncellenecek,
+                "degismeyecek": degismeyecek, "tutarsiz": tutarsiz, "toplam_tutar": float(toplam), "hata": None}
+    except Exception as e:
+        return {"hata": f"Önizleme hatası: {e}"}
+
+def add_bulk_dues(site_id, amount, period_date, kuru_calistirma=False):
+    """
+    Tek bir ay için sitedeki muaf olmayan tüm dairelere aidat borcu yazar (add_bulk_dues_range'in
+    tek aylık hâli). Dönem ayın ilk gününe çekilir; o döneme zaten aidatı olan daireler atlanır.
+    kuru_calistirma=True ise yazmadan "fark" raporu döner.
+    Dönüş: {"eklenen": int, "atlanan": int, "fark": DataFrame, "hata": str | None}
+    """
+    sonuc = add_bulk_dues_range(site_id, period_date, period_date, {period_date: amount},
+                                guncelle=False, kuru_calistirma=kuru_calistirma)
+    return {"eklenen": sonuc["eklenen"], "atlanan": sonuc["atlanan"], "fark": sonuc["fark"], "hata": sonuc["hata"]}
+
+def process_bulk_fuel_csv(site_id, df_yuklenen, kuru_calistirma=False, gorulen_anahtarlar=None):
+    """
+    Daire bazlı yakıt listesini toplu yükler. Daireler sitenin tek seferde çekilen daire
+    haritasıyla eşlenir, tutar/dönem doğrulaması pandas içinde yapılır ve geçerli satırlar
+    COPY ile geçici tabloya alınıp tek INSERT ... ON CONFLICT ile debt_item'a işlenir.
+    Tutarı boş veya 0 olan satırlar sessizce atlanır. Aynı daire + dönem ikinci kez geçerse (dosyanın
+    önceki parçaları için gorulen_anahtarlar) ilki yazılır, sonrakiler "tekrarlanan" olarak döner.
+    kuru_calistirma=True ise debt_item'a yazılmaz; sayılar ve satır bazlı "fark" raporu
+    (eşleşmeyen satırlar dahil) aynı hazırlık adımlarından sonra tek sorguyla hesaplanır.
+    Dönüş: {"eklenen", "guncellenen", "degismeyen": int,
+            "eslesmeyen", "tekrarlanan", "gecersiz", "fark": DataFrame, "hata": str | None}
+    Hatalar st ile gösterilmez, "hata" alanında döner; fonksiyon Streamlit dışında da çalışır.
+    """
+    sonuc = _bos_aktarim_sonucu()
+    try:
+        df = df_yuklenen.copy()
+        df.columns = [str(c).strip() for c in df.columns]
+        df["expected_amount"] = tr_sayiya_cevir(df["Tutar"])
+        df["period_month"] = pd.to_datetime(df["Donem"], errors="coerce", dayfirst=True, format="mixed") \
+            .dt.to_period("M").dt.start_time.dt.date
+
+        # Boş / sıfır tutarlı satırlar yakıt kullanılmadığı anlamına gelir, hata değildir
+        ham_tutar = _metin_sutunu(df["Tutar"])
+        bos = (ham_tutar == "") | (df["expected_amount"] == 0)
+        df = df[~bos]
+
+        gecersiz = df["expected_amount"].isna() | (df["expected_amount"] < 0) | df["period_month"].isna()
+        sonuc["gecersiz"] = df[gecersiz].drop(columns=["expected_amount", "period_month"])
+        df = df[~gecersiz]
+
+        with db_cursor() as cur:
+            df = _daireleri_esle(df, _site_daire_haritasi(cur, site_id))
+            eslesmedi = df["unit_id"].isna()
+            sonuc["eslesmeyen"] = df[eslesmedi].drop(columns=["unit_id", "expected_amount", "period_month"])
+            df = df[~eslesmedi]
+
+            df = df.assign(type="FUEL")
+            tekrar = _tekrar_edenler(df, gorulen_anahtarlar)
+            sonuc["tekrarlanan"] = df[tekrar].drop(columns=["unit_id", "Neden", "expected_amount", "period_month", "type"])
+            df = df[~tekrar]
+
+            _borc_aktarim_tablosu(cur)
+            copy_dataframe(cur, df, "tmp_borc_aktarim", ["unit_id", "type", "period_month", "expected_amount"])
+            if kuru_calistirma:
+                sonuc["fark"] = _fark_hesapla(cur, site_id, "SELECT * FROM tmp_borc_aktarim")
+                return _eslesmeyenleri_farka_ekle(_fark_sayilari(sonuc, sonuc["fark"]))
+            sonuc["eklenen"], sonuc["guncellenen"] = _borc_aktarimini_birlestir(cur)
+        if sonuc["eklenen"] or sonuc["guncellenen"]:
+            olay_gecersiz_kil("debt_item", site_id)
+
+        sonuc["degismeyen"] = len(df) - sonuc["eklenen"] - sonuc["guncellenen"]
+        return sonuc
+    except Exception as e:
+        sonuc["hata"] = f"Dosya işlenirken hata oluştu: {e}"
+        return sonuc
+
+def process_bulk_fuel_csv_stream(site_id, dosya, kuru_calistirma=False, ilerleme=None):
+    """Yakıt dosyasını parça parça okuyup process_bulk_fuel_csv ile yükler (bkz. akisla_aktar)."""
+    def isle(parca, ilk, gorulen_anahtarlar):
+        return process_bulk_fuel_csv(site_id, parca, kuru_calistirma, gorulen_anahtarlar)
+    return akisla_aktar(dosya, isle, ilerleme=ilerleme, kuru_calistirma=kuru_calistirma)
+
+def toplu_yakit_yukle(site_id, data_df, donem):
+    """Tüm satırlar için aynı dönemi kullanarak yakıt listesini yükler (process_bulk_fuel_csv)."""
+    return process_bulk_fuel_csv(site_id, data_df.assign(Donem=donem))
+
+# Geçmiş borç şablonundaki sütunların hangi borç türüne ve dönemine yazılacağı
+VARSAYILAN_GECMIS_BORC_ESLEMESI = [
+    {"sutun": "Geçmiş Aidat Borcu", "tur": "DUES", "donem": "2025-12-31"},
+    {"sutun": "Ekim Yakıt", "tur": "FUEL", "donem": "2025-10-01"},
+    {"sutun": "Kasım Yakıt", "tur": "FUEL", "donem": "2025-11-01"},
+    {"sutun": "Aralık Yakıt", "tur": "FUEL", "donem": "2025-12-01"},
+    {"sutun": "Diğer Eksik Ödemeler", "tur": "OTHER", "donem": "2025-12-30"},
+]
+
+def _gecmis_borclari_temizle(cur, site_id, temizlik_siniri):
+    """Bu sitenin temizlik_siniri'ndan önceki, hiç ödeme almamış borçlarını siler (diğer siteler etkilenmez)."""
+    cur.execute("""
+        DELETE FROM debt_item d
+        USING unit u, building b
+        WHERE d.unit_id = u.id AND u.building_id = b.id
+          AND b.complex_id = %s
+          AND d.period_month < %s
+          AND d.status = 'UNPAID' AND d.paid_amount = 0
+    """, (site_id, temizlik_siniri))
+    return cur.rowcount
+
+def process_past_debts_csv(site_id, df_gecmis, esleme=None, temizlik_siniri=None, kuru_calistirma=False,
+                           silinecekleri_raporla=True, gorulen_anahtarlar=None):
+    """
+    Geniş formatlı (daire başına bir satır, borç kalemi başına bir sütun) geçmiş borç listesini
+    esleme'ye göre uzun formata (daire, tür, dönem, tutar) çevirip toplu yükler.
+    Blok + daire tek seferde çekilen daire haritasıyla eşlenir, tutarlar vektörel olarak
+    sayıya çevrilir, satırlar COPY ile geçici tabloya alınıp tek sorguyla birleştirilir.
+    esleme: [{"sutun": ..., "tur": "DUES"|"FUEL"|"OTHER", "donem": tarih}, ...]
+            (verilmezse VARSAYILAN_GECMIS_BORC_ESLEMESI)
+    temizlik_siniri: verilirse önce YALNIZCA bu sitenin bu tarihten önceki, hiç ödeme almamış
+                     borçları silinir.
+    kuru_calistirma=True ise hiçbir şey silinmez/yazılmaz; fark temizlik yapılmış gibi hesaplanır ve
+    silinecek borçlar da raporda yer alır (silinecekleri_raporla=False ise listelenmez).
+    gorulen_anahtarlar: parça parça aktarımda önceki parçaların (daire, tür, dönem) anahtarları;
+    bunlarla çakışan satırlar yazılmaz, "tekrarlanan" olarak döner.
+    Dönüş: process_bulk_fuel_csv ile aynı yapıdadır.
+    """
+    sonuc = _bos_aktarim_sonucu()
+    esleme_df = pd.DataFrame(esleme or VARSAYILAN_GECMIS_BORC_ESLEMESI)
+    try:
+        df = df_gecmis.copy()
+        df.columns = [str(c).strip() for c in df.columns]
+        esleme_df = esleme_df[esleme_df["sutun"].isin(df.columns)]
+        if esleme_df.empty:
+            raise ValueError("Dosyada eşleme tablosundaki borç sütunlarından hiçbiri bulunamadı.")
+        esleme_df = esleme_df.assign(donem=pd.to_datetime(esleme_df["donem"]).dt.date)
+
+        with db_cursor() as cur:
+            # Blok ve Daireyi beraber eşliyoruz (geniş tabloda, satır başına bir kez)
+            df = _daireleri_esle(df, _site_daire_haritasi(cur, site_id))
+            eslesmedi = df["unit_id"].isna()
+            sonuc["eslesmeyen"] = df[eslesmedi].drop(columns=["unit_id"])
+            df = df[~eslesmedi]
+
+            # Geniş -> uzun: her (daire, borç sütunu) bir satır
+            uzun = df.melt(id_vars=["Blok", "Daire No", "unit_id"], value_vars=list(esleme_df["sutun"]),
+                           var_name="sutun", value_name="Değer")
+            uzun = uzun.merge(esleme_df, on="sutun", how="left")
+            uzun["expected_amount"] = tr_sayiya_cevir(uzun["Değer"])
+
+            bos = (_metin_sutunu(uzun["Değer"]) == "") | (uzun["expected_amount"] == 0)
+            uzun = uzun[~bos]
+            gecersiz = uzun["expected_amount"].isna() | (uzun["expected_amount"] < 0)
+            sonuc["gecersiz"] = uzun.loc[gecersiz, ["Blok", "Daire No", "sutun", "Değer"]].rename(columns={"sutun": "Sütun"})
+            uzun = uzun[~gecersiz].rename(columns={"tur": "type", "donem": "period_month"})
+
+            tekrar = _tekrar_edenler(uzun, gorulen_anahtarlar)
+            sonuc["tekrarlanan"] = uzun.loc[tekrar, ["Blok", "Daire No", "sutun", "Değer"]].rename(columns={"sutun": "Sütun"})
+            uzun = uzun[~tekrar]
+
+            if kuru_calistirma:
+                _borc_aktarim_tablosu(cur)
+                copy_dataframe(cur, uzun, "tmp_borc_aktarim", ["unit_id", "type", "period_month", "expected_amount"])
+                sonuc["fark"] = _fark_hesapla(cur, site_id, "SELECT * FROM tmp_borc_aktarim", sinir=temizlik_siniri,
+                                              silinecekler=silinecekleri_raporla)
+                return _eslesmeyenleri_farka_ekle(_fark_sayilari(sonuc, sonuc["fark"]))
+
+            if temizlik_siniri is not None:
+                # Önce bu sitenin yanlış yüklenmiş eski borçlarını temizleyelim
+                _gecmis_borclari_temizle(cur, site_id, temizlik_siniri)
+
+            _borc_aktarim_tablosu(cur)
+            copy_dataframe(cur, uzun, "tmp_borc_aktarim", ["unit_id", "type", "period_month", "expected_amount"])
+            sonuc["eklenen"], sonuc["guncellenen"] = _borc_aktarimini_birlestir(cur)
+        # Temizlik adımı ekleme olmasa da borç silmiş olabilir
+        olay_gecersiz_kil("debt_item", site_id)
+
+        sonuc["degismeyen"] = len(uzun) - sonuc["eklenen"] - sonuc["guncellenen"]
+        return sonuc
+    except Exception as e:
+        sonuc["hata"] = f"Hata: {e}"
+        return sonuc
+
+def process_past_debts_csv_stream(site_id, dosya, esleme=None, temizlik_siniri=None, kuru_calistirma=False, ilerleme=None):
+    """
+    Geçmiş borç dosyasını parça parça okuyup process_past_debts_csv ile yükler (bkz. akisla_aktar).
+    Eski borç temizliği ilk parçadan önce ayrı bir işlemde bir kez yapılır. Kuru çalıştırmada silme
+    yapılmaz; her parçanın farkı temizlik yapılmış gibi hesaplanır, silinecek borçları yalnızca ilk
+    parça listeler.
+    """
+    def temizle():
         try:
-            cur = conn.cursor()
-            
-            # Önce mevcut yanlış yüklenen eski borçları temizleyelim (Opsiyonel ama önerilir)
-            cur.execute("DELETE FROM debt_item WHERE period_month < '2026-01-01' AND status = 'UNPAID'")
-            
-            for index, row in df_gecmis.iterrows():
-                # Blok ve Daireyi beraber sorguluyoruz
-                blok_adi = str(row.get('Blok', '')).strip()
-                d_no = str(row.get('Daire No', '')).strip()
-                
-                cur.execute("""
-                    SELECT u.id 
-                    FROM unit u
-                    JOIN building b ON u.building_id = b.id 
-                    WHERE b.name = %s AND u.unit_number = %s AND b.complex_id = %s
-                """, (blok_adi, d_no, site_id))
-                unit_res = cur.fetchone()
-                
-                if unit_res:
-                    u_id = unit_res[0]
-                    borc_kalemleri = [
-                        (row.get('Geçmiş Aidat Borcu', 0), 'DUES', '2025-12-31'),
-                        (row.get('Ekim Yakıt', 0), 'FUEL', '2025-10-01'),
-                        (row.get('Kasım Yakıt', 0), 'FUEL', '2025-11-01'),
-                        (row.get('Aralık Yakıt', 0), 'FUEL', '2025-12-01'),
-                        (row.get('Diğer Eksik Ödemeler', 0), 'OTHER', '2025-12-30')
-                    ]
-                    
-                    for tutar, tur, tarih in borc_kalemleri:
-                        try:
-                            tutar_val = float(str(tutar).replace(',', '.')) if pd.notnull(tutar) else 0
-                        except: tutar_val = 0
-
-                        if tutar_val > 0:
-                            cur.execute("""
-                                INSERT INTO debt_item (unit_id, type, expected_amount, period_month, status)
-                                VALUES (%s, %s, %s, %s, 'UNPAID')
-                                ON CONFLICT (unit_id, type, period_month) DO UPDATE SET expected_amount = EXCLUDED.expected_amount
-                            """, (u_id, tur, tutar_val, tarih))
-                            success_count += 1
-            
-            conn.commit()
-            cur.close()
-            conn.close()
-            return success_count
+            with db_cursor() as cur:
+                _gecmis_borclari_temizle(cur, site_id, temizlik_siniri)
+            olay_gecersiz_kil("debt_item", site_id)
         except Exception as e:
-            st.error(f"Hata: {e}")
-            return 0
-    return 0
+            return f"Eski borç temizliği hatası: {e}"
+        return None
+
+    def isle(parca, ilk, gorulen_anahtarlar):
+        if kuru_calistirma:
+            return process_past_debts_csv(site_id, parca, esleme, temizlik_siniri, True, silinecekleri_raporla=ilk,
+                                          gorulen_anahtarlar=gorulen_anahtarlar)
+        return process_past_debts_csv(site_id, parca, esleme, gorulen_anahtarlar=gorulen_anahtarlar)
+
+    hazirlik = temizle if temizlik_siniri is not None and not kuru_calistirma else None
+    return akisla_aktar(dosya, isle, ilerleme=ilerleme, hazirlik=hazirlik, kuru_calistirma=kuru_calistirma)
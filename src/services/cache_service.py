@@ -0,0 +1,115 @@
+import os
+import copy
+import threading
+from functools import wraps
+
+from cachetools import TTLCache
+
+# Varsayılan yaşam süresi (.env: CACHE_TTL_SECONDS). Yazma servisleri ilgili anahtarları ayrıca siler;
+# TTL yalnızca uygulama dışından (psql, başka süreç) yapılan değişiklikler için üst sınırdır.
+VARSAYILAN_TTL_SN = int(os.getenv("CACHE_TTL_SECONDS", "300"))
+
+# varlık -> TTLCache. Anahtarlar (site_id, unit_id, fonksiyon, argümanlar) biçimindedir; site veya daireye
+# bağlı olmayan girişlerde ilgili alan None'dır.
+_onbellekler = {}
+_kilit = threading.RLock()
+_metrikler = {}
+# Geçersiz kılma nesli: sorgu sürerken gelen bir geçersiz kılmadan sonra eski sonucun yazılmasını önler
+_nesil = {}
+_yerel = threading.local()
+
+# Hangi tablo yazıldığında hangi varlıkların eskidiği. Yazma servisleri (ve LISTEN/NOTIFY dinleyicisi)
+# olay_gecersiz_kil ile bu eşlemeyi kullanır.
+TABLO_VARLIKLARI = {
+    "payment": ("daire_bakiyesi", "borc_haritasi", "daire_extresi", "daire_odemeleri",
+                "genel_istatistik", "aylik_ozet"),
+    "debt_item": ("daire_bakiyesi", "borc_haritasi", "daire_extresi", "genel_istatistik", "aylik_ozet"),
+    "account_transaction": ("genel_istatistik", "aylik_ozet", "gider_listesi"),
+    "employee": ("personel_listesi",),
+    "unit": ("daire_rehberi", "daire_sablonu", "blok_daireleri", "borc_haritasi"),
+    "building": ("blok_rehberi", "daire_rehberi", "daire_sablonu", "blok_daireleri", "borc_haritasi"),
+    "complex_properties": ("site_rehberi",),
+}
+
+def onbellekle(varlik, kapsam, ttl=VARSAYILAN_TTL_SN, boyut=256):
+    """
+    Okuma servisini varlık bazında TTL + boyut sınırlı önbelleğe alır.
+    kapsam(*args, **kwargs) -> (site_id, unit_id): girişin hangi site/daireye ait olduğu;
+    geçersiz kılma bu kapsama göre yapılır. Dönen değerin kopyası verilir, böylece çağıranın
+    yaptığı değişiklikler önbelleği bozmaz.
+    """
+    with _kilit:
+        # Aynı varlığı paylaşan servisler tek önbellek kullanır; ilk tanımın TTL/boyutu geçerlidir
+        if varlik not in _onbellekler:
+            _onbellekler[varlik] = TTLCache(maxsize=boyut, ttl=ttl)
+            _metrikler[varlik] = {"isabet": 0, "iska": 0}
+            _nesil[varlik] = 0
+
+    def dekorator(fonksiyon):
+        @wraps(fonksiyon)
+        def sarmalayici(*args, **kwargs):
+            site_id, unit_id = kapsam(*args, **kwargs)
+            anahtar = (site_id, unit_id, fonksiyon.__qualname__, args, tuple(sorted(kwargs.items())))
+            with _kilit:
+                onbellek = _onbellekler[varlik]
+                if anahtar in onbellek:
+                    _metrikler[varlik]["isabet"] += 1
+                    return copy.deepcopy(onbellek[anahtar])
+                _metrikler[varlik]["iska"] += 1
+                nesil = _nesil[varlik]
+
+            _yerel.onbelleklenmesin = False
+            sonuc = fonksiyon(*args, **kwargs)
+            if not _yerel.onbelleklenmesin:
+                with _kilit:
+                    if _nesil[varlik] == nesil:
+                        _onbellekler[varlik][anahtar] = copy.deepcopy(sonuc)
+            return sonuc
+        return sarmalayici
+    return dekorator
+
+def sonucu_onbellege_alma():
+    """Hata yakalayıp varsayılan değer dönen servisler çağırır: bu çağrının sonucu önbelleğe yazılmaz."""
+    _yerel.onbelleklenmesin = True
+
+def gecersiz_kil(varliklar, site_id=None, unit_id=None):
+    """
+    Verilen varlıklarda kapsamı eşleşen girişleri siler.
+    site_id verilirse yalnızca o sitenin (ve siteye bağlı olmayan daire girişlerinin),
+    unit_id verilirse yalnızca o dairenin girişleri ile daireye bağlı olmayan site girişleri silinir.
+    İkisi de None ise varlıkların tamamı temizlenir. Silinen giriş sayısını döner.
+    """
+    silinen = 0
+    with _kilit:
+        for varlik in varliklar:
+            onbellek = _onbellekler.get(varlik)
+            if onbellek is None:
+                continue
+            _nesil[varlik] += 1
+            for anahtar in list(onbellek.keys()):
+                giris_site, giris_daire = anahtar[0], anahtar[1]
+                if site_id is not None and giris_site is not None and giris_site != site_id:
+                    continue
+                if unit_id is not None and giris_daire is not None and giris_daire != unit_id:
+                    continue
+                onbellek.pop(anahtar, None)
+                silinen += 1
+    return silinen
+
+def olay_gecersiz_kil(tablo, site_id=None, unit_id=None):
+    """tablo'ya yapılan bir yazmanın eskittiği önbellek girişlerini siler (bkz. TABLO_VARLIKLARI)."""
+    return gecersiz_kil(TABLO_VARLIKLARI.get(tablo, ()), site_id, unit_id)
+
+def tum_onbellegi_temizle():
+    with _kilit:
+        for varlik, onbellek in _onbellekler.items():
+            _nesil[varlik] += 1
+            onbellek.clear()
+
+def get_onbellek_metrikleri():
+    """Varlık bazında giriş sayısı, kapasite ve isabet/ıska sayaçlarının anlık kopyasını döner."""
+    with _kilit:
+        return {
+            varlik: {"giris": len(_onbellekler[varlik]), "kapasite": _onbellekler[varlik].maxsize, **sayac}
+            for varlik, sayac in _metrikler.items()
+        }
@@ -1,40 +1,72 @@
+import logging
+
 import pandas as pd
-from src.database.connection import get_db_engine, get_connection
+from src.database.connection import get_db_engine, db_cursor
+from src.services.cache_service import onbellekle, sonucu_onbellege_alma, olay_gecersiz_kil
+
+logger = logging.getLogger(__name__)
+
+BORC_TURU_ANAHTARLARI = {'DUES': "aidat", 'FUEL': "yakit", 'OTHER': "diger"}
+
+def bos_borc_detayi():
+    return {"aidat": 0.0, "yakit": 0.0, "diger": 0.0, "toplam": 0.0}
 
+def _borc_detayi(aidat, yakit, diger):
+    detay = {"aidat": float(aidat), "yakit": float(yakit), "diger": float(diger)}
+    detay["toplam"] = detay["aidat"] + detay["yakit"] + detay["diger"]
+    return detay
+
+@onbellekle("daire_bakiyesi", kapsam=lambda daire_id: (None, daire_id), boyut=2048)
 def get_detayli_borc(daire_id):
-    conn = get_connection()
-    detay = {"aidat": 0.0, "yakit": 0.0, "toplam": 0.0}
-    if conn:
-        try:
-            cur = conn.cursor()
-            # Aidat ve Yakıtı ayrı ayrı topluyoruz
+    """Dairenin açık bakiyesini tür kırılımıyla unit_balance'tan (birincil anahtarla) okur."""
+    detay = bos_borc_detayi()
+    try:
+        with db_cursor() as cur:
+            # Bakiye tetikleyicilerle güncel tutulur; borç kalemlerini yeniden toplamaya gerek yok
+            cur.execute("SELECT dues, fuel, other FROM unit_balance WHERE unit_id = %s", (daire_id,))
+            row = cur.fetchone()
+            if row:
+                detay = _borc_detayi(*row)
+    except Exception:
+        logger.exception("Daire bakiyesi hatası")
+        sonucu_onbellege_alma()
+    return detay
+
+@onbellekle("borc_haritasi", kapsam=lambda site_id, blok_id=None: (site_id, None))
+def get_toplu_borc_haritasi(site_id, blok_id=None):
+    """
+    Sitedeki (blok_id verilirse yalnızca o bloktaki) tüm dairelerin borç dökümünü
+    unit_balance özet tablosundan tek sorguyla getirir: {unit_id: {"aidat", "yakit", "diger", "toplam"}}.
+    Borcu olmayan daireler de sıfır değerlerle haritada yer alır.
+    """
+    harita = {}
+    try:
+        with db_cursor() as cur:
             query = """
-                SELECT type, SUM(expected_amount) 
-                FROM debt_item 
-                WHERE unit_id = %s AND status != 'PAID'
-                GROUP BY type
+                SELECT u.id, COALESCE(ub.dues, 0), COALESCE(ub.fuel, 0), COALESCE(ub.other, 0)
+                FROM unit u
+                JOIN building b ON u.building_id = b.id
+                LEFT JOIN unit_balance ub ON ub.unit_id = u.id
+                WHERE b.complex_id = %s AND (%s IS NULL OR b.id = %s)
             """
-            cur.execute(query, (daire_id,))
-            rows = cur.fetchall()
-            for row in rows:
-                if row[0] == 'DUES': detay["aidat"] = float(row[1])
-                if row[0] == 'FUEL': detay["yakit"] = float(row[1])
-            
-            detay["toplam"] = detay["aidat"] + detay["yakit"]
-            cur.close()
-            conn.close()
-        except:
-            pass
-    return detay
+            cur.execute(query, (site_id, blok_id, blok_id))
+            for unit_id, aidat, yakit, diger in cur.fetchall():
+                harita[unit_id] = _borc_detayi(aidat, yakit, diger)
+    except Exception:
+        logger.exception("Toplu borç haritası hatası")
+        sonucu_onbellege_alma()
+    return harita
 
+@onbellekle("daire_extresi", kapsam=lambda daire_id: (None, daire_id), boyut=1024)
 def get_daire_extresi(daire_id):
     engine = get_db_engine()
     if engine:
         try:
             query = """
-                SELECT period_month, type, expected_amount 
+                SELECT period_month, type, remaining_amount 
                 FROM debt_item 
-                WHERE unit_id = %s AND status != 'PAID'
+                -- idx_debt_item_unit_open kısmi indeksiyle aynı koşul: borçlar dönem sırasıyla, sıralamasız gelir
+                WHERE unit_id = %s AND status IN ('UNPAID', 'PARTIAL')
                 ORDER BY period_month ASC
             """
             df = pd.read_sql(query, engine, params=(daire_id,))
@@ -51,6 +83,39 @@ def get_daire_extresi(daire_id):
                 # Sütun isimlerini Türkçeleştirme
                 df.columns = ['Dönem', 'Borç Türü', 'Tutar (TL)']
             return df
-        except:
+        except Exception:
+            logger.exception("Daire ekstresi hatası")
+            sonucu_onbellege_alma()
             return pd.DataFrame()
     return pd.DataFrame()
+
+def dogrula_odenen_tutarlar(site_id=None, duzelt=False):
+    """
+    debt_item.paid_amount ve durum alanlarını payment_debt üzerinden toplu yeniden hesaplar
+    (fn_verify_debt_paid_amounts) ve sapan kayıtları DataFrame olarak döner.
+    duzelt=True ise sapmalar aynı işlemde düzeltilir.
+    """
+    try:
+        with db_cursor() as cur:
+            cur.execute("SELECT * FROM fn_verify_debt_paid_amounts(%s, %s)", (site_id, duzelt))
+            rows = cur.fetchall()
+        if duzelt and rows:
+            olay_gecersiz_kil("debt_item", site_id)
+        return pd.DataFrame(rows, columns=['Borç ID', 'Daire ID', 'Kayıtlı Ödenen', 'Gerçek Ödenen', 'Kayıtlı Durum', 'Doğru Durum'])
+    except Exception:
+        logger.exception("Bakiye doğrulama hatası")
+        return None
+
+def bakiyeleri_yeniden_olustur(site_id=None):
+    """
+    Daire bakiye özetini (unit_balance; blok / site görünümleri bundan toplanır)
+    debt_item üzerinden baştan hesaplar (fn_rebuild_balances). Başarılıysa True döner.
+    """
+    try:
+        with db_cursor() as cur:
+            cur.execute("SELECT fn_rebuild_balances(%s)", (site_id,))
+        olay_gecersiz_kil("debt_item", site_id)
+        return True
+    except Exception:
+        logger.exception("Bakiye özeti yenileme hatası")
+        return False
@@ -0,0 +1,73 @@
+import logging
+
+from src.database.connection import db_cursor
+from src.services.cache_service import onbellekle, sonucu_onbellege_alma
+
+logger = logging.getLogger(__name__)
+
+# Site, blok, daire ve personel listeleri nadiren değişir ama her sayfa çiziminde okunur.
+# Hepsi önbellekten gelir; TTL dolunca veya ilgili tablo yazılınca yenilenir.
+REHBER_TTL_SN = 600
+
+def _liste_getir(sorgu, parametreler, sutunlar):
+    # Giriş ekranı bu modülü kullanır; pandas ilk sorguda yüklenir ki ilk çizim beklemesin
+    import pandas as pd
+
+    try:
+        with db_cursor() as cur:
+            cur.execute(sorgu, parametreler)
+            return pd.DataFrame(cur.fetchall(), columns=sutunlar)
+    except Exception:
+        logger.exception("Rehber sorgu hatası")
+        sonucu_onbellege_alma()
+        return pd.DataFrame(columns=sutunlar)
+
+@onbellekle("site_rehberi", kapsam=lambda: (None, None), ttl=REHBER_TTL_SN, boyut=1)
+def get_siteler():
+    """Giriş ekranındaki site listesi: DataFrame[id, name]."""
+    return _liste_getir("SELECT id, name FROM complex_properties ORDER BY name", (), ["id", "name"])
+
+@onbellekle("blok_rehberi", kapsam=lambda site_id: (site_id, None), ttl=REHBER_TTL_SN)
+def get_bloklar(site_id):
+    """Sitenin blokları: DataFrame[id, name]."""
+    return _liste_getir("SELECT id, name FROM building WHERE complex_id = %s ORDER BY name",
+                        (site_id,), ["id", "name"])
+
+@onbellekle("blok_daireleri", kapsam=lambda site_id, blok_id: (site_id, None), ttl=REHBER_TTL_SN, boyut=1024)
+def get_blok_daireleri(site_id, blok_id):
+    """Bloğun daireleri numara sırasıyla: DataFrame[id, unit_number, owner_name]."""
+    return _liste_getir("""
+        SELECT u.id, u.unit_number, u.owner_name
+        FROM unit u
+        JOIN building b ON u.building_id = b.id
+        WHERE b.complex_id = %s AND u.building_id = %s
+        ORDER BY u.unit_number::int
+    """, (site_id, blok_id), ["id", "unit_number", "owner_name"])
+
+@onbellekle("daire_rehberi", kapsam=lambda site_id: (site_id, None), ttl=REHBER_TTL_SN)
+def get_daire_etiketleri(site_id):
+    """Tahsilat ekranı için 'Blok - Daire N (Malik)' etiketleri: DataFrame[id, label]."""
+    return _liste_getir("""
+        SELECT u.id, b.name || ' - Daire ' || u.unit_number || ' (' || u.owner_name || ')' as label
+        FROM unit u
+        JOIN building b ON u.building_id = b.id
+        WHERE b.complex_id = %s
+        ORDER BY b.name ASC, u.unit_number::int ASC
+    """, (site_id,), ["id", "label"])
+
+@onbellekle("daire_sablonu", kapsam=lambda site_id: (site_id, None), ttl=REHBER_TTL_SN)
+def get_daire_sablonu(site_id):
+    """Toplu yükleme şablonlarının daire kısmı: DataFrame["Blok", "Daire No", "Ev Sahibi"]."""
+    return _liste_getir("""
+        SELECT b.name, u.unit_number, u.owner_name
+        FROM unit u
+        JOIN building b ON u.building_id = b.id
+        WHERE b.complex_id = %s
+        ORDER BY b.name ASC, u.unit_number::int ASC
+    """, (site_id,), ["Blok", "Daire No", "Ev Sahibi"])
+
+@onbellekle("personel_listesi", kapsam=lambda site_id: (site_id, None), ttl=REHBER_TTL_SN)
+def get_personel_listesi(site_id):
+    """Sitenin personelleri: DataFrame[id, name, role, salary]."""
+    return _liste_getir("SELECT id, name, role, salary FROM employee WHERE complex_id = %s ORDER BY name",
+                        (site_id,), ["id", "name", "role", "salary"])
@@ -1,21 +1,40 @@
+import logging
+
+import pandas as pd
 import streamlit as st
-from src.database.connection import get_connection
+from src.database.connection import db_cursor
+from src.services.cache_service import onbellekle, sonucu_onbellege_alma, olay_gecersiz_kil
+
+logger = logging.getLogger(__name__)
+
+@onbellekle("gider_listesi", kapsam=lambda site_id: (site_id, None))
+def get_giderler(site_id):
+    """Sitenin giderleri en yeniden eskiye: DataFrame["Tarih", "Kategori", "Tutar", "Açıklama"]."""
+    try:
+        with db_cursor() as cur:
+            cur.execute("""
+                SELECT process_date, category, amount, description
+                FROM account_transaction
+                WHERE complex_id = %s AND type = 'EXPENSE'
+                ORDER BY process_date DESC
+            """, (site_id,))
+            return pd.DataFrame(cur.fetchall(), columns=["Tarih", "Kategori", "Tutar", "Açıklama"])
+    except Exception:
+        logger.exception("Gider listesi hatası")
+        sonucu_onbellege_alma()
+        return pd.DataFrame(columns=["Tarih", "Kategori", "Tutar", "Açıklama"])
 
 def kaydet_gider(site_id, miktar, kategori, aciklama):
-    conn = get_connection()
-    if conn:
-        try:
-            cur = conn.cursor()
+    try:
+        with db_cursor() as cur:
             # 'transaction_type' yerine 'type'
             query = """
                 INSERT INTO account_transaction (complex_id, type, category, amount, process_date, description)
                 VALUES (%s, 'EXPENSE', %s, %s, CURRENT_TIMESTAMP, %s)
             """
             cur.execute(query, (site_id, kategori, miktar, aciklama))
-            conn.commit()
-            cur.close()
-            conn.close()
-            return True
-        except Exception as e:
-            st.error(f"Gider kaydedilirken hata oluştu: {e}")
-            return False
+        olay_gecersiz_kil("account_transaction", site_id)
+        return True
+    except Exception as e:
+        st.error(f"Gider kaydedilirken hata oluştu: {e}")
+        return False
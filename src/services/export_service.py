@@ -0,0 +1,96 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.database.connection import db_connection
+
+# XLSX çıktısı isteğe bağlıdır: openpyxl kurulu değilse bu biçim listelenmez
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+
+PARCA_BOYUTU = 5000
+
+# Güncel borç listesi: etiketler ve Türkçe değerler doğrudan SQL'de üretilir, böylece
+# COPY çıktısı da Parquet/XLSX parçaları da aynı sütunlarla gelir.
+_BORC_LISTESI_SORGUSU = """
+    SELECT b.name AS "Blok",
+           u.unit_number AS "Daire No",
+           u.owner_name AS "Ev Sahibi",
+           CASE d.type WHEN 'DUES' THEN 'Aidat' WHEN 'FUEL' THEN 'Yakıt' ELSE 'Diğer' END AS "Borç Türü",
+           d.expected_amount AS "Tutar (TL)",
+           d.remaining_amount AS "Kalan (TL)",
+           TO_CHAR(d.period_month, 'MM/YYYY') AS "Dönem",
+           CASE d.status WHEN 'PAID' THEN 'Ödendi' WHEN 'PARTIAL' THEN 'Kısmi Ödendi' ELSE 'Ödenmedi' END AS "Ödeme Durumu"
+    FROM debt_item d
+    JOIN unit u ON d.unit_id = u.id
+    JOIN building b ON u.building_id = b.id
+    WHERE b.complex_id = %s
+    ORDER BY b.name ASC, u.unit_number::int ASC, d.period_month DESC
+"""
+
+_BORC_LISTESI_SEMASI = pa.schema([
+    ("Blok", pa.string()),
+    ("Daire No", pa.string()),
+    ("Ev Sahibi", pa.string()),
+    ("Borç Türü", pa.string()),
+    ("Tutar (TL)", pa.decimal128(12, 2)),
+    ("Kalan (TL)", pa.decimal128(12, 2)),
+    ("Dönem", pa.string()),
+    ("Ödeme Durumu", pa.string()),
+])
+
+def _satir_parcalari(conn, site_id, parca_boyutu):
+    """Sunucu tarafı (isimli) cursor ile listeyi parça parça okur; bellekte tek parça tutulur."""
+    cur = conn.cursor(name="borc_listesi_aktarimi")
+    cur.itersize = parca_boyutu
+    try:
+        cur.execute(_BORC_LISTESI_SORGUSU, (site_id,))
+        while True:
+            satirlar = cur.fetchmany(parca_boyutu)
+            if not satirlar:
+                break
+            yield satirlar
+    finally:
+        cur.close()
+
+def _csv_yaz(conn, site_id, hedef, parca_boyutu):
+    # COPY ... TO STDOUT: satırlar sunucudan doğrudan dosyaya akar. BOM, Excel'in UTF-8'i tanıması için.
+    hedef.write("\ufeff".encode("utf-8"))
+    with conn.cursor() as cur:
+        sorgu = cur.mogrify(_BORC_LISTESI_SORGUSU, (site_id,)).decode("utf-8")
+        cur.copy_expert(f"COPY ({sorgu}) TO STDOUT WITH (FORMAT csv, HEADER)", hedef)
+
+def _parquet_yaz(conn, site_id, hedef, parca_boyutu):
+    with pq.ParquetWriter(hedef, _BORC_LISTESI_SEMASI) as yazici:
+        for satirlar in _satir_parcalari(conn, site_id, parca_boyutu):
+            yazici.write_table(pa.Table.from_pylist(
+                [dict(zip(_BORC_LISTESI_SEMASI.names, s)) for s in satirlar], schema=_BORC_LISTESI_SEMASI))
+
+def _xlsx_yaz(conn, site_id, hedef, parca_boyutu):
+    # write_only kitap satırları diske yazarak ilerler; tüm tablo bellekte tutulmaz
+    kitap = Workbook(write_only=True)
+    sayfa = kitap.create_sheet("Borç Listesi")
+    sayfa.append(_BORC_LISTESI_SEMASI.names)
+    for satirlar in _satir_parcalari(conn, site_id, parca_boyutu):
+        for satir in satirlar:
+            sayfa.append(satir)
+    kitap.save(hedef)
+
+# biçim -> (etiket, mime, uzantı, yazıcı)
+BORC_LISTESI_BICIMLERI = {
+    "csv": ("CSV (Excel uyumlu)", "text/csv", "csv", _csv_yaz),
+    "parquet": ("Parquet", "application/vnd.apache.parquet", "parquet", _parquet_yaz),
+}
+if Workbook is not None:
+    BORC_LISTESI_BICIMLERI["xlsx"] = (
+        "Excel (XLSX)", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx", _xlsx_yaz)
+
+def borc_listesi_yaz(site_id, hedef, bicim="csv", parca_boyutu=PARCA_BOYUTU):
+    """
+    Sitenin güncel borç listesini Türkçe sütun adlarıyla hedef (ikili, yazılabilir dosya nesnesi)
+    içine parça parça yazar; CSV için COPY TO STDOUT, Parquet/XLSX için isimli cursor kullanılır.
+    bicim: BORC_LISTESI_BICIMLERI anahtarlarından biri.
+    """
+    yazici = BORC_LISTESI_BICIMLERI[bicim][3]
+    with db_connection() as conn:
+        yazici(conn, site_id, hedef, parca_boyutu)
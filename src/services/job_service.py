@@ -0,0 +1,226 @@
+import os
+import json
+import time
+import uuid
+import socket
+import inspect
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from psycopg2.extras import Json
+from src.database.connection import db_cursor
+
+logger = logging.getLogger(__name__)
+
+# Aynı anda çalışabilecek toplu iş sayısı (.env: JOB_WORKERS). Her iş havuzdan bir bağlantı kullanır,
+# bu yüzden DB_POOL_MAX değerinden küçük tutulmalıdır.
+IS_PARALELLIGI = int(os.getenv("JOB_WORKERS", "3"))
+# Bu süre boyunca updated_at'i yenilenmeyen RUNNING işler ve başka süreçlerden kalan QUEUED işler yarım kalmış
+# sayılır (sunucu yeniden başladı vb.)
+IS_ZAMAN_ASIMI_DK = int(os.getenv("JOB_STALE_MINUTES", "15"))
+# Çalışan işin updated_at'i en az bu sıklıkla yenilenir; ilerleme bildirmeyen işler (ör. aidat yansıtma)
+# zaman aşımına takılmasın diye süreden kısa tutulur.
+NABIZ_ARALIGI_SN = max(IS_ZAMAN_ASIMI_DK * 60 // 3, 1)
+
+AKTIF_DURUMLAR = ("QUEUED", "RUNNING")
+# İş sonucunda tablo başına saklanan satır sayısı (.env: JOB_RESULT_SAMPLE_ROWS). Tam fark raporları
+# JSONB'yi şişirmesin diye sayılar tam, satırlar örnek olarak tutulur.
+SONUC_ORNEK_SATIR = int(os.getenv("JOB_RESULT_SAMPLE_ROWS", "200"))
+
+# Süreç başına tek yürütücü: Streamlit yeniden çalıştırmalarından ve oturumlardan bağımsızdır.
+# İşler çoğunlukla veritabanında beklediği (COPY, set-based SQL) için iş parçacığı havuzu yeterlidir.
+_yurutucu = ThreadPoolExecutor(max_workers=IS_PARALELLIGI, thread_name_prefix="toplu-is")
+# Bu sürecin kimliği; kuyruğa alınan işlere yazılır (background_job.runner)
+SUREC_KIMLIGI = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_tarama_kilidi = threading.Lock()
+_son_tarama = None
+
+def _sonucu_serilestir(sonuc):
+    """
+    Servis sonucunu JSONB'ye yazılabilir hâle getirir. DataFrame'lerin ilk SONUC_ORNEK_SATIR satırı
+    'split' formatında, toplam satır sayısı ve ("İşlem" sütunu varsa) işlem bazında sayılarla saklanır.
+    """
+    serilestirilmis = {}
+    for alan, deger in (sonuc or {}).items():
+        if isinstance(deger, pd.DataFrame):
+            serilestirilmis[alan] = {
+                "__tablo__": json.loads(deger.head(SONUC_ORNEK_SATIR).to_json(
+                    orient="split", index=False, date_format="iso", default_handler=str)),
+                "satir": len(deger),
+                "islemler": {str(k): int(v) for k, v in deger["İşlem"].value_counts().items()}
+                            if "İşlem" in deger.columns else None,
+            }
+        else:
+            serilestirilmis[alan] = deger
+    return json.loads(json.dumps(serilestirilmis, default=str))
+
+def _tabloyu_coz(deger):
+    tablo = pd.DataFrame(deger["__tablo__"]["data"], columns=deger["__tablo__"]["columns"])
+    tablo.attrs["toplam_satir"] = deger.get("satir", len(tablo))
+    if deger.get("islemler") is not None:
+        tablo.attrs["islem_sayilari"] = deger["islemler"]
+    return tablo
+
+def _sonucu_coz(sonuc):
+    """
+    _sonucu_serilestir'in tersi: tablo alanlarını tekrar DataFrame'e çevirir. Tablolar örnek olabilir;
+    gerçek satır sayısı attrs["toplam_satir"], işlem sayıları attrs["islem_sayilari"] içindedir.
+    """
+    if sonuc is None:
+        return None
+    return {
+        alan: _tabloyu_coz(deger) if isinstance(deger, dict) and "__tablo__" in deger else deger
+        for alan, deger in sonuc.items()
+    }
+
+def _ilerleme_yaz(is_id, oran, mesaj):
+    with db_cursor() as cur:
+        cur.execute("""
+            UPDATE background_job
+            SET progress = %s, message = %s, updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (round(min(max(float(oran), 0.0), 1.0), 4), mesaj, is_id))
+
+def _nabiz_baslat(is_id):
+    """
+    İş sürdükçe NABIZ_ARALIGI_SN'de bir updated_at'i yenileyen iş parçacığını başlatır. İlerleme bildirimi
+    seyrek olan ya da hiç olmayan işler böylece yarım kalmış sayılmaz. Dönen Event set edilince durur.
+    """
+    dur = threading.Event()
+
+    def _at():
+        while not dur.wait(NABIZ_ARALIGI_SN):
+            try:
+                with db_cursor() as cur:
+                    cur.execute("""
+                        UPDATE background_job SET updated_at = CURRENT_TIMESTAMP
+                        WHERE id = %s AND status = 'RUNNING'
+                    """, (is_id,))
+            except Exception:
+                logger.exception("Toplu iş nabzı yazılamadı (#%s)", is_id)
+
+    threading.Thread(target=_at, name=f"toplu-is-nabiz-{is_id}", daemon=True).start()
+    return dur
+
+def _calistir(is_id, fonksiyon, args, kwargs):
+    """
+    İşi yürütür ve sonucunu job tablosuna yazar. Buradan hiçbir hata dışarı kaçmaz. Sonuç yalnızca iş
+    hâlâ RUNNING ise yazılır; bu arada zaman aşımıyla FAILED sayılmış bir iş DONE'a dönmez.
+    """
+    nabiz = None
+    try:
+        with db_cursor() as cur:
+            # Sırada beklerken yarım kalmış sayılıp kapatılan iş yeniden canlanmasın
+            cur.execute("""
+                UPDATE background_job
+                SET status = 'RUNNING', started_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND status = 'QUEUED'
+            """, (is_id,))
+            if cur.rowcount == 0:
+                return
+        nabiz = _nabiz_baslat(is_id)
+        if "ilerleme" in inspect.signature(fonksiyon).parameters:
+            kwargs = {**kwargs, "ilerleme": lambda oran, mesaj: _ilerleme_yaz(is_id, oran, mesaj)}
+        sonuc = fonksiyon(*args, **kwargs)
+        hata = sonuc.get("hata") if isinstance(sonuc, dict) else None
+        durum, sonuc_json = ("FAILED" if hata else "DONE"), _sonucu_serilestir(sonuc)
+    except Exception as e:
+        logger.exception("Toplu iş hatası (#%s)", is_id)
+        durum, sonuc_json, hata = "FAILED", None, str(e)
+    finally:
+        if nabiz is not None:
+            nabiz.set()
+
+    try:
+        with db_cursor() as cur:
+            cur.execute("""
+                UPDATE background_job
+                SET status = %s, result = %s, error = %s,
+                    progress = CASE WHEN %s = 'DONE' THEN 1 ELSE progress END,
+                    finished_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND status = 'RUNNING'
+            """, (durum, Json(sonuc_json) if sonuc_json is not None else None, hata, durum, is_id))
+    except Exception:
+        # Sonuç yazılamazsa iş zaman aşımıyla FAILED işaretlenir
+        logger.exception("Toplu iş sonucu yazılamadı (#%s)", is_id)
+
+def is_baslat(site_id, tur, fonksiyon, *args, parametreler=None, **kwargs):
+    """
+    fonksiyon(*args, **kwargs) çağrısını arka plan havuzuna verir ve job kaydının id'sini döner.
+    fonksiyon "ilerleme" parametresi alıyorsa ilerleme otomatik olarak job tablosuna yazılır.
+    fonksiyon Streamlit'e dokunmamalı, sonucu (ve varsa "hata" alanını) sözlük olarak dönmelidir.
+    parametreler: arayüzde sonucu yorumlamak için job kaydında saklanan JSON (ör. kuru çalıştırma).
+    """
+    with db_cursor() as cur:
+        cur.execute("""
+            INSERT INTO background_job (complex_id, kind, params, runner)
+            VALUES (%s, %s, %s, %s)
+            RETURNING id
+        """, (site_id, tur, Json(parametreler or {}), SUREC_KIMLIGI))
+        is_id = cur.fetchone()[0]
+    _yurutucu.submit(_calistir, is_id, fonksiyon, args, kwargs)
+    return is_id
+
+def _yarim_kalanlari_kapat(cur):
+    """
+    Sunucu yeniden başladığında havuzdaki işler kaybolur; uzun süre haber alınamayanları kapatır.
+    RUNNING işler her ilerlemede ve nabızla updated_at'i yeniler. QUEUED işler boş iş parçacığı beklerken hiç
+    yazmadığından yalnızca başka bir süreçten kalanlar kapatılır; bu süreçtekiler sırası gelince çalışır.
+    Süreç başına en fazla IS_ZAMAN_ASIMI_DK'da bir çalışır (ilk çağrı açılışta).
+    """
+    global _son_tarama
+    with _tarama_kilidi:
+        simdi = time.monotonic()
+        if _son_tarama is not None and simdi - _son_tarama < IS_ZAMAN_ASIMI_DK * 60:
+            return
+        _son_tarama = simdi
+    cur.execute("""
+        UPDATE background_job
+        SET status = 'FAILED', error = 'İş yarıda kaldı (sunucu yeniden başlatılmış olabilir).',
+            finished_at = CURRENT_TIMESTAMP
+        WHERE updated_at < CURRENT_TIMESTAMP - make_interval(mins => %s)
+          AND (status = 'RUNNING'
+               OR (status = 'QUEUED' AND runner IS DISTINCT FROM %s))
+    """, (IS_ZAMAN_ASIMI_DK, SUREC_KIMLIGI))
+
+def get_site_isleri(site_id, limit=10):
+    """
+    Sitenin son işlerini en yeniden eskiye döner (iş paneli bunu birkaç saniyede bir yoklar).
+    Her kayıt: {"id", "tur", "durum", "ilerleme", "mesaj", "parametreler", "sonuc_var", "hata",
+               "olusturma", "baslama", "bitis"}; sonucun kendisi get_is_sonucu ile ayrıca okunur.
+    """
+    try:
+        with db_cursor() as cur:
+            _yarim_kalanlari_kapat(cur)
+            cur.execute("""
+                SELECT id, kind, status, progress, message, params, result IS NOT NULL, error,
+                       created_at, started_at, finished_at
+                FROM background_job
+                WHERE complex_id = %s
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s
+            """, (site_id, limit))
+            satirlar = cur.fetchall()
+        return [
+            {"id": r[0], "tur": r[1], "durum": r[2], "ilerleme": float(r[3]), "mesaj": r[4],
+             "parametreler": r[5] or {}, "sonuc_var": r[6], "hata": r[7],
+             "olusturma": r[8], "baslama": r[9], "bitis": r[10]}
+            for r in satirlar
+        ]
+    except Exception:
+        logger.exception("İş listesi hatası")
+        return []
+
+def get_is_sonucu(is_id):
+    """Tek bir işin sonucu (tablolar DataFrame olarak, bkz. _sonucu_coz); okunamazsa None."""
+    try:
+        with db_cursor() as cur:
+            cur.execute("SELECT result FROM background_job WHERE id = %s", (is_id,))
+            satir = cur.fetchone()
+        return _sonucu_coz(satir[0]) if satir else None
+    except Exception:
+        logger.exception("İş sonucu okunamadı (#%s)", is_id)
+        return None
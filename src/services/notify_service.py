@@ -0,0 +1,106 @@
+import os
+import json
+import select
+import logging
+import threading
+
+from src.database.connection import havuz_disi_baglanti
+from src.services.cache_service import olay_gecersiz_kil, tum_onbellegi_temizle
+
+logger = logging.getLogger(__name__)
+
+# Birden çok uygulama süreci aynı veritabanını kullandığında önbellekler bu kanal üzerinden
+# eşitlenir (bkz. database/create_cache_notify_triggers.sql). .env: CACHE_NOTIFY_ENABLED=0 ile kapatılır.
+KANAL = "onbellek_olaylari"
+DINLEYICI_ETKIN = os.getenv("CACHE_NOTIFY_ENABLED", "1") != "0"
+# select() bekleme süresi; bağlantı kopukluğu en geç bu kadar sürede fark edilir
+YOKLAMA_SN = 5.0
+YENIDEN_BAGLANMA_MAX_SN = 30.0
+
+_kilit = threading.Lock()
+_is_parcacigi = None
+_durdur = threading.Event()
+# İlk LISTEN (ve ardından yapılan önbellek temizliği) tamamlanınca kurulur
+_ilk_baglanti = threading.Event()
+_durum = {"bagli": False, "olay": 0, "yeniden_baglanma": 0, "son_hata": None}
+
+def olayi_isle(yuk):
+    """Tek bir NOTIFY içeriğini ({"tablo", "site_id", "unit_id"}) önbellekte karşılığına uygular."""
+    try:
+        olay = json.loads(yuk)
+        olay_gecersiz_kil(olay["tablo"], olay.get("site_id"), olay.get("unit_id"))
+    except (ValueError, KeyError, TypeError):
+        logger.exception("Geçersiz önbellek olayı (%r)", yuk)
+        return
+    with _kilit:
+        _durum["olay"] += 1
+
+def _dinle():
+    bekleme = 1.0
+    while not _durdur.is_set():
+        conn = None
+        try:
+            conn = havuz_disi_baglanti()
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {KANAL}")
+            # Bağlantı yokken kaçırılmış olaylar olabilir; önbellek baştan doldurulur
+            tum_onbellegi_temizle()
+            with _kilit:
+                _durum["bagli"] = True
+            _ilk_baglanti.set()
+            bekleme = 1.0
+
+            while not _durdur.is_set():
+                if select.select([conn], [], [], YOKLAMA_SN) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    olayi_isle(conn.notifies.pop(0).payload)
+        except Exception as e:
+            logger.exception("Önbellek dinleyicisi hatası")
+            with _kilit:
+                _durum["bagli"] = False
+                _durum["yeniden_baglanma"] += 1
+                _durum["son_hata"] = str(e)
+            _durdur.wait(bekleme)
+            bekleme = min(bekleme * 2, YENIDEN_BAGLANMA_MAX_SN)
+        finally:
+            if conn is not None:
+                conn.close()
+    with _kilit:
+        _durum["bagli"] = False
+
+def dinleyiciyi_baslat():
+    """
+    Süreç başına bir kez, önbellek olaylarını dinleyen arka plan iş parçacığını başlatır.
+    Tekrar çağrılması zararsızdır; CACHE_NOTIFY_ENABLED=0 ise hiçbir şey yapmaz.
+    """
+    global _is_parcacigi
+    if not DINLEYICI_ETKIN:
+        return
+    with _kilit:
+        if _is_parcacigi is not None and _is_parcacigi.is_alive():
+            return
+        _durdur.clear()
+        _is_parcacigi = threading.Thread(target=_dinle, name="onbellek-dinleyici", daemon=True)
+        _is_parcacigi.start()
+
+def dinleyiciyi_durdur(zaman_asimi=YOKLAMA_SN + 1):
+    _durdur.set()
+    if _is_parcacigi is not None:
+        _is_parcacigi.join(zaman_asimi)
+
+def ilk_baglantiyi_bekle(zaman_asimi):
+    """
+    Dinleyici ilk kez bağlanıp önbelleği temizleyene kadar bekler (önbelleği dolduran işler, doldurduklarının
+    bu temizlikle silinmemesi için çağırır). Dinleyici kapalıysa hemen döner; bağlandıysa True döner.
+    """
+    if not DINLEYICI_ETKIN:
+        return True
+    return _ilk_baglanti.wait(zaman_asimi)
+
+def get_dinleyici_durumu():
+    """Dinleyicinin bağlantı durumu, işlenen olay ve yeniden bağlanma sayılarının anlık kopyası."""
+    with _kilit:
+        return dict(_durum)
@@ -1,65 +1,102 @@
+import logging
+
 import pandas as pd
-from src.database.connection import get_db_engine, get_connection
+from src.database.connection import get_db_engine, db_cursor
+from src.services.cache_service import onbellekle, sonucu_onbellege_alma
+
+logger = logging.getLogger(__name__)
 
-def get_aylik_tahsilat_verisi(site_id):
-    engine = get_db_engine()
-    if engine:
-        try:
-            # Son 6 ayın tahsilatlarını getirir
-            query = """
-                SELECT TO_CHAR(process_date, 'Mon') as ay, SUM(amount) as toplam, MIN(process_date) as sirala
-                FROM payment
+@onbellekle("aylik_ozet", kapsam=lambda site_id, ay_sayisi=24: (site_id, None))
+def get_aylik_tahsilat_verisi(site_id, ay_sayisi=24):
+    """
+    Son ay_sayisi takvim ayının tahsilat, gider ve yeni borç toplamlarını monthly_site_summary
+    özet tablosundan okur (tetikleyicilerle güncel tutulur; bir ayın sayaç satırları toplanır).
+    Aynı ay farklı yıllarda ayrı satırdır.
+    Dönüş: DataFrame["Dönem" (ayın ilk günü), "ay" (AA/YYYY), "toplam", "gider", "yeni_borc"]
+    """
+    try:
+        with db_cursor() as cur:
+            cur.execute("""
+                SELECT period_month, TO_CHAR(period_month, 'MM/YYYY'),
+                       SUM(collected), SUM(expense), SUM(new_debt)
+                FROM monthly_site_summary
                 WHERE complex_id = %s
-                GROUP BY ay
-                ORDER BY sirala ASC
-            """
-            df = pd.read_sql(query, engine, params=(site_id,))
-            return df
-        except: return pd.DataFrame()
-    return pd.DataFrame()
+                  AND period_month > date_trunc('month', CURRENT_DATE) - make_interval(months => %s)
+                  AND period_month <= date_trunc('month', CURRENT_DATE)
+                GROUP BY period_month
+                ORDER BY period_month
+            """, (site_id, ay_sayisi))
+            satirlar = cur.fetchall()
+        df = pd.DataFrame(satirlar, columns=["Dönem", "ay", "toplam", "gider", "yeni_borc"])
+        df["Dönem"] = pd.to_datetime(df["Dönem"])
+        df[["toplam", "gider", "yeni_borc"]] = df[["toplam", "gider", "yeni_borc"]].astype(float)
+        return df
+    except Exception:
+        logger.exception("Aylık tahsilat verisi hatası")
+        sonucu_onbellege_alma()
+        return pd.DataFrame()
 
-def get_blok_borc_verisi(site_id):
-    engine = get_db_engine()
-    if engine:
-        try:
-            # Bloklara göre toplam borç dağılımı
-            query = """
-                SELECT b.name as "Blok", SUM(d.expected_amount) as "Toplam Borç"
-                FROM debt_item d
-                JOIN unit u ON d.unit_id = u.id
-                JOIN building b ON u.building_id = b.id
-                WHERE b.complex_id = %s AND d.status != 'PAID'
-                GROUP BY b.name
-                ORDER BY "Toplam Borç" DESC
-            """
-            df = pd.read_sql(query, engine, params=(site_id,))
-            return df
-        except: return pd.DataFrame()
-    return pd.DataFrame()
+# Genel bakış sayfasının tüm sayıları tek sorguda: açık borçlar sitenin unit_balance satırları bir kez
+# toplanarak (blok başına ve site geneli, GROUPING SETS), kasa toplamları aylık özet tablosundan okunur.
+# Hepsi siteye göre süzülür.
+_GENEL_ISTATISTIK_SORGUSU = """
+    WITH borc AS (
+        SELECT b.name AS blok, SUM(ub.dues) AS dues, SUM(ub.fuel) AS fuel, SUM(ub.other) AS other,
+               SUM(ub.total) AS total
+        FROM building b
+        JOIN unit u ON u.building_id = b.id
+        JOIN unit_balance ub ON ub.unit_id = u.id
+        WHERE b.complex_id = %(site_id)s
+        GROUP BY GROUPING SETS ((), (b.name))
+        HAVING GROUPING(b.name) = 1 OR SUM(ub.total) <> 0
+    ),
+    kasa AS (
+        SELECT COALESCE(SUM(collected), 0) AS tahsilat, COALESCE(SUM(expense), 0) AS gider
+        FROM monthly_site_summary
+        WHERE complex_id = %(site_id)s
+    )
+    SELECT borc.blok, borc.dues, borc.fuel, borc.other, borc.total, kasa.tahsilat, kasa.gider
+    FROM kasa
+    LEFT JOIN borc ON TRUE
+"""
 
-def get_genel_istatistikler(site_id):
-    conn = get_connection()
-    stats = {"toplam_alacak": 0.0, "toplam_tahsilat": 0.0, "kasa_mevcut": 0.0}
-    if conn:
-        try:
-            cur = conn.cursor()
-            # 1. Alacaklar
-            cur.execute("SELECT SUM(expected_amount) FROM debt_item WHERE status != 'PAID'")
-            stats["toplam_alacak"] = float(cur.fetchone()[0] or 0)
+BORC_TURU_ETIKETLERI = {'DUES': 'Aidat', 'FUEL': 'Yakıt', 'OTHER': 'Diğer'}
 
-            # 2. Gelirler
-            cur.execute("SELECT SUM(amount) FROM payment WHERE complex_id = %s", (site_id,))
-            toplam_gelir = float(cur.fetchone()[0] or 0)
-            stats["toplam_tahsilat"] = toplam_gelir
-
-            # 3. Giderler 
-            cur.execute("SELECT SUM(amount) FROM account_transaction WHERE type = 'EXPENSE'")
-            toplam_gider = float(cur.fetchone()[0] or 0)
+@onbellekle("genel_istatistik", kapsam=lambda site_id: (site_id, None))
+def get_genel_istatistikler(site_id):
+    """
+    Genel bakış sayfasının ihtiyaç duyduğu tüm sayıları tek sorguda, yalnızca seçili site için döner.
+    Dönüş: {"toplam_alacak", "toplam_tahsilat", "toplam_gider", "kasa_mevcut": float,
+            "borc_dagilimi": DataFrame["Borç Türü", "Toplam Borç"],
+            "blok_dagilimi": DataFrame["Blok", "Toplam Borç"] (büyükten küçüğe)}
+    """
+    stats = {"toplam_alacak": 0.0, "toplam_tahsilat": 0.0, "toplam_gider": 0.0, "kasa_mevcut": 0.0,
+             "borc_dagilimi": pd.DataFrame(columns=["Borç Türü", "Toplam Borç"]),
+             "blok_dagilimi": pd.DataFrame(columns=["Blok", "Toplam Borç"])}
+    try:
+        with db_cursor() as cur:
+            cur.execute(_GENEL_ISTATISTIK_SORGUSU, {"site_id": site_id})
+            satirlar = cur.fetchall()
 
-            stats["kasa_mevcut"] = toplam_gelir - toplam_gider
-            
-            cur.close()
-            conn.close()
-        except Exception as e:
-            print(f"İstatistik hatası: {e}")
+        bloklar = []
+        for blok, aidat, yakit, diger, toplam, tahsilat, gider in satirlar:
+            stats["toplam_tahsilat"] = float(tahsilat)
+            stats["toplam_gider"] = float(gider)
+            if toplam is None:
+                continue
+            if blok is None:
+                stats["toplam_alacak"] = float(toplam)
+                turler = [(BORC_TURU_ETIKETLERI[tur], float(tutar))
+                          for tur, tutar in (("DUES", aidat), ("FUEL", yakit), ("OTHER", diger)) if tutar]
+                if turler:
+                    stats["borc_dagilimi"] = pd.DataFrame(turler, columns=["Borç Türü", "Toplam Borç"])
+            else:
+                bloklar.append((blok, float(toplam)))
+        stats["kasa_mevcut"] = stats["toplam_tahsilat"] - stats["toplam_gider"]
+        if bloklar:
+            stats["blok_dagilimi"] = pd.DataFrame(bloklar, columns=["Blok", "Toplam Borç"]) \
+                .sort_values("Toplam Borç", ascending=False, ignore_index=True)
+    except Exception:
+        logger.exception("İstatistik hatası")
+        sonucu_onbellege_alma()
     return stats
@@ -1,7 +1,13 @@
+import logging
+from decimal import Decimal
 import pandas as pd
-from src.database.connection import get_db_engine, get_connection
+from src.database.connection import get_db_engine, db_cursor, daire_kilidi_al
+from src.services.cache_service import onbellekle, sonucu_onbellege_alma, olay_gecersiz_kil
 import streamlit as st
 
+logger = logging.getLogger(__name__)
+
+@onbellekle("daire_odemeleri", kapsam=lambda daire_id: (None, daire_id), boyut=1024)
 def get_daire_odemeleri(daire_id):
     engine = get_db_engine()
     if engine:
@@ -21,49 +27,29 @@ def get_daire_odemeleri(daire_id):
                 # Sütunları Türkçeleştirelim
                 df.columns = ['Ödeme Tarihi', 'Tutar (TL)', 'Açıklama']
             return df
-        except:
+        except Exception:
+            logger.exception("Ödeme geçmişi hatası")
+            sonucu_onbellege_alma()
             return pd.DataFrame()
     return pd.DataFrame()
 
 def kaydet_odeme(site_id, daire_id, tutar, aciklama):
-    conn = get_connection()
-    if conn:
-        try:
-            cur = conn.cursor()
-            # 1. Ödemeyi Kaydet
+    try:
+        with db_cursor() as cur:
+            # Aynı daireye eşzamanlı ödemeler (ör. kasiyer + banka aktarımı) aynı borca dağıtılmasın diye
+            # dairenin kilidi commit'e kadar tutulur; farklı daireler birbirini beklemez.
+            daire_kilidi_al(cur, daire_id)
+            # Ödemeyi kaydet. Borç kapatma (FIFO) işini trg_auto_distribute_payment tetikleyicisi
+            # aynı işlem içinde tek sorguyla yapar; kısmi ödemeler de payment_debt'e yazılır.
             cur.execute("""
                 INSERT INTO payment (complex_id, unit_id, amount, process_date, description)
                 VALUES (%s, %s, %s, CURRENT_TIMESTAMP, %s)
-            """, (site_id, daire_id, tutar, aciklama))
-            
-            # 2. BORÇ KAPATMA MANTIĞI:
-            # Dairenin ödenmemiş en eski borçlarını tek tek bulalım
-            cur.execute("""
-                SELECT id, expected_amount FROM debt_item 
-                WHERE unit_id = %s AND status != 'PAID' 
-                ORDER BY period_month ASC
-            """, (daire_id,))
-            
-            borclar = cur.fetchall()
-            kalan_para = float(tutar)
-            
-            for borc_id, borc_tutar in borclar:
-                if kalan_para >= float(borc_tutar):
-                    # Borcun tamamını ödeyecek kadar para var
-                    cur.execute("UPDATE debt_item SET status = 'PAID' WHERE id = %s", (borc_id,))
-                    kalan_para -= float(borc_tutar)
-                else:
-                    # Para bitti, diğer borçlar ödenmemiş kalmaya devam eder
-                    break
-            
-            conn.commit()
-            cur.close()
-            conn.close()
-            return True
-        except Exception as e:
-            st.error(f"Kayıt hatası: {e}")
-            return False
-    return False
+            """, (site_id, daire_id, Decimal(str(tutar)), aciklama))
+        olay_gecersiz_kil("payment", site_id, daire_id)
+        return True
+    except Exception as e:
+        st.error(f"Kayıt hatası: {e}")
+        return False
 
 def tahsilat_kaydet(unit_id, amount, p_type, description):
     # Bu fonksiyon main.py'de var ama kullanılmıyor gibi ya da kaydet_odeme ile aynı işi yapıyor.
@@ -0,0 +1,116 @@
+import os
+import re
+import sys
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+
+from src.database.connection import sorgu_dinleyicisi_ekle
+
+logger = logging.getLogger(__name__)
+
+# Sayfa çizim profili. .env: PROFILER_ENABLED=1 ile açılır; her yeniden çizimin sorgu dökümü
+# PROFILER_TRACE_FILE dosyasına (JSONL, satır başına bir çizim) eklenir.
+PROFIL_ETKIN = os.getenv("PROFILER_ENABLED", "0") == "1"
+IZ_DOSYASI = os.getenv("PROFILER_TRACE_FILE", "logs/profil_izi.jsonl")
+# İz dosyasına yazılan sorgu metninin üst sınırı (toplu INSERT'ler çok uzun olabilir)
+SORGU_METNI_MAX = 2000
+
+_YORUM = re.compile(r"--[^\n]*")
+_METIN_SABITI = re.compile(r"'(?:[^']|'')*'")
+_SAYI_SABITI = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SABIT_LISTESI = re.compile(r"\?(?:\s*,\s*\?)+")
+_BOSLUK = re.compile(r"\s+")
+
+_KAYNAK_DIZINLERI = (f"{os.sep}src{os.sep}services{os.sep}", f"{os.sep}src{os.sep}views{os.sep}")
+
+# Çizim, Streamlit'in betik iş parçacığında yürür; kayıt iş parçacığına özeldir, böylece
+# eşzamanlı oturumların ve arka plan işlerinin sorguları birbirine karışmaz.
+_yerel = threading.local()
+_dosya_kilidi = threading.Lock()
+
+def _cagiran():
+    """
+    Sorguyu çalıştıran en yakın servis (yoksa sayfa) fonksiyonu: 'services.debt_service.get_detayli_borc'.
+    Alt çizgili yardımcılar (_liste_getir gibi) yerine onları çağıran açık fonksiyon tercih edilir.
+    """
+    ilk = None
+    cerceve = sys._getframe(2)
+    while cerceve is not None:
+        dosya = cerceve.f_code.co_filename
+        if any(dizin in dosya for dizin in _KAYNAK_DIZINLERI):
+            modul = os.path.splitext(dosya.split(f"{os.sep}src{os.sep}", 1)[1])[0].replace(os.sep, ".")
+            ad = f"{modul}.{cerceve.f_code.co_name}"
+            if not cerceve.f_code.co_name.startswith("_"):
+                return ad
+            ilk = ilk or ad
+        cerceve = cerceve.f_back
+    return ilk
+
+def sorgu_parmak_izi(sorgu):
+    """
+    Sorgunun sabitleri '?' ile değiştirilmiş hâli (benchmarks/explain_plans.py'deki parmak iziyle aynı).
+    Dinleyiciye gelen metinde parametreler yerleştirilmiştir; ev sahibi adları, tutarlar ve açıklamalar
+    iz dosyasına bu yüzden yazılmaz.
+    """
+    metin = _YORUM.sub(" ", sorgu)
+    metin = _METIN_SABITI.sub("?", metin)
+    metin = _SAYI_SABITI.sub("?", metin)
+    metin = _SABIT_LISTESI.sub("?", metin)
+    return _BOSLUK.sub(" ", metin).strip()
+
+def _sorguyu_kaydet(sorgu, sure_ms, satir):
+    kayit = getattr(_yerel, "kayit", None)
+    if kayit is None:
+        return
+    bitis_ms = (time.perf_counter() - kayit["_baslangic"]) * 1000
+    kayit["sorgular"].append({
+        "baslangic_ms": round(max(bitis_ms - sure_ms, 0.0), 2),
+        "sure_ms": round(sure_ms, 2),
+        "satir": satir,
+        "cagiran": _cagiran(),
+        "sorgu": sorgu_parmak_izi(sorgu)[:SORGU_METNI_MAX],
+    })
+
+def _izi_yaz(kayit):
+    try:
+        dizin = os.path.dirname(IZ_DOSYASI)
+        if dizin:
+            os.makedirs(dizin, exist_ok=True)
+        satir = json.dumps(kayit, ensure_ascii=False, default=str)
+        with _dosya_kilidi, open(IZ_DOSYASI, "a", encoding="utf-8") as f:
+            f.write(satir + "\n")
+    except OSError:
+        logger.exception("Profil izi yazılamadı (%s)", IZ_DOSYASI)
+
+@contextmanager
+def sayfa_profili(sayfa, site_id=None):
+    """
+    Bloğun (bir render_*_page çağrısı) süresini ve içinde çalışan sorguları ölçer; profil kaydını
+    (dict) verir. Kayıt blok bitince doldurulur ve iz dosyasına eklenir. PROFILER_ENABLED kapalıysa
+    ölçüm yapılmaz ve None verilir.
+    """
+    if not PROFIL_ETKIN:
+        yield None
+        return
+
+    # Dinleyici kayıtlıyken her sorgu zamanlanır; bu yüzden yalnızca profil açıkken eklenir
+    sorgu_dinleyicisi_ekle(_sorguyu_kaydet)
+    kayit = {"zaman": datetime.now().isoformat(timespec="seconds"), "sayfa": sayfa, "site_id": site_id,
+             "sorgular": [], "_baslangic": time.perf_counter()}
+    onceki = getattr(_yerel, "kayit", None)
+    _yerel.kayit = kayit
+    try:
+        yield kayit
+    finally:
+        _yerel.kayit = onceki
+        toplam_ms = (time.perf_counter() - kayit.pop("_baslangic")) * 1000
+        db_ms = sum(s["sure_ms"] for s in kayit["sorgular"])
+        kayit["toplam_ms"] = round(toplam_ms, 2)
+        kayit["db_ms"] = round(db_ms, 2)
+        kayit["python_ms"] = round(max(toplam_ms - db_ms, 0.0), 2)
+        kayit["sorgu_sayisi"] = len(kayit["sorgular"])
+        _izi_yaz(kayit)
@@ -0,0 +1,102 @@
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+
+from src.services.cache_service import get_onbellek_metrikleri
+from src.services.notify_service import ilk_baglantiyi_bekle
+
+logger = logging.getLogger(__name__)
+
+# Sunucu süreci başlarken site/blok/daire rehberleri ve blok borç haritaları tüm siteler için önbelleğe
+# yüklenir; böylece dağıtımdan sonraki ilk kullanıcı her sorguyu beklemez. .env: CACHE_WARMUP_ENABLED=0
+# ile kapatılır (kenar çubuğundaki "Önbelleği Isıt" düğmesi yine çalışır).
+ISITMA_ETKIN = os.getenv("CACHE_WARMUP_ENABLED", "1") != "0"
+# LISTEN dinleyicisi bağlanınca önbelleği temizler; ısıtma bu temizlikten sonra başlar
+DINLEYICI_BEKLEME_SN = 10.0
+
+_kilit = threading.Lock()
+_is_parcacigi = None
+_durum = {"calisiyor": False, "site": 0, "cagri": 0, "atlanan": 0, "sure_ms": None,
+          "son_calisma": None, "son_hata": None}
+
+def _yer_var_mi(varlik):
+    """Varlığın önbelleği doluysa o varlık ısıtılmaz; aksi hâlde kullanıcıların açtığı girişler silinirdi."""
+    metrik = get_onbellek_metrikleri().get(varlik)
+    return metrik is None or metrik["giris"] < metrik["kapasite"]
+
+def onbellegi_isit():
+    """
+    Tüm siteler için sayfaların açılışta okuduğu rehberleri (site, blok, blok daireleri, daire etiketleri,
+    toplu işlem şablonu, personel), genel bakış özetlerini ve blok borç haritalarını önbelleğe yükler.
+    Çağrılar sayfalardaki çağrılarla aynı argümanlarla yapılır ki aynı önbellek anahtarları dolsun.
+    Özet sayıları döner: {"site", "cagri", "atlanan"} (atlanan: önbellek dolu olduğu için yapılmayan çağrılar).
+    """
+    # Servisler (ve pandas) burada yüklenir; main.py'nin içe aktarması açılışı yavaşlatmaz
+    from src.services.directory_service import (
+        get_siteler, get_bloklar, get_blok_daireleri, get_daire_etiketleri, get_daire_sablonu, get_personel_listesi,
+    )
+    from src.services.debt_service import get_toplu_borc_haritasi
+    from src.services.overview_service import get_genel_istatistikler, get_aylik_tahsilat_verisi
+
+    ozet = {"site": 0, "cagri": 1, "atlanan": 0}
+    siteler = get_siteler()
+    for site_id in siteler["id"]:
+        site_id = int(site_id)
+        for servis in (get_daire_etiketleri, get_daire_sablonu, get_personel_listesi,
+                       get_genel_istatistikler, get_aylik_tahsilat_verisi):
+            servis(site_id)
+            ozet["cagri"] += 1
+
+        bloklar = get_bloklar(site_id)
+        ozet["cagri"] += 1
+        for blok_id in bloklar["id"]:
+            blok_id = int(blok_id)
+            for varlik, servis in (("blok_daireleri", get_blok_daireleri), ("borc_haritasi", get_toplu_borc_haritasi)):
+                if _yer_var_mi(varlik):
+                    servis(site_id, blok_id)
+                    ozet["cagri"] += 1
+                else:
+                    ozet["atlanan"] += 1
+        ozet["site"] += 1
+    return ozet
+
+def _calistir(dinleyiciyi_bekle):
+    if dinleyiciyi_bekle:
+        ilk_baglantiyi_bekle(DINLEYICI_BEKLEME_SN)
+    baslangic = time.perf_counter()
+    try:
+        ozet = onbellegi_isit()
+        hata = None
+    except Exception as e:
+        logger.exception("Önbellek ısıtma hatası")
+        ozet, hata = {}, str(e)
+    with _kilit:
+        _durum.update(ozet)
+        _durum["calisiyor"] = False
+        _durum["sure_ms"] = (time.perf_counter() - baslangic) * 1000
+        _durum["son_calisma"] = datetime.now().isoformat(timespec="seconds")
+        _durum["son_hata"] = hata
+
+def isitmayi_baslat(elle=False):
+    """
+    Önbellek ısıtmasını arka plan iş parçacığında başlatır. Süreç başına bir kez, açılışta çağrılır
+    (CACHE_WARMUP_ENABLED=0 ise ya da daha önce çalıştıysa hiçbir şey yapmaz). elle=True (yönetici
+    düğmesi) her zaman yeniden çalıştırır. Isıtma zaten sürüyorsa False, başlatıldıysa True döner.
+    """
+    global _is_parcacigi
+    with _kilit:
+        if _is_parcacigi is not None and _is_parcacigi.is_alive():
+            return False
+        if not elle and (not ISITMA_ETKIN or _is_parcacigi is not None):
+            return False
+        _durum["calisiyor"] = True
+        _is_parcacigi = threading.Thread(target=_calistir, args=(not elle,), name="onbellek-isitma", daemon=True)
+        _is_parcacigi.start()
+        return True
+
+def get_isitma_durumu():
+    """Son ısıtmanın özeti (site / servis çağrısı / atlanan sayısı, süre, hata) ve sürüp sürmediği."""
+    with _kilit:
+        return dict(_durum)
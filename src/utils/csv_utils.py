@@ -0,0 +1,84 @@
+import io
+import csv
+import codecs
+import pandas as pd
+
+def tr_sayiya_cevir(seri):
+    """
+    '1.234,56', '1234,56', '1234.56', '₺1.234.567' gibi Türkçe/İngilizce yazılmış tutarları
+    vektörel olarak sayıya çevirir. Tek noktalı '1.500' gibi üç haneli gruplar binlik sayılır (1500);
+    '1234.56' ve '1.5' ondalıktır. Çevrilemeyen veya boş hücreler NaN olur.
+    """
+    if pd.api.types.is_numeric_dtype(seri):
+        return seri.astype(float)
+
+    metin = seri.astype("string").str.strip().str.replace(r"(?:₺|TL|\s)", "", regex=True)
+    virgullu = metin.str.contains(",", regex=False)
+    noktali = metin.str.contains(".", regex=False)
+    # Hem nokta hem virgül varsa ya da metin üç haneli nokta gruplarından oluşuyorsa ('1.500',
+    # '12.345.678') noktalar binlik ayırıcıdır
+    binlik_nokta = (virgullu & noktali) | metin.str.fullmatch(r"-?\d{1,3}(?:\.\d{3})+")
+    metin = metin.mask(binlik_nokta, metin.str.replace(".", "", regex=False))
+    metin = metin.str.replace(",", ".", regex=False)
+    return pd.to_numeric(metin, errors="coerce").astype(float)
+
+BASLIK_IPUCLARI = ("Blok", "Daire No")
+
+def csv_yapisini_kokla(dosya, onek_bayt=65536, baslik_ipuclari=BASLIK_IPUCLARI):
+    """
+    Dosyanın yalnızca ilk onek_bayt kadarına bakarak kodlamayı (UTF-8 / Türkçe CP1254),
+    ayırıcıyı ve başlık satırının yerini tahmin eder. Dosya konumu başa alınır.
+    Dönüş: {"encoding": str, "sep": str, "skiprows": int}
+    """
+    dosya.seek(0)
+    onek = dosya.read(onek_bayt)
+    dosya.seek(0)
+
+    # Önce UTF-8 deneriz; önek bir karakterin ortasında kesilmiş olabileceği için artımlı çözücü
+    try:
+        encoding = "utf-8-sig"
+        metin = codecs.getincrementaldecoder(encoding)().decode(onek, final=False)
+    except UnicodeDecodeError:
+        encoding = "cp1254"
+        metin = onek.decode(encoding, errors="replace")
+
+    satirlar = metin.splitlines()
+    if len(onek) == onek_bayt and satirlar:
+        satirlar = satirlar[:-1]  # Yarım kalmış son satır
+
+    skiprows = 0
+    for i, satir in enumerate(satirlar):
+        if any(ipucu in satir for ipucu in baslik_ipuclari):
+            skiprows = i
+            break
+
+    ornek = "\n".join(satirlar[skiprows:skiprows + 20])
+    try:
+        sep = csv.Sniffer().sniff(ornek, delimiters=",;\t|").delimiter
+    except csv.Error:
+        sep = ","
+    return {"encoding": encoding, "sep": sep, "skiprows": skiprows}
+
+def csv_parcalari(dosya, yapi, parca_boyutu=5000):
+    """
+    Dosyayı C ayrıştırıcısıyla parca_boyutu satırlık parçalar hâlinde okur; tüm hücreler metin
+    olarak gelir. Her adımda (parça DataFrame'i, dosyada okunan oran 0..1) üretir.
+    """
+    dosya.seek(0, io.SEEK_END)
+    toplam_bayt = dosya.tell() or 1
+    dosya.seek(0)
+
+    okuyucu = pd.read_csv(
+        dosya,
+        sep=yapi["sep"],
+        encoding=yapi["encoding"],
+        skiprows=yapi["skiprows"],
+        dtype=str,
+        engine="c",
+        chunksize=parca_boyutu,
+        skip_blank_lines=True,
+    )
+    with okuyucu:
+        for parca in okuyucu:
+            parca.columns = [str(c).strip() for c in parca.columns]
+            yield parca, min(dosya.tell() / toplam_bayt, 1.0)
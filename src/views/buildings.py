@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
-from src.database.connection import get_db_engine
-from src.services.debt_service import get_detayli_borc, get_daire_extresi
+from src.services.directory_service import get_bloklar, get_blok_daireleri
+from src.services.debt_service import get_toplu_borc_haritasi, get_daire_extresi, bos_borc_detayi
 from src.services.payment_service import get_daire_odemeleri
 
 @st.dialog("Daire Cari Hesap Detayı", width="large")
@@ -44,8 +44,8 @@ def daire_detay_penceresi(row, borclar):
     if borclar['toplam'] > 0:
         st.markdown("##### 📊 Borç Dağılımı")
         grafik_data = pd.DataFrame({
-            "Borç Tipi": ["Aidat", "Yakıt"],
-            "Miktar": [borclar['aidat'], borclar['yakit']]
+            "Borç Tipi": ["Aidat", "Yakıt", "Diğer"],
+            "Miktar": [borclar['aidat'], borclar['yakit'], borclar['diger']]
         })
         st.bar_chart(grafik_data, x="Borç Tipi", y="Miktar", color="Borç Tipi", horizontal=True, height=200)
 
@@ -97,26 +97,26 @@ def daire_detay_penceresi(row, borclar):
 def render_buildings_page():
     st.header("🏢 Blok Bazlı Borç Takip Paneli")
     
-    engine = get_db_engine()
+    site_id = st.session_state.selected_site_id
 
     # 1. Blokları çekelim
-    bloklar_query = f"SELECT id, name FROM building WHERE complex_id = {st.session_state.selected_site_id}"
-    bloklar_df = pd.read_sql(bloklar_query, engine)
+    bloklar_df = get_bloklar(site_id)
     
     # 2. Üstten blok seçimi yapalım
     secilen_blok_adi = st.selectbox("İncelemek istediğiniz bloğu seçin:", bloklar_df['name'])
     secilen_blok_id = bloklar_df[bloklar_df['name'] == secilen_blok_adi]['id'].values[0]
     
     # 3. Seçilen bloğun dairelerini getirelim
-    daire_query = f"SELECT id, unit_number, owner_name FROM unit WHERE building_id = {int(secilen_blok_id)} ORDER BY unit_number::int"
-    daireler = pd.read_sql(daire_query, engine)
+    daireler = get_blok_daireleri(site_id, int(secilen_blok_id))
+    # Bloğun tüm borçları tek sorguda (daire başına ayrı sorgu yerine)
+    borc_haritasi = get_toplu_borc_haritasi(site_id, int(secilen_blok_id))
     # 4. Görsel Grid...
     st.write(f"### {secilen_blok_adi} Bloğu Daire Durumları")
     # Her satırda 4 daire olacak şekilde kolonlar
     cols = st.columns(4)
     
     for index, row in daireler.iterrows():
-        borclar = get_detayli_borc(int(row['id']))
+        borclar = borc_haritasi.get(int(row["id"]), bos_borc_detayi())
         col_index = index % 4
         
         with cols[col_index]:
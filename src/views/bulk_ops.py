@@ -1,15 +1,156 @@
+import io
 import streamlit as st
 import pandas as pd
-from src.database.connection import get_db_engine
-from src.services.bulk_ops_service import add_bulk_dues, process_bulk_fuel_csv, process_past_debts_csv
+from src.services.directory_service import get_daire_sablonu
+from src.services.bulk_ops_service import (
+    add_bulk_dues, add_bulk_dues_range, onizle_bulk_dues_range, process_bulk_fuel_csv_stream,
+    process_past_debts_csv_stream, VARSAYILAN_GECMIS_BORC_ESLEMESI
+)
+from src.services.debt_service import dogrula_odenen_tutarlar, bakiyeleri_yeniden_olustur
+from src.services.job_service import is_baslat, get_site_isleri, get_is_sonucu, AKTIF_DURUMLAR
+
+IS_TURLERI = {"aidat": "🏠 Aylık Aidat", "aidat_plani": "📆 Aidat Planı",
+              "yakit": "🔥 Yakıt Aktarımı", "gecmis": "📅 Geçmiş Borç Aktarımı"}
+IS_DURUMLARI = {"QUEUED": "⏳ Sırada", "RUNNING": "⚙️ Çalışıyor", "DONE": "✅ Tamamlandı", "FAILED": "❌ Hata"}
+IS_YOKLAMA_SN = 2
+
+def _satir_sayisi(df):
+    """İş sonuçlarındaki tablolar örnek olarak saklanır; gerçek satır sayısı attrs'ta gelir."""
+    return df.attrs.get("toplam_satir", len(df))
+
+def _islem_sayilari(fark):
+    if "islem_sayilari" in fark.attrs:
+        return fark.attrs["islem_sayilari"]
+    return fark["İşlem"].value_counts().to_dict() if not fark.empty else {}
+
+def _ornek_notu(df):
+    if _satir_sayisi(df) > len(df):
+        st.caption(f"İlk {len(df)} satır gösteriliyor (toplam {_satir_sayisi(df)}).")
+
+def _fark_raporunu_goster(fark, anahtar):
+    """Deneme modunda hesaplanan satır bazlı farkı gösterir ve indirilebilir yapar."""
+    if fark.empty:
+        return
+    with st.expander(f"🧪 Fark Raporu: {_satir_sayisi(fark)} satır"):
+        st.caption(" · ".join(f"{islem}: {adet}" for islem, adet in _islem_sayilari(fark).items()))
+        _ornek_notu(fark)
+        st.dataframe(fark, use_container_width=True, hide_index=True)
+    st.download_button("📥 Fark Raporunu İndir", data=fark.to_csv(index=False).encode('utf-8-sig'),
+                       file_name=f"{anahtar}_fark_raporu.csv", mime='text/csv', key=f"{anahtar}_fark_indir")
+
+def _aktarim_raporunu_goster(sonuc, anahtar, kuru_calistirma=False):
+    """Toplu borç aktarımının sonucunu ve sorunlu satırları gösterir."""
+    if kuru_calistirma:
+        silinecek = _islem_sayilari(sonuc["fark"]).get("SİLİNECEK", 0)
+        st.info(f"🧪 Deneme modu — veritabanına hiçbir şey yazılmadı. Gerçek çalıştırmada {sonuc['eklenen']} borç eklenecek, "
+                f"{sonuc['guncellenen']} borç güncellenecek, {sonuc['degismeyen']} kayıt değişmeyecek"
+                + (f", {silinecek} eski borç silinecek." if silinecek else "."))
+        _fark_raporunu_goster(sonuc["fark"], anahtar)
+    elif sonuc["eklenen"] or sonuc["guncellenen"]:
+        st.success(f"İşlem Tamam! {sonuc['eklenen']} borç eklendi, {sonuc['guncellenen']} borç güncellendi, "
+                   f"{sonuc['degismeyen']} kayıt zaten güncel.")
+    elif sonuc["degismeyen"]:
+        st.info(f"Yüklenen {sonuc['degismeyen']} kaydın tamamı sistemde zaten güncel.")
+    else:
+        st.warning("Veri işlenemedi.")
+
+    sorunlar = [("eslesmeyen", "❓ Daireyle eşleşmeyen satırlar"),
+                ("tekrarlanan", "🔁 Dosyada tekrarlanan satırlar (ilk satır işlendi)"),
+                ("gecersiz", "⚠️ Tutarı veya dönemi geçersiz satırlar")]
+    for alan, baslik in sorunlar:
+        if not sonuc[alan].empty:
+            with st.expander(f"{baslik}: {_satir_sayisi(sonuc[alan])}"):
+                _ornek_notu(sonuc[alan])
+                st.dataframe(sonuc[alan], use_container_width=True, hide_index=True)
+                st.download_button("📥 Listeyi İndir", data=sonuc[alan].to_csv(index=False).encode('utf-8-sig'),
+                                   file_name=f"{anahtar}_{alan}_satirlar.csv", mime='text/csv', key=f"{anahtar}_{alan}_indir")
+
+def _aidat_sonucunu_goster(sonuc, anahtar, kuru_calistirma=False):
+    """Tek aylık aidat yansıtmanın sonucunu gösterir."""
+    if kuru_calistirma:
+        st.info(f"🧪 Deneme modu — {sonuc['eklenen']} daireye aidat yazılacak, "
+                f"{sonuc['atlanan']} daire bu dönem için zaten borçlandırılmış olduğundan atlanacak.")
+        _fark_raporunu_goster(sonuc["fark"], anahtar)
+    elif sonuc["eklenen"] > 0:
+        st.success(f"Başarılı! {sonuc['eklenen']} daireye aidat borcu girildi.")
+        if sonuc["atlanan"]:
+            st.info(f"{sonuc['atlanan']} dairenin bu döneme ait aidatı zaten olduğu için atlandı.")
+    elif sonuc["atlanan"] > 0:
+        st.warning(f"Tüm daireler ({sonuc['atlanan']}) bu dönem için zaten borçlandırılmış.")
+    else:
+        st.warning("İşlem yapılamadı veya hiç daire bulunamadı.")
+
+def _aidat_plani_sonucunu_goster(sonuc, anahtar, kuru_calistirma=False):
+    """Dönem aralığı aidat planının sonucunu gösterir."""
+    if sonuc["eklenen"] or sonuc["guncellenen"]:
+        st.success(f"Başarılı! {sonuc['eklenen']} aidat eklendi, {sonuc['guncellenen']} aidat güncellendi, "
+                   f"{sonuc['atlanan']} kayıt değişmedi.")
+    else:
+        st.warning(f"Değişiklik yapılmadı ({sonuc['atlanan']} kayıt zaten güncel).")
+
+IS_SONUC_GOSTERICILERI = {"aidat": _aidat_sonucunu_goster, "aidat_plani": _aidat_plani_sonucunu_goster,
+                          "yakit": _aktarim_raporunu_goster, "gecmis": _aktarim_raporunu_goster}
+
+def _isi_baslat(tur, fonksiyon, *args, kuru_calistirma=False, **kwargs):
+    """İşi arka plana verir ve sayfayı, iş paneli ilerlemeyi yoklayacak şekilde yeniden çizer."""
+    site_id = st.session_state.selected_site_id
+    try:
+        is_baslat(site_id, tur, fonksiyon, site_id, *args, kuru_calistirma=kuru_calistirma,
+                  parametreler={"kuru_calistirma": kuru_calistirma}, **kwargs)
+    except Exception as e:
+        st.error(f"❌ İş başlatılamadı: {e}")
+        return
+    st.session_state.is_takibi = True
+    st.rerun()
+
+def _is_panelini_ciz():
+    """Sitenin son toplu işlerini listeler; çalışan iş varken kendini IS_YOKLAMA_SN'de bir yeniler."""
+    isler = get_site_isleri(st.session_state.selected_site_id)
+    aktif_var = any(i["durum"] in AKTIF_DURUMLAR for i in isler)
+    if aktif_var != st.session_state.get("is_takibi", False):
+        # Yoklama başlar/biter: parça zamanlayıcısının değişmesi için tüm sayfa yeniden çizilir
+        st.session_state.is_takibi = aktif_var
+        st.rerun(scope="app")
+    if not isler:
+        return
+
+    st.subheader("🗂️ Arka Plan İşleri")
+    for kayit in isler:
+        baslik = f"#{kayit['id']} {IS_TURLERI.get(kayit['tur'], kayit['tur'])}"
+        if kayit["parametreler"].get("kuru_calistirma"):
+            baslik += " (deneme)"
+        if kayit["durum"] in AKTIF_DURUMLAR:
+            st.progress(kayit["ilerleme"], text=f"{baslik} — {IS_DURUMLARI[kayit['durum']]} {kayit['mesaj'] or ''}")
+            continue
+        zaman = f" · {kayit['bitis']:%d.%m.%Y %H:%M}" if kayit["bitis"] else ""
+        # Sonuç (fark tabloları) yalnızca açılan iş için okunur; yoklama yalnızca durumları getirir
+        acik = st.session_state.get("acik_is") == kayit["id"]
+        with st.expander(f"{IS_DURUMLARI[kayit['durum']]} {baslik}{zaman}", expanded=acik):
+            if kayit["hata"]:
+                st.error(f"❌ {kayit['hata']}")
+            elif kayit["sonuc_var"] and not acik:
+                if st.button("📄 Sonucu Göster", key=f"is{kayit['id']}_goster"):
+                    st.session_state.acik_is = kayit["id"]
+                    st.rerun()
+            elif kayit["sonuc_var"]:
+                sonuc = get_is_sonucu(kayit["id"])
+                gosterici = IS_SONUC_GOSTERICILERI.get(kayit["tur"])
+                if sonuc is None:
+                    st.error("❌ İş sonucu okunamadı.")
+                elif gosterici:
+                    gosterici(sonuc, f"is{kayit['id']}", kayit["parametreler"].get("kuru_calistirma", False))
 
 def render_bulk_ops_page():
     st.header("📢 Toplu Borçlandırma Paneli")
-    tab1, tab2, tab3 = st.tabs(["🏠 Sabit Aidat", "🔥 Yakıt (Excel)", "📅 Geçmiş Borç Yükle"])
+    st.fragment(run_every=IS_YOKLAMA_SN if st.session_state.get("is_takibi") else None)(_is_panelini_ciz)()
+
+    tab1, tab2, tab3, tab4 = st.tabs(["🏠 Sabit Aidat", "🔥 Yakıt (Excel)", "📅 Geçmiş Borç Yükle", "🧮 Bakiye Kontrolü"])
 
     with tab1:
         st.subheader("Tüm Siteye Sabit Aidat Yansıt")
-        st.info("💡 Bu işlem, muaf olarak işaretlenen yöneticileri otomatik olarak atlar.")
+        st.info("💡 Bu işlem, muaf olarak işaretlenen yöneticileri otomatik olarak atlar. "
+                "Özel aidatı veya daire tipi için varsayılan aidatı tanımlı dairelerde o tutar kullanılır; "
+                "formdaki tutar yalnızca bunlar tanımlı değilse uygulanır.")
         
         with st.form("toplu_aidat_form"):
             col1, col2 = st.columns(2)
@@ -17,33 +158,71 @@ def render_bulk_ops_page():
                 aidat_tutar = st.number_input("Aidat Tutarı (TL):", min_value=0.0, step=50.0, value=500.0)
             with col2:
                 aidat_ay = st.date_input("Aidat Dönemi:", key="aidat_date")
+            aidat_deneme = st.checkbox("🧪 Deneme modu (veritabanına yazmadan farkı göster)", key="aidat_deneme")
             
             if st.form_submit_button("🚀 Aidatları Tüm Siteye Yansıt"):
-                 count = add_bulk_dues(st.session_state.selected_site_id, aidat_tutar, aidat_ay)
-                 if count > 0:
-                     st.success(f"Başarılı! {count} daireye ₺{aidat_tutar} aidat borcu girildi.")
-                     st.balloons()
-                 else:
-                     st.warning("İşlem yapılamadı veya hiç daire bulunamadı.")
+                _isi_baslat("aidat", add_bulk_dues, aidat_tutar, aidat_ay, kuru_calistirma=aidat_deneme)
+
+        st.divider()
+        st.subheader("📆 Dönem Aralığına Aidat Planı (Örn: Tüm Yıl)")
+        st.info("💡 Seçilen aralıktaki tüm aylar tek işlemde borçlandırılır. Plan tekrar uygulanırsa "
+                "mevcut aidatlar çoğaltılmaz; henüz ödeme almamış aidatların tutarı plana göre güncellenir.")
+
+        bugun = pd.Timestamp.now()
+        p1, p2, p3 = st.columns(3)
+        with p1:
+            plan_baslangic = st.date_input("Başlangıç Dönemi:", value=bugun.replace(month=1, day=1).date(), key="plan_baslangic")
+        with p2:
+            plan_bitis = st.date_input("Bitiş Dönemi:", value=bugun.replace(month=12, day=1).date(), key="plan_bitis")
+        with p3:
+            plan_tutar = st.number_input("Aylık Tutar (TL):", min_value=0.0, step=50.0, value=500.0, key="plan_tutar")
+
+        aylar = pd.date_range(pd.Timestamp(plan_baslangic).replace(day=1), pd.Timestamp(plan_bitis).replace(day=1), freq='MS')
+        if len(aylar) == 0:
+            st.warning("Bitiş dönemi başlangıçtan önce olamaz.")
+        elif len(aylar) > 36:
+            st.warning("Tek seferde en fazla 36 aylık plan uygulanabilir.")
+        else:
+            plan_df = st.data_editor(
+                pd.DataFrame({"Dönem": aylar.date, "Tutar (TL)": plan_tutar}),
+                hide_index=True,
+                disabled=["Dönem"],
+                use_container_width=True,
+                column_config={
+                    "Dönem": st.column_config.DateColumn("Dönem", format="MM/YYYY"),
+                    "Tutar (TL)": st.column_config.NumberColumn(format="₺%.2f", min_value=0.0),
+                },
+                key=f"aidat_plani_{plan_baslangic}_{plan_bitis}_{plan_tutar}",
+            )
+            tutar_plani = dict(zip(plan_df["Dönem"], plan_df["Tutar (TL)"].astype(float)))
+
+            b1, b2 = st.columns(2)
+            with b1:
+                if st.button("🔍 Planı Önizle", use_container_width=True):
+                    onizleme = onizle_bulk_dues_range(st.session_state.selected_site_id, plan_baslangic, plan_bitis, tutar_plani)
+                    if onizleme["hata"]:
+                        st.error(onizleme["hata"])
+                    else:
+                        st.write(f"**{onizleme['donem']} ay × {onizleme['daire']} daire**")
+                        o1, o2, o3 = st.columns(3)
+                        o1.metric("Eklenecek", onizleme["eklenecek"])
+                        o2.metric("Güncellenecek", onizleme["guncellenecek"])
+                        o3.metric("Değişmeyecek", onizleme["degismeyecek"])
+                        st.caption(f"Yeni borçların toplamı: ₺{onizleme['toplam_tutar']:,.2f}")
+            with b2:
+                if st.button("🚀 Planı Uygula", use_container_width=True):
+                    _isi_baslat("aidat_plani", add_bulk_dues_range, plan_baslangic, plan_bitis, tutar_plani)
 
     with tab2:
         st.subheader("Daire Bazlı Farklı Yakıt Girişi")
-        st.info("💡 Şablondaki 'Dönem' kısmını YYYY-AA-GG (Örn: 2026-01-01) formatında doldurun.")
+        st.info("💡 Şablondaki 'Dönem' kısmını YYYY-AA-GG (Örn: 2026-01-01) formatında doldurun. "
+                "Daire numaraları bloklar arasında tekrarlandığı için 'Blok' sütununu silmeyin.")
         
-        engine = get_db_engine()
         # 1. ADIM: Şablon Hazırlama (Dönem sütunu eklendi)
         # Şu anki ayın ilk gününü otomatik alalım (Her ay değişir)
         otomatik_donem = pd.Timestamp.now().replace(day=1).strftime('%Y-%m-%d')
         
-        sablon_sorgu = f"""
-            SELECT u.unit_number as "Daire No", u.owner_name as "Ev Sahibi", 
-                   0.0 as "Tutar", '{otomatik_donem}' as "Donem" 
-            FROM unit u 
-            JOIN building b ON u.building_id = b.id
-            WHERE b.complex_id = %s 
-            ORDER BY b.name ASC, u.unit_number::int ASC
-        """
-        sablon_df = pd.read_sql(sablon_sorgu, engine, params=(st.session_state.selected_site_id,))
+        sablon_df = get_daire_sablonu(st.session_state.selected_site_id).assign(Tutar=0.0, Donem=otomatik_donem)
         
         csv_sablon = sablon_df.to_csv(index=False).encode('utf-8-sig')
         
@@ -59,37 +238,37 @@ def render_bulk_ops_page():
         # 2. ADIM: Dosya Yükleme
         yuklenen_dosya = st.file_uploader("Doldurduğunuz dosyayı yükleyin", type=['csv'], key="yakit_csv_up")
         
+        yakit_deneme = st.checkbox("🧪 Deneme modu (veritabanına yazmadan farkı göster)", key="yakit_deneme")
         if yuklenen_dosya and st.button("🚀 3. Adım: Yakıt Borçlarını İşle"):
-            try:
-                df_yuklenen = pd.read_csv(yuklenen_dosya)
-                count = process_bulk_fuel_csv(st.session_state.selected_site_id, df_yuklenen)
-                
-                if count > 0:
-                    st.success(f"İşlem Tamam! {count} daireye yakıt borçları tarihleriyle birlikte girildi.")
-                    st.balloons()
-                else:
-                     st.warning("Veri işlenemedi.")
-            except Exception as e:
-                st.error(f"Dosya işlenirken hata oluştu: {e}")
+            # Dosya arka plan işine kopyalanarak verilir; sayfa yenilense de iş devam eder
+            _isi_baslat("yakit", process_bulk_fuel_csv_stream, io.BytesIO(yuklenen_dosya.getvalue()),
+                        kuru_calistirma=yakit_deneme)
     
     with tab3:
         st.subheader("📅 Geçmiş Dönem Detaylı Borç Aktarımı")
         st.info("💡 Blok bazlı ayrım için lütfen yeni şablonu indirin ve kullanın.")
         
-        engine = get_db_engine()
-        # 1. ADIM: Blok Bilgili Şablon Hazırlama
-        sablon_sorgu = """
-            SELECT b.name as "Blok", u.unit_number as "Daire No", u.owner_name as "Ev Sahibi", 
-                   0.0 as "Gecmis_Aidat", 0.0 as "Ekim_Yakit", 
-                   0.0 as "Kasim_Yakit", 0.0 as "Aralik_Yakit", 0.0 as "Diger"
-            FROM unit u 
-            JOIN building b ON u.building_id = b.id
-            WHERE b.complex_id = %s 
-            ORDER BY b.name ASC, u.unit_number::int ASC
-        """
-        sablon_df = pd.read_sql(sablon_sorgu, engine, params=(st.session_state.selected_site_id,))
-        
-        sablon_df.columns = ["Blok", "Daire No", "Ev Sahibi", "Geçmiş Aidat Borcu", "Ekim Yakıt", "Kasım Yakıt", "Aralık Yakıt", "Diğer Eksik Ödemeler"]
+        # 1. ADIM: Sütun Eşlemesi (hangi sütun hangi borç türü ve dönemine yazılacak)
+        with st.expander("⚙️ Sütun Eşlemesi", expanded=False):
+            st.caption("Şablondaki her borç sütununun hangi borç türüne ve döneme aktarılacağını belirleyin. Satır ekleyerek yeni sütun tanımlayabilirsiniz.")
+            esleme_df = st.data_editor(
+                pd.DataFrame(VARSAYILAN_GECMIS_BORC_ESLEMESI).assign(donem=lambda d: pd.to_datetime(d["donem"]).dt.date),
+                num_rows="dynamic",
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "sutun": st.column_config.TextColumn("Sütun Adı", required=True),
+                    "tur": st.column_config.SelectboxColumn("Borç Türü", options=["DUES", "FUEL", "OTHER"], required=True),
+                    "donem": st.column_config.DateColumn("Dönem", required=True),
+                },
+                key="gecmis_borc_eslemesi",
+            )
+            esleme = esleme_df.dropna().to_dict("records")
+
+        # Blok Bilgili Şablon Hazırlama (borç sütunları eşlemeden gelir)
+        sablon_df = get_daire_sablonu(st.session_state.selected_site_id)
+        for kalem in esleme:
+            sablon_df[kalem["sutun"]] = 0.0
         
         st.download_button(
             label="📥 1. Adım: Yeni Bloklu Şablonu İndir",
@@ -103,32 +282,42 @@ def render_bulk_ops_page():
         # 2. ADIM: Dosya Yükleme
         gecmis_dosya = st.file_uploader("Blok Bilgisi İçeren Listeyi Yükleyin", type=['csv'], key="detayli_gecmis_up")
         
+        t1, t2 = st.columns([2, 1])
+        with t1:
+            eski_borclari_temizle = st.checkbox("Aktarımdan önce bu sitenin seçilen tarihten önceki ödenmemiş borçlarını sil", value=True)
+        with t2:
+            temizlik_tarihi = st.date_input("Tarih:", value=pd.Timestamp("2026-01-01").date(), key="gecmis_temizlik_tarihi")
+
+        gecmis_deneme = st.checkbox("🧪 Deneme modu (veritabanına yazmadan farkı göster)", key="gecmis_deneme")
         if gecmis_dosya and st.button("🚀 2. Adım: Tüm Geçmişi Sisteme Aktar"):
-            try:
-                bytes_data = gecmis_dosya.getvalue()
-                
-                # Encoding detection strategy: Try UTF-8 first, then Turkish CP1254
-                encoding_used = 'utf-8-sig'
-                try:
-                    decoded_text = bytes_data.decode(encoding_used)
-                except UnicodeDecodeError:
-                    encoding_used = 'cp1254'
-                    decoded_text = bytes_data.decode(encoding_used)
-                
-                ham_dosya = decoded_text.splitlines()
-                
-                baslik_satiri_index = 0
-                for i, satir in enumerate(ham_dosya):
-                    if "Blok" in satir or "Daire No" in satir:
-                        baslik_satiri_index = i
-                        break
-                
-                gecmis_dosya.seek(0)
-                df_gecmis = pd.read_csv(gecmis_dosya, sep=None, engine='python', encoding=encoding_used, skiprows=baslik_satiri_index)
-                df_gecmis.columns = [str(c).strip() for c in df_gecmis.columns]
-                
-                count = process_past_debts_csv(st.session_state.selected_site_id, df_gecmis)
-                st.success(f"✅ Başarılı! {count} adet kayıt doğru bloklara eşlenerek yüklendi.")
-                st.balloons()
-            except Exception as e:
-                st.error(f"❌ Hata: {e}")
+            # Kodlama, ayırıcı ve başlık satırı dosyanın başından tespit edilir; dosya arka planda parça parça işlenir
+            temizlik_siniri = pd.Timestamp(temizlik_tarihi).date() if eski_borclari_temizle else None
+            _isi_baslat("gecmis", process_past_debts_csv_stream, io.BytesIO(gecmis_dosya.getvalue()), esleme,
+                        temizlik_siniri, kuru_calistirma=gecmis_deneme)
+
+    with tab4:
+        st.subheader("🧮 Ödenen Tutar / Durum Doğrulama")
+        st.info("💡 Borçlardaki ödenen tutarlar ve durumlar, ödeme eşleşmelerinden (payment_debt) yeniden hesaplanır ve farklılıklar listelenir.")
+
+        duzelt = st.checkbox("Bulunan sapmaları düzelt", key="bakiye_duzelt")
+        if st.button("🔎 Kontrolü Başlat"):
+            sapma_df = dogrula_odenen_tutarlar(st.session_state.selected_site_id, duzelt)
+            if sapma_df is None:
+                st.error("❌ Kontrol sırasında hata oluştu.")
+            elif sapma_df.empty:
+                st.success("✅ Tüm borç bakiyeleri ödeme kayıtlarıyla tutarlı.")
+            else:
+                if duzelt:
+                    st.success(f"{len(sapma_df)} kayıt düzeltildi.")
+                else:
+                    st.warning(f"⚠️ {len(sapma_df)} kayıtta sapma bulundu.")
+                st.dataframe(sapma_df, use_container_width=True, hide_index=True)
+
+        st.divider()
+        st.caption("Ekranlardaki daire, blok ve site bakiyeleri özet tablolardan okunur. "
+                   "Düzeltme sonrasında veya tutarsızlık görürseniz özetleri borç kayıtlarından yeniden oluşturun.")
+        if st.button("♻️ Bakiye Özetlerini Yeniden Oluştur"):
+            if bakiyeleri_yeniden_olustur(st.session_state.selected_site_id):
+                st.success("✅ Bakiye özetleri yeniden oluşturuldu.")
+            else:
+                st.error("❌ Bakiye özetleri yenilenemedi.")
@@ -1,7 +1,5 @@
 import streamlit as st
-import pandas as pd
-from src.database.connection import get_db_engine
-from src.services.expense_service import kaydet_gider
+from src.services.expense_service import kaydet_gider, get_giderler
 
 def render_expenses_page():
     st.header("💸 Site Gider Yönetimi")
@@ -31,15 +29,8 @@ def render_expenses_page():
 
     with tab2:
         st.subheader("📋 Son Harcamalar")
-        engine = get_db_engine()
-        # account_transaction tablosundaki EXPENSE (Gider) kayıtlarını çekiyoruz
-        gider_query = """
-                SELECT process_date as "Tarih", category as "Kategori", amount as "Tutar", description as "Açıklama"
-                FROM account_transaction 
-                WHERE type = 'EXPENSE'
-                ORDER BY process_date DESC
-        """
-        giderler_df = pd.read_sql(gider_query, engine)
+        # Bu sitenin account_transaction tablosundaki EXPENSE (Gider) kayıtları
+        giderler_df = get_giderler(st.session_state.selected_site_id)
         
         if not giderler_df.empty:
             st.dataframe(giderler_df, use_container_width=True, hide_index=True)
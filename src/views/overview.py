@@ -1,12 +1,12 @@
+import tempfile
 import streamlit as st
-import pandas as pd
-from src.database.connection import get_db_engine
-from src.services.overview_service import get_genel_istatistikler, get_aylik_tahsilat_verisi, get_blok_borc_verisi
+from src.services.overview_service import get_genel_istatistikler, get_aylik_tahsilat_verisi
+from src.services.export_service import BORC_LISTESI_BICIMLERI, borc_listesi_yaz
 
 def render_overview_page():
     st.header(f"📊 {st.session_state.selected_site_name} Genel Durum")
     
-    # Fonksiyonu çağırıp istatistikleri alıyoruz
+    # Sayfadaki tüm sayılar ve dağılımlar tek sorguda geliyor
     stats = get_genel_istatistikler(st.session_state.selected_site_id)
     
     # Üst Metrik Kartları
@@ -23,44 +23,31 @@ def render_overview_page():
     # --- RAPORLAMA VE EXCEL ÇIKTISI ---
     st.subheader("📥 Veri Dışarı Aktar (Excel/CSV)")
     
-    if st.button("📊 Güncel Borç Listesini Hazırla"):
-        engine = get_db_engine()
-        sorgu = """
-            SELECT b.name as "Blok", 
-                   u.unit_number as "Daire No", 
-                   u.owner_name as "Ev Sahibi", 
-                   d.type as "Tur", 
-                   d.expected_amount as "Tutar", 
-                   d.period_month as "Donem", 
-                   d.status as "Durum"
-            FROM debt_item d
-            JOIN unit u ON d.unit_id = u.id
-            JOIN building b ON u.building_id = b.id
-            ORDER BY b.name ASC, u.unit_number::int ASC, d.period_month DESC
-        """
-        df_indir = pd.read_sql(sorgu, engine)
-        
-        if not df_indir.empty:
-            df_indir['Tur'] = df_indir['Tur'].replace({
-                'DUES': 'Aidat', 
-                'FUEL': 'Yakıt',
-                'OTHER': 'Diğer'
-            })
-            df_indir['Durum'] = df_indir['Durum'].replace({'UNPAID': 'Ödenmedi', 'PAID': 'Ödendi'})
-            df_indir['Donem'] = pd.to_datetime(df_indir['Donem']).dt.strftime('%m/%Y')
-            df_indir.columns = ["Blok", "Daire No", "Ev Sahibi", "Borç Türü", "Tutar (TL)", "Dönem", "Ödeme Durumu"]
-            csv = df_indir.to_csv(index=False).encode('utf-8-sig')
-            
-            st.success("Liste başarıyla hazırlandı!")
-            st.download_button(
-                label="📥 Borç Listesini İndir (Türkçe)",
-                data=csv,
-                file_name='site_borc_listesi_guncel.csv',
-                mime='text/csv',
-                use_container_width=True
-            )
-        else:
-            st.info("İndirilecek borç verisi bulunamadı.")
+    # Liste indirme anında, seçili site için parça parça geçici dosyaya yazılır
+    bicimler = list(BORC_LISTESI_BICIMLERI)
+    e1, e2 = st.columns([1, 2])
+    with e1:
+        bicim = st.selectbox("Dosya Biçimi:", bicimler, format_func=lambda b: BORC_LISTESI_BICIMLERI[b][0])
+    etiket, mime, uzanti, _ = BORC_LISTESI_BICIMLERI[bicim]
+    site_id = st.session_state.selected_site_id
+
+    def borc_listesi_dosyasi():
+        dosya = tempfile.TemporaryFile()
+        borc_listesi_yaz(site_id, dosya, bicim)
+        dosya.seek(0)
+        return dosya
+
+    with e2:
+        st.write("")
+        st.download_button(
+            label=f"📥 Güncel Borç Listesini İndir ({etiket})",
+            data=borc_listesi_dosyasi,
+            file_name=f'site_borc_listesi_guncel.{uzanti}',
+            mime=mime,
+            use_container_width=True
+        )
+    if "xlsx" not in BORC_LISTESI_BICIMLERI:
+        st.caption("💡 Excel (XLSX) çıktısı için `openpyxl` paketini kurun.")
 
     st.divider()
 
@@ -71,13 +58,15 @@ def render_overview_page():
         st.subheader("🗓️ Aylık Tahsilat Trendi")
         tahsilat_df = get_aylik_tahsilat_verisi(st.session_state.selected_site_id)
         if not tahsilat_df.empty:
-            st.bar_chart(tahsilat_df, x='ay', y='toplam', color="#2E7D32")
+            # Dönem tarih ekseninde çizilir; farklı yılların aynı ayları ayrı çubuklardır
+            st.bar_chart(tahsilat_df.rename(columns={"toplam": "Tahsilat", "gider": "Gider"}),
+                         x='Dönem', y=['Tahsilat', 'Gider'], color=["#2E7D32", "#C62828"], stack=False)
         else:
             st.info("Henüz tahsilat verisi bulunmuyor.")
 
     with c2:
         st.subheader("🏢 Blok Bazlı Borç Dağılımı")
-        blok_borc_df = get_blok_borc_verisi(st.session_state.selected_site_id)
+        blok_borc_df = stats["blok_dagilimi"]
         if not blok_borc_df.empty:
             st.bar_chart(blok_borc_df, x='Blok', y='Toplam Borç', color="#C62828")
         else:
@@ -88,11 +77,6 @@ def render_overview_page():
     # --- ÖZET TABLO ---
     st.subheader("📂 Genel Borç Dağılımı")
     
-    engine = get_db_engine()
-    if engine:
-        dist_query = "SELECT type, SUM(expected_amount) FROM debt_item WHERE status != 'PAID' GROUP BY type"
-        dist_df = pd.read_sql(dist_query, engine)
-        
-        if not dist_df.empty:
-            dist_df['type'] = dist_df['type'].replace({'DUES': 'Aidat', 'FUEL': 'Yakıt'})
-            st.dataframe(dist_df, use_container_width=True, hide_index=True)
+    dist_df = stats["borc_dagilimi"]
+    if not dist_df.empty:
+        st.dataframe(dist_df, use_container_width=True, hide_index=True)
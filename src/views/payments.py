@@ -1,24 +1,14 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-from src.database.connection import get_db_engine
+from src.services.directory_service import get_daire_etiketleri
 from src.services.payment_service import kaydet_odeme
 from src.utils.receipt import generate_receipt_html, generate_receipt_text
 
 def render_payments_page():
     st.header("💰 Yeni Tahsilat Girişi")
     
-    engine = get_db_engine()
-
-    # 1. Daire listesini çekelim (Seçim kutusu için)
-    daire_sorgu = f"""
-        SELECT u.id, b.name || ' - Daire ' || u.unit_number || ' (' || u.owner_name || ')' as label
-        FROM unit u
-        JOIN building b ON u.building_id = b.id
-        WHERE b.complex_id = {st.session_state.selected_site_id}
-        ORDER BY b.name ASC, u.unit_number::int ASC
-    """
-    daireler_df = pd.read_sql(daire_sorgu, engine)
+    # 1. Daire listesini çekelim (Seçim kutusu için, önbellekten)
+    daireler_df = get_daire_etiketleri(st.session_state.selected_site_id)
     
     # 2. Ödeme Formu
     with st.form("tahsilat_formu"):
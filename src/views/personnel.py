@@ -1,6 +1,5 @@
 import streamlit as st
-import pandas as pd
-from src.database.connection import get_db_engine
+from src.services.directory_service import get_personel_listesi
 from src.services.personnel_service import kaydet_personel_odeme
 
 def render_personnel_page():
@@ -8,12 +7,13 @@ def render_personnel_page():
     
     tab1, tab2 = st.tabs(["👥 Personel Listesi", "💸 Maaş/Ödeme Yap"])
     
-    engine = get_db_engine()
+    # Liste ve ödeme formu aynı (önbellekteki) personel listesini kullanır
+    p_list = get_personel_listesi(st.session_state.selected_site_id)
 
     with tab1:
         st.subheader("Aktif Personeller")
-        # Veritabanındaki personelleri çekiyoruz
-        personel_df = pd.read_sql(f"SELECT name as \"İsim\", role as \"Görev\", salary as \"Maaş\" FROM employee WHERE complex_id = {st.session_state.selected_site_id}", engine)
+        personel_df = p_list[["name", "role", "salary"]].rename(
+            columns={"name": "İsim", "role": "Görev", "salary": "Maaş"})
         
         if not personel_df.empty:
             st.table(personel_df)
@@ -23,9 +23,6 @@ def render_personnel_page():
     with tab2:
         st.subheader("Ödeme Formu")
         with st.form("personel_odeme_formu", clear_on_submit=True):
-            # Personel seçimi için listeyi tekrar çekelim
-            p_list = pd.read_sql(f"SELECT id, name FROM employee WHERE complex_id = {st.session_state.selected_site_id}", engine)
-            
             if not p_list.empty:
                 secilen_p = st.selectbox("Personel Seçin:", p_list['name'])
                 p_id = p_list[p_list['name'] == secilen_p]['id'].values[0]
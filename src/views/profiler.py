@@ -0,0 +1,47 @@
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+def render_profil_paneli(kayit):
+    """Son çizimin sorgu şelalesini (PROFILER_ENABLED=1 iken) kenar çubuğunda katlanır panelde gösterir."""
+    if kayit is None:
+        return
+
+    with st.sidebar.expander(f"⏱️ Profil: {kayit['toplam_ms']:,.0f} ms", expanded=False):
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Sorgu", kayit["sorgu_sayisi"])
+        m2.metric("DB ms", f"{kayit['db_ms']:,.0f}")
+        m3.metric("Python ms", f"{kayit['python_ms']:,.0f}")
+
+        if not kayit["sorgular"]:
+            st.caption("Bu çizimde veritabanına gidilmedi (önbellekten geldi).")
+            return
+
+        df = pd.DataFrame(kayit["sorgular"])
+        df["sira"] = range(1, len(df) + 1)
+        df["bitis_ms"] = df["baslangic_ms"] + df["sure_ms"]
+        df["cagiran"] = df["cagiran"].fillna("-")
+        df["ozet"] = df["sorgu"].str.replace(r"\s+", " ", regex=True).str.slice(0, 120)
+
+        # Şelale: her sorgu, çizim başlangıcından itibaren çalıştığı aralıkta bir çubuk
+        grafik = alt.Chart(df).mark_bar().encode(
+            x=alt.X("baslangic_ms:Q", title="ms"),
+            x2="bitis_ms:Q",
+            y=alt.Y("sira:O", title=None, axis=None),
+            color=alt.Color("cagiran:N", legend=None),
+            tooltip=["sira", "cagiran", "sure_ms", "satir", "ozet"],
+        ).properties(height=min(24 * len(df), 400))
+        st.altair_chart(grafik, use_container_width=True)
+
+        st.dataframe(
+            df[["sira", "sure_ms", "satir", "cagiran", "ozet"]],
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "sira": "#",
+                "sure_ms": st.column_config.NumberColumn("ms", format="%.1f"),
+                "satir": "Satır",
+                "cagiran": "Çağıran",
+                "ozet": "Sorgu",
+            },
+        )
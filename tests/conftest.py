@@ -0,0 +1,139 @@
+"""
+Ortak test düzeneği. Veritabanı testleri .env'deki PostgreSQL'e (database/ altındaki tüm dosyalar
+uygulanmış olmalı) bağlanır; bağlanılamazsa atlanır.
+Her veritabanı testi kendi geçici sitesini kurar ve sonunda tüm kayıtlarıyla siler:
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import uuid
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+TEST_SITESI_ONEKI = "Pytest Sitesi"
+TIP_AIDATI = 1000
+
+def veritabanina_baglan():
+    import psycopg2
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return psycopg2.connect(host=os.getenv("DB_HOST"), port=os.getenv("DB_PORT"), dbname=os.getenv("DB_NAME"),
+                            user=os.getenv("DB_USER"), password=os.getenv("DB_PASS"), connect_timeout=3)
+
+def ayri_slotlu_baglantilar(sayi=2):
+    """
+    Aylık özette farklı sayaç satırlarına (backend pid mod 16) yazan sayi adet ayrı bağlantı açar;
+    eşzamanlı işlemlerin yalnızca test edilen kilit yüzünden beklemesi için.
+    """
+    baglantilar = {}
+    while len(baglantilar) < sayi:
+        conn = veritabanina_baglan()
+        slot = conn.get_backend_pid() % 16
+        if slot in baglantilar:
+            conn.close()
+        else:
+            baglantilar[slot] = conn
+    return list(baglantilar.values())
+
+@pytest.fixture(scope="session")
+def veritabani():
+    """Veritabanına ulaşılamıyorsa ya da şema kurulmamışsa veritabanı testlerini atlar."""
+    try:
+        conn = veritabanina_baglan()
+    except Exception as e:
+        pytest.skip(f"Veritabanına bağlanılamadı: {e}")
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regproc('fn_rebuild_balances'), to_regproc('fn_distribute_payment_to_debts')")
+            if None in cur.fetchone():
+                pytest.skip("Veritabanı şeması kurulmamış (database/*.sql)")
+    finally:
+        conn.close()
+
+@pytest.fixture
+def test_sitesi(veritabani):
+    """
+    Bir blok ve üç daireden (A-1, A-2, A-3) oluşan, borcu olmayan geçici bir site kurar.
+    Dönüş: {"site_id", "blok_id", "daireler": [unit_id, ...]}
+    """
+    from src.database.connection import db_cursor
+    from src.services.cache_service import tum_onbellegi_temizle
+
+    with db_cursor() as cur:
+        cur.execute("INSERT INTO complex_properties (name, total_units) VALUES (%s, 3) RETURNING id",
+                    (f"{TEST_SITESI_ONEKI} {uuid.uuid4().hex[:8]}",))
+        site_id = cur.fetchone()[0]
+        cur.execute("INSERT INTO unit_type (complex_id, name, default_dues) VALUES (%s, '2+1', %s) RETURNING id",
+                    (site_id, TIP_AIDATI))
+        tip_id = cur.fetchone()[0]
+        cur.execute("INSERT INTO building (complex_id, name) VALUES (%s, 'A') RETURNING id", (site_id,))
+        blok_id = cur.fetchone()[0]
+        cur.execute("""
+            INSERT INTO unit (building_id, unit_type_id, unit_number, owner_name)
+            SELECT %s, %s, n::text, 'Test Sakini ' || n FROM generate_series(1, 3) AS n
+            RETURNING id
+        """, (blok_id, tip_id))
+        daireler = sorted(satir[0] for satir in cur.fetchall())
+    tum_onbellegi_temizle()
+
+    yield {"site_id": site_id, "blok_id": blok_id, "daireler": daireler}
+
+    tum_onbellegi_temizle()
+    with db_cursor() as cur:
+        for sorgu in (
+            "DELETE FROM payment WHERE complex_id = %(s)s",
+            "DELETE FROM account_transaction WHERE complex_id = %(s)s",
+            "DELETE FROM debt_item WHERE unit_id = ANY(%(d)s)",
+            "DELETE FROM unit_balance WHERE unit_id = ANY(%(d)s)",
+            "DELETE FROM unit WHERE id = ANY(%(d)s)",
+            "DELETE FROM complex_properties WHERE id = %(s)s",
+        ):
+            cur.execute(sorgu, {"s": site_id, "d": daireler})
+
+def borc_ekle(unit_id, donem, tutar, tur="DUES"):
+    """Daireye UNPAID bir borç yazar; id'sini döner."""
+    from src.database.connection import db_cursor
+
+    with db_cursor() as cur:
+        cur.execute("""
+            INSERT INTO debt_item (unit_id, type, period_month, expected_amount, status)
+            VALUES (%s, %s, %s, %s, 'UNPAID') RETURNING id
+        """, (unit_id, tur, donem, tutar))
+        return cur.fetchone()[0]
+
+def sorgula(sorgu, parametreler=None):
+    """Tek sorgu çalıştırıp tüm satırları döner."""
+    from src.database.connection import db_cursor
+
+    with db_cursor() as cur:
+        cur.execute(sorgu, parametreler)
+        return cur.fetchall()
+
+def hareketleri_isle(test_sitesi):
+    """
+    Toplu aidat, yakıt, diğer borç, ödemeler, borç silme ve güncelleme, gider: özet tablolarını
+    güncelleyen tüm tetikleyici yollarından geçen ortak bir senaryo.
+    """
+    from src.services.bulk_ops_service import add_bulk_dues_range
+    from src.services.payment_service import kaydet_odeme
+
+    site_id, (d1, d2, d3) = test_sitesi["site_id"], test_sitesi["daireler"]
+    assert add_bulk_dues_range(site_id, date(2025, 9, 1), date(2025, 11, 1), {})["eklenen"] == 9
+    borc_ekle(d1, "2025-10-01", 640, tur="FUEL")
+    silinecek = borc_ekle(d2, "2025-10-01", 250, tur="OTHER")
+    borc_ekle(d3, "2025-11-01", 500, tur="OTHER")
+    sorgula("DELETE FROM debt_item WHERE id = %s RETURNING id", (silinecek,))
+    assert kaydet_odeme(site_id, d1, 1800, "test")
+    assert kaydet_odeme(site_id, d2, 3000, "test")
+    sorgula("UPDATE debt_item SET expected_amount = 1200 WHERE unit_id = %s AND type = 'DUES' "
+            "AND period_month = '2025-11-01' RETURNING id", (d3,))
+    sorgula("""
+        INSERT INTO account_transaction (complex_id, type, category, amount, process_date)
+        VALUES (%s, 'EXPENSE', 'Temizlik', 450, '2025-10-15') RETURNING id
+    """, (site_id,))
@@ -0,0 +1,64 @@
+"""Tetikleyicilerle tutulan aylık site özetinin (monthly_site_summary) kaynak tablolarla tutarlılığı; veritabanı gerektirir."""
+from datetime import date
+from decimal import Decimal
+
+from conftest import ayri_slotlu_baglantilar, hareketleri_isle, sorgula
+from src.services.overview_service import get_aylik_tahsilat_verisi
+
+def _aylik_ozet(site_id):
+    return sorgula("""
+        SELECT period_month::text, SUM(collected), SUM(expense), SUM(new_debt)
+        FROM monthly_site_summary
+        WHERE complex_id = %s
+        GROUP BY period_month
+        HAVING SUM(collected) <> 0 OR SUM(expense) <> 0 OR SUM(new_debt) <> 0
+        ORDER BY period_month
+    """, (site_id,))
+
+def test_aylik_ozet_kaynak_tablolarla_tutarli(test_sitesi):
+    hareketleri_isle(test_sitesi)
+    site_id = test_sitesi["site_id"]
+    bu_ay = date.today().replace(day=1).isoformat()
+
+    # Aidat 3 daire x 1000 (Kasım'da bir daire 1200), Ekim yakıtı 640, Kasım diğer borcu 500; silinen borç düşülür
+    assert _aylik_ozet(site_id) == [
+        ("2025-09-01", Decimal("0.00"), Decimal("0.00"), Decimal("3000.00")),
+        ("2025-10-01", Decimal("0.00"), Decimal("450.00"), Decimal("3640.00")),
+        ("2025-11-01", Decimal("0.00"), Decimal("0.00"), Decimal("3700.00")),
+        (bu_ay, Decimal("4800.00"), Decimal("0.00"), Decimal("0.00")),
+    ]
+    trend = get_aylik_tahsilat_verisi(site_id, ay_sayisi=1)
+    assert trend[["toplam", "gider", "yeni_borc"]].values.tolist() == [[4800.0, 0.0, 0.0]]
+
+def test_yeniden_olusturma_ozeti_degistirmez(test_sitesi):
+    hareketleri_isle(test_sitesi)
+    site_id = test_sitesi["site_id"]
+    once = _aylik_ozet(site_id)
+
+    sorgula("SELECT fn_rebuild_monthly_site_summary(%s)", (site_id,))
+
+    assert _aylik_ozet(site_id) == once
+    # Yeniden oluşturma her site-ayı tek bir sayaç satırına (slot 0) toplar
+    assert sorgula("SELECT DISTINCT slot FROM monthly_site_summary WHERE complex_id = %s", (site_id,)) == [(0,)]
+
+def test_farkli_oturumlar_ayni_ay_satirini_beklemez(test_sitesi):
+    site_id = test_sitesi["site_id"]
+    # Sayaç satırları farklı olan iki oturum: ilkinin işlemi açıkken ikincisi kilit beklememeli
+    birinci, ikinci = ayri_slotlu_baglantilar()
+    gider = """
+        INSERT INTO account_transaction (complex_id, type, category, amount, process_date)
+        VALUES (%s, 'EXPENSE', 'Temizlik', 100, '2025-10-15')
+    """
+    try:
+        with birinci.cursor() as cur:
+            cur.execute(gider, (site_id,))
+        with ikinci.cursor() as cur:
+            cur.execute("SET lock_timeout = '2s'")
+            cur.execute(gider, (site_id,))
+        ikinci.commit()
+        birinci.commit()
+    finally:
+        birinci.close()
+        ikinci.close()
+
+    assert _aylik_ozet(site_id) == [("2025-10-01", Decimal("0.00"), Decimal("200.00"), Decimal("0.00"))]
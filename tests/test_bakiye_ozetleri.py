@@ -0,0 +1,97 @@
+"""Tetikleyicilerle tutulan daire bakiyeleri ve blok / site toplam görünümlerinin tutarlılığı; veritabanı gerektirir."""
+from decimal import Decimal
+
+from conftest import ayri_slotlu_baglantilar, borc_ekle, hareketleri_isle, sorgula
+from src.services.debt_service import bakiyeleri_yeniden_olustur, get_toplu_borc_haritasi
+from src.services.overview_service import get_genel_istatistikler
+
+def _daire_bakiyeleri(site_id):
+    """unit_balance satırları ve debt_item'dan baştan hesaplanan açık bakiyeler: (özet, gerçek)."""
+    ozet = sorgula("""
+        SELECT ub.unit_id, ub.dues, ub.fuel, ub.other
+        FROM unit_balance ub
+        JOIN unit u ON u.id = ub.unit_id
+        JOIN building b ON b.id = u.building_id
+        WHERE b.complex_id = %s AND ub.total <> 0
+        ORDER BY ub.unit_id
+    """, (site_id,))
+    gercek = sorgula("""
+        SELECT d.unit_id,
+               COALESCE(SUM(d.remaining_amount) FILTER (WHERE d.type = 'DUES'), 0),
+               COALESCE(SUM(d.remaining_amount) FILTER (WHERE d.type = 'FUEL'), 0),
+               COALESCE(SUM(d.remaining_amount) FILTER (WHERE d.type = 'OTHER'), 0)
+        FROM debt_item d
+        JOIN unit u ON u.id = d.unit_id
+        JOIN building b ON b.id = u.building_id
+        WHERE b.complex_id = %s AND d.status <> 'PAID'
+        GROUP BY d.unit_id
+        HAVING SUM(d.remaining_amount) <> 0
+        ORDER BY d.unit_id
+    """, (site_id,))
+    return ozet, gercek
+
+def test_daire_bakiyeleri_borclarla_tutarli(test_sitesi):
+    hareketleri_isle(test_sitesi)
+    ozet, gercek = _daire_bakiyeleri(test_sitesi["site_id"])
+    assert ozet == gercek
+    assert len(ozet) == 2  # İkinci daire borcunun tamamını ödedi
+
+def test_blok_ve_site_toplamlari_daire_bakiyelerinden_gelir(test_sitesi):
+    hareketleri_isle(test_sitesi)
+    site_id = test_sitesi["site_id"]
+    _, gercek = _daire_bakiyeleri(site_id)
+    toplam = sum(sum(satir[1:]) for satir in gercek)
+
+    assert sorgula("SELECT total FROM complex_balance WHERE complex_id = %s", (site_id,)) == [(toplam,)]
+    assert sorgula("SELECT total FROM building_balance WHERE building_id = %s",
+                   (test_sitesi["blok_id"],)) == [(toplam,)]
+
+    istatistik = get_genel_istatistikler(site_id)
+    assert istatistik["toplam_alacak"] == float(toplam)
+    assert istatistik["blok_dagilimi"].values.tolist() == [["A", float(toplam)]]
+    harita = get_toplu_borc_haritasi(site_id)
+    assert sum(detay["toplam"] for detay in harita.values()) == float(toplam)
+
+def test_yeniden_olusturma_bakiyeleri_degistirmez(test_sitesi):
+    hareketleri_isle(test_sitesi)
+    site_id = test_sitesi["site_id"]
+    once = _daire_bakiyeleri(site_id)[0]
+
+    assert bakiyeleri_yeniden_olustur(site_id)
+
+    assert _daire_bakiyeleri(site_id)[0] == once
+
+def test_yeniden_olusturma_sapmayi_onarir(test_sitesi):
+    hareketleri_isle(test_sitesi)
+    site_id, daire = test_sitesi["site_id"], test_sitesi["daireler"][0]
+    sorgula("UPDATE unit_balance SET dues = dues + 999 WHERE unit_id = %s RETURNING unit_id", (daire,))
+    ozet, gercek = _daire_bakiyeleri(site_id)
+    assert ozet != gercek
+
+    assert bakiyeleri_yeniden_olustur(site_id)
+    ozet, gercek = _daire_bakiyeleri(site_id)
+    assert ozet == gercek
+
+def test_ayni_sitenin_farkli_daire_odemeleri_birbirini_beklemez(test_sitesi):
+    site_id, (d1, d2, _) = test_sitesi["site_id"], test_sitesi["daireler"]
+    borc_ekle(d1, "2025-10-01", 1000)
+    borc_ekle(d2, "2025-10-01", 1000)
+    odeme = """
+        INSERT INTO payment (complex_id, unit_id, amount, process_date, description)
+        VALUES (%s, %s, 400, CURRENT_TIMESTAMP, 'test')
+    """
+    # Ortak bir blok / site bakiye satırı olsaydı ikinci ödeme ilkinin işlemini beklerdi
+    birinci, ikinci = ayri_slotlu_baglantilar()
+    try:
+        with birinci.cursor() as cur:
+            cur.execute(odeme, (site_id, d1))
+        with ikinci.cursor() as cur:
+            cur.execute("SET lock_timeout = '2s'")
+            cur.execute(odeme, (site_id, d2))
+        ikinci.commit()
+        birinci.commit()
+    finally:
+        birinci.close()
+        ikinci.close()
+
+    assert sorgula("SELECT total FROM complex_balance WHERE complex_id = %s", (site_id,)) == [(Decimal("1200.00"),)]
@@ -0,0 +1,135 @@
+import itertools
+
+import pytest
+
+from src.services import cache_service
+from src.services.cache_service import (TABLO_VARLIKLARI, gecersiz_kil, get_onbellek_metrikleri, olay_gecersiz_kil,
+                                        onbellekle, sonucu_onbellege_alma, tum_onbellegi_temizle)
+
+_sayac = itertools.count()
+
+@pytest.fixture
+def varlik():
+    """Her teste kendi önbellek varlığı: süreç geneli önbellekler testler arasında karışmasın."""
+    ad = f"test_varlik_{next(_sayac)}"
+    yield ad
+    with cache_service._kilit:
+        for sozluk in (cache_service._onbellekler, cache_service._metrikler, cache_service._nesil):
+            sozluk.pop(ad, None)
+
+def _sayan_servis(varlik, kapsam=lambda site_id, unit_id=None, **_: (site_id, unit_id), **ayarlar):
+    """Gerçekten kaç kez çalıştığını sayan önbellekli sahte bir okuma servisi."""
+    cagrilar = []
+
+    @onbellekle(varlik, kapsam=kapsam, **ayarlar)
+    def servis(site_id, unit_id=None, **kwargs):
+        cagrilar.append((site_id, unit_id, kwargs))
+        return {"site": site_id, "daire": unit_id, "liste": [1, 2, 3]}
+
+    return servis, cagrilar
+
+def test_ayni_argumanlar_onbellekten_gelir(varlik):
+    servis, cagrilar = _sayan_servis(varlik)
+    assert servis(1) == servis(1)
+    assert len(cagrilar) == 1
+    assert get_onbellek_metrikleri()[varlik] == {"giris": 1, "kapasite": 256, "isabet": 1, "iska": 1}
+
+def test_anahtar_argumanlari_ve_kwargs_icerir(varlik):
+    servis, cagrilar = _sayan_servis(varlik)
+    servis(1)
+    servis(2)
+    servis(1, 5)
+    servis(1, unit_id=5)
+    servis(1, ay=12)
+    servis(1, ay=6)
+    servis(1, ay=12)
+    assert len(cagrilar) == 6
+
+def test_donen_deger_kopyadir(varlik):
+    servis, _ = _sayan_servis(varlik)
+    servis(1)["liste"].append(99)
+    assert servis(1)["liste"] == [1, 2, 3]
+
+def test_site_kapsamli_gecersiz_kilma_diger_siteye_dokunmaz(varlik):
+    servis, cagrilar = _sayan_servis(varlik)
+    servis(1)
+    servis(2)
+    assert gecersiz_kil((varlik,), site_id=1) == 1
+    servis(1)
+    servis(2)
+    assert [c[0] for c in cagrilar] == [1, 2, 1]
+
+def test_daire_kapsamli_gecersiz_kilma(varlik):
+    # Daire girişleri siteye bağlı değil (site_id None): daireye yazma yalnızca o daireyi
+    # ve daireye bağlı olmayan site girişlerini siler
+    servis, cagrilar = _sayan_servis(varlik, kapsam=lambda site_id, unit_id=None: (None if unit_id else site_id,
+                                                                                   unit_id))
+    servis(1, 10)
+    servis(1, 11)
+    servis(1)
+    assert gecersiz_kil((varlik,), unit_id=10) == 2
+    servis(1, 10)
+    servis(1, 11)
+    servis(1)
+    assert [(c[0], c[1]) for c in cagrilar] == [(1, 10), (1, 11), (1, None), (1, 10), (1, None)]
+
+def test_kapsamsiz_gecersiz_kilma_varligi_temizler(varlik):
+    servis, cagrilar = _sayan_servis(varlik)
+    servis(1)
+    servis(2)
+    assert gecersiz_kil((varlik,)) == 2
+    assert get_onbellek_metrikleri()[varlik]["giris"] == 0
+
+def test_olay_gecersiz_kil_tablo_eslemesini_kullanir(varlik, monkeypatch):
+    monkeypatch.setitem(TABLO_VARLIKLARI, "test_tablosu", (varlik,))
+    servis, cagrilar = _sayan_servis(varlik)
+    servis(1)
+    assert olay_gecersiz_kil("bilinmeyen_tablo", 1) == 0
+    assert olay_gecersiz_kil("test_tablosu", 1) == 1
+    servis(1)
+    assert len(cagrilar) == 2
+
+def test_yazma_tablolari_okuma_varliklarini_eskitir():
+    # Ödeme bakiyeleri, borç haritasını, ekstreyi ve genel bakış özetlerini eskitmeli
+    for varlik in ("daire_bakiyesi", "borc_haritasi", "daire_extresi", "genel_istatistik", "aylik_ozet"):
+        assert varlik in TABLO_VARLIKLARI["payment"]
+        assert varlik in TABLO_VARLIKLARI["debt_item"]
+    assert "gider_listesi" in TABLO_VARLIKLARI["account_transaction"]
+
+def test_hatali_sonuc_onbellege_alinmaz(varlik):
+    cagrilar = []
+
+    @onbellekle(varlik, kapsam=lambda site_id: (site_id, None))
+    def servis(site_id):
+        cagrilar.append(site_id)
+        if len(cagrilar) == 1:
+            sonucu_onbellege_alma()
+            return None
+        return "veri"
+
+    assert servis(1) is None
+    assert servis(1) == "veri"
+    assert servis(1) == "veri"
+    assert len(cagrilar) == 2
+
+def test_sorgu_surerken_gecersiz_kilinan_sonuc_yazilmaz(varlik):
+    # Sorgu sürerken başka bir iş parçacığı yazıp geçersiz kılarsa eski sonuç önbelleğe girmemeli
+    cagrilar = []
+
+    @onbellekle(varlik, kapsam=lambda site_id: (site_id, None))
+    def servis(site_id):
+        cagrilar.append(site_id)
+        if len(cagrilar) == 1:
+            gecersiz_kil((varlik,), site_id=site_id)
+        return len(cagrilar)
+
+    assert servis(1) == 1
+    assert servis(1) == 2
+    assert servis(1) == 2
+
+def test_tum_onbellegi_temizle(varlik):
+    servis, cagrilar = _sayan_servis(varlik)
+    servis(1)
+    tum_onbellegi_temizle()
+    servis(1)
+    assert len(cagrilar) == 2
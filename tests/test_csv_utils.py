@@ -0,0 +1,65 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.csv_utils import csv_parcalari, csv_yapisini_kokla, tr_sayiya_cevir
+
+@pytest.mark.parametrize("metin, beklenen", [
+    ("1.234,56", 1234.56),
+    ("1234,56", 1234.56),
+    ("1234.56", 1234.56),
+    ("₺1.234.567", 1234567.0),
+    ("1.500", 1500.0),
+    ("₺1.250", 1250.0),
+    ("12.345", 12345.0),
+    ("1.5", 1.5),
+    ("12.345.678,9 TL", 12345678.9),
+    (" 750 ", 750.0),
+])
+def test_tr_sayiya_cevir_ayiricilar(metin, beklenen):
+    assert tr_sayiya_cevir(pd.Series([metin]))[0] == pytest.approx(beklenen)
+
+def test_tr_sayiya_cevir_bos_ve_gecersiz_nan_olur():
+    sonuc = tr_sayiya_cevir(pd.Series(["", None, "yok", "12,5"]))
+    assert sonuc[:3].isna().all()
+    assert sonuc[3] == 12.5
+
+def test_tr_sayiya_cevir_sayisal_seri_oldugu_gibi_doner():
+    sonuc = tr_sayiya_cevir(pd.Series([1, 2, 3]))
+    assert sonuc.dtype == float
+    assert sonuc.tolist() == [1.0, 2.0, 3.0]
+
+def test_kokla_utf8_virgul():
+    dosya = io.BytesIO("Blok,Daire No,Tutar\nA,1,\"1.250,00\"\nA,2,900\n".encode("utf-8-sig"))
+    assert csv_yapisini_kokla(dosya) == {"encoding": "utf-8-sig", "sep": ",", "skiprows": 0}
+    assert dosya.tell() == 0
+
+def test_kokla_cp1254_noktali_virgul_ve_ust_bilgi_satirlari():
+    metin = "Yakıt Dağıtım Listesi\nOluşturma: 01.12.2025\nBlok;Daire No;Tutar\nA;1;1.250,00\nŞ;2;900\n"
+    yapi = csv_yapisini_kokla(io.BytesIO(metin.encode("cp1254")))
+    assert yapi == {"encoding": "cp1254", "sep": ";", "skiprows": 2}
+
+def test_kokla_onekte_yarim_kalan_utf8_karakteri():
+    # Önek çok baytlı bir karakterin (ş) ortasında bitiyor; kodlama yine UTF-8 sayılmalı
+    metin = "Blok;Daire No;Sakin\n" + "A;1;Ayşe\n" * 50
+    ham = metin.encode("utf-8")
+    kesim = ham.index("ş".encode("utf-8")) + 1
+    yapi = csv_yapisini_kokla(io.BytesIO(ham), onek_bayt=kesim)
+    assert yapi["encoding"] == "utf-8-sig"
+
+def test_csv_parcalari_parca_boyutu_ve_ilerleme():
+    satirlar = "".join(f"A;{i};{i * 10}\n" for i in range(1, 26))
+    dosya = io.BytesIO(f" Blok ;Daire No; Tutar \n{satirlar}".encode("utf-8"))
+    yapi = csv_yapisini_kokla(dosya)
+
+    parcalar = list(csv_parcalari(dosya, yapi, parca_boyutu=10))
+    assert [len(parca) for parca, _ in parcalar] == [10, 10, 5]
+    assert list(parcalar[0][0].columns) == ["Blok", "Daire No", "Tutar"]
+    # Hücreler metin olarak gelir (tr_sayiya_cevir'e hazır)
+    assert parcalar[0][0]["Tutar"].iloc[0] == "10"
+    oranlar = [oran for _, oran in parcalar]
+    assert oranlar == sorted(oranlar)
+    assert oranlar[-1] == 1.0
+    assert np.all((np.array(oranlar) > 0) & (np.array(oranlar) <= 1))
@@ -0,0 +1,42 @@
+"""Arka plan iş kayıtlarının durum geçişleri ve nabzı; veritabanı gerektirir."""
+import time
+
+from conftest import sorgula
+from src.services import job_service
+
+def _is_kaydi(site_id):
+    return sorgula("""
+        INSERT INTO background_job (complex_id, kind, runner) VALUES (%s, 'test', %s) RETURNING id
+    """, (site_id, job_service.SUREC_KIMLIGI))[0][0]
+
+def _durum(is_id):
+    return sorgula("SELECT status, result IS NOT NULL, error FROM background_job WHERE id = %s", (is_id,))[0]
+
+def test_calisirken_kapatilan_is_sonucla_geri_acilmaz(test_sitesi):
+    is_id = _is_kaydi(test_sitesi["site_id"])
+
+    def _is():
+        # Zaman aşımı taraması iş sürerken kaydı kapatır
+        sorgula("UPDATE background_job SET status = 'FAILED', error = 'yarım' WHERE id = %s RETURNING id",
+                (is_id,))
+        return {"eklenen": 1}
+
+    job_service._calistir(is_id, _is, (), {})
+
+    assert _durum(is_id) == ("FAILED", False, "yarım")
+
+def test_ilerleme_bildirmeyen_is_nabiz_yazar(test_sitesi, monkeypatch):
+    monkeypatch.setattr(job_service, "NABIZ_ARALIGI_SN", 0.05)
+    is_id = _is_kaydi(test_sitesi["site_id"])
+    zamanlar = []
+
+    def _is():
+        for _ in range(2):
+            zamanlar.append(sorgula("SELECT updated_at FROM background_job WHERE id = %s", (is_id,))[0][0])
+            time.sleep(0.3)
+        return {"eklenen": 0}
+
+    job_service._calistir(is_id, _is, (), {})
+
+    assert zamanlar[1] > zamanlar[0]
+    assert _durum(is_id) == ("DONE", True, None)
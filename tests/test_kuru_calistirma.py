@@ -0,0 +1,128 @@
+"""Toplu borç işlemlerinin kuru çalıştırma (dry-run) fark raporları; veritabanı gerektirir."""
+import io
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from conftest import TIP_AIDATI, borc_ekle, sorgula
+from src.services.bulk_ops_service import (_bos_aktarim_sonucu, add_bulk_dues, add_bulk_dues_range, akisla_aktar,
+                                           process_bulk_fuel_csv, process_past_debts_csv,
+                                           process_past_debts_csv_stream)
+
+def _borc_sayisi(site_id):
+    return sorgula("""
+        SELECT COUNT(*) FROM debt_item d
+        JOIN unit u ON u.id = d.unit_id
+        JOIN building b ON b.id = u.building_id
+        WHERE b.complex_id = %s
+    """, (site_id,))[0][0]
+
+def _islemler(fark):
+    """Fark raporunun sıralı (daire no, işlem) çiftleri."""
+    return sorted(zip(fark["Daire No"].astype(str), fark["İşlem"]))
+
+def test_aidat_kuru_calistirma_yazmaz_ve_yazilacaklari_listeler(test_sitesi):
+    site_id, (d1, _, _) = test_sitesi["site_id"], test_sitesi["daireler"]
+    borc_ekle(d1, "2025-12-01", TIP_AIDATI)
+    once = _borc_sayisi(site_id)
+
+    sonuc = add_bulk_dues(site_id, 900, date(2025, 12, 1), kuru_calistirma=True)
+
+    assert (sonuc["eklenen"], sonuc["atlanan"]) == (2, 1)
+    assert _islemler(sonuc["fark"]) == [("1", "DEĞİŞMEYECEK"), ("2", "EKLENECEK"), ("3", "EKLENECEK")]
+    assert _borc_sayisi(site_id) == once
+
+def test_aidat_kuru_calistirma_gercek_calistirmayla_ayni_sayilari_verir(test_sitesi):
+    site_id, (d1, d2, _) = test_sitesi["site_id"], test_sitesi["daireler"]
+    borc_ekle(d1, "2025-10-01", 800)
+    borc_ekle(d2, "2025-10-01", 800)
+    sorgula("UPDATE debt_item SET paid_amount = 100, status = 'PARTIAL' WHERE unit_id = %s RETURNING id", (d2,))
+    plan = {date(2025, 10, 1): 0, date(2025, 11, 1): 0}
+
+    kuru = add_bulk_dues_range(site_id, date(2025, 10, 1), date(2025, 11, 1), plan, kuru_calistirma=True)
+    assert _islemler(kuru["fark"]) == [("1", "EKLENECEK"), ("1", "GÜNCELLENECEK"), ("2", "DEĞİŞMEYECEK"),
+                                       ("2", "EKLENECEK"), ("3", "EKLENECEK"), ("3", "EKLENECEK")]
+
+    gercek = add_bulk_dues_range(site_id, date(2025, 10, 1), date(2025, 11, 1), plan)
+    assert [gercek[alan] for alan in ("eklenen", "guncellenen", "atlanan")] == \
+           [kuru[alan] for alan in ("eklenen", "guncellenen", "atlanan")] == [4, 1, 1]
+
+def test_yakit_kuru_calistirma_eslesmeyen_ve_tekrarlanan_satirlari_raporlar(test_sitesi):
+    site_id, (d1, _, _) = test_sitesi["site_id"], test_sitesi["daireler"]
+    borc_ekle(d1, "2025-11-01", 300, tur="FUEL")
+    once = _borc_sayisi(site_id)
+    df = pd.DataFrame({
+        "Blok": ["A", "A", "A", "A", "B"],
+        "Daire No": ["1", "2", "2", "3", "1"],
+        "Tutar": ["450,50", "300", "310", "", "100"],
+        "Donem": ["01.11.2025"] * 5,
+    })
+
+    sonuc = process_bulk_fuel_csv(site_id, df, kuru_calistirma=True)
+
+    assert (sonuc["eklenen"], sonuc["guncellenen"], sonuc["degismeyen"]) == (1, 1, 0)
+    assert _islemler(sonuc["fark"]) == [("1", "EŞLEŞMEYEN SATIR"), ("1", "GÜNCELLENECEK"), ("2", "EKLENECEK"),
+                                        ("2", "TEKRARLANAN SATIR")]
+    assert sonuc["tekrarlanan"][["Daire No", "Tutar"]].values.tolist() == [["2", "310"]]
+    guncellenecek = sonuc["fark"][sonuc["fark"]["İşlem"] == "GÜNCELLENECEK"].iloc[0]
+    assert (float(guncellenecek["Mevcut Tutar"]), float(guncellenecek["Yeni Tutar"])) == (300.0, 450.5)
+    assert _borc_sayisi(site_id) == once
+
+def test_gecmis_borc_kuru_calistirma_silinecekleri_listeler(test_sitesi):
+    site_id, (d1, d2, _) = test_sitesi["site_id"], test_sitesi["daireler"]
+    borc_ekle(d1, "2025-06-01", 700)
+    odenmis = borc_ekle(d2, "2025-06-01", 700)
+    sorgula("UPDATE debt_item SET paid_amount = 700, status = 'PAID' WHERE id = %s RETURNING id", (odenmis,))
+    once = _borc_sayisi(site_id)
+    df = pd.DataFrame({"Blok": ["A", "A"], "Daire No": ["1", "3"],
+                       "Geçmiş Aidat Borcu": ["1.500,00", "0"], "Ekim Yakıt": ["200", ""]})
+
+    sonuc = process_past_debts_csv(site_id, df, temizlik_siniri=date(2025, 9, 1), kuru_calistirma=True)
+
+    # Yalnızca ödeme almamış eski borç silinir; ödenmiş olan korunur
+    assert _islemler(sonuc["fark"]) == [("1", "EKLENECEK"), ("1", "EKLENECEK"), ("1", "SİLİNECEK")]
+    assert _borc_sayisi(site_id) == once
+
+    sessiz = process_past_debts_csv(site_id, df, temizlik_siniri=date(2025, 9, 1), kuru_calistirma=True,
+                                    silinecekleri_raporla=False)
+    assert "SİLİNECEK" not in set(sessiz["fark"]["İşlem"])
+
+def test_parcali_kuru_calistirma_silinecekleri_bir_kez_listeler(test_sitesi, monkeypatch):
+    site_id, (d1, _, _) = test_sitesi["site_id"], test_sitesi["daireler"]
+    borc_ekle(d1, "2025-06-01", 700)
+    # Eski borç, dosyada yeniden yüklenen dönemle aynı: temizlik sonrası EKLENECEK sayılmalı
+    borc_ekle(d1, "2025-10-01", 200, tur="FUEL")
+    once = _borc_sayisi(site_id)
+    dosya = io.BytesIO("Blok;Daire No;Ekim Yakıt\nA;1;200\nA;2;250\nA;3;300\n".encode("utf-8"))
+    monkeypatch.setattr("src.services.bulk_ops_service.PARCA_BOYUTU", 1)
+
+    sonuc = process_past_debts_csv_stream(site_id, dosya, temizlik_siniri=date(2025, 11, 1), kuru_calistirma=True)
+
+    assert sonuc["hata"] is None
+    assert _islemler(sonuc["fark"]) == [("1", "EKLENECEK"), ("1", "SİLİNECEK"), ("1", "SİLİNECEK"),
+                                        ("2", "EKLENECEK"), ("3", "EKLENECEK")]
+    assert _borc_sayisi(site_id) == once
+
+def test_parcalar_arasi_tekrar_eden_anahtar_yakalanir(test_sitesi, monkeypatch):
+    site_id = test_sitesi["site_id"]
+    once = _borc_sayisi(site_id)
+    dosya = io.BytesIO("Blok;Daire No;Ekim Yakıt\nA;2;250\nA;2;275\n".encode("utf-8"))
+    monkeypatch.setattr("src.services.bulk_ops_service.PARCA_BOYUTU", 1)
+
+    sonuc = process_past_debts_csv_stream(site_id, dosya, kuru_calistirma=True)
+
+    assert sonuc["hata"] is None
+    assert _islemler(sonuc["fark"]) == [("2", "EKLENECEK"), ("2", "TEKRARLANAN SATIR")]
+    assert _borc_sayisi(site_id) == once
+
+@pytest.mark.parametrize("kuru, eylem", [(True, "incelendi"), (False, "yazıldı")])
+def test_akisla_aktar_hata_metni_kuru_calistirmayi_belirtir(kuru, eylem):
+    dosya = io.BytesIO("Blok;Daire No;Tutar\nA;1;100\nA;2;200\nA;3;300\n".encode("utf-8"))
+
+    def isle(parca, ilk, gorulen_anahtarlar):
+        return {**_bos_aktarim_sonucu(), "hata": None if ilk else "Bozuk satır"}
+
+    sonuc = akisla_aktar(dosya, isle, parca_boyutu=2, kuru_calistirma=kuru)
+
+    assert sonuc["hata"] == f"Bozuk satır (hata öncesinde 2 satır {eylem})"
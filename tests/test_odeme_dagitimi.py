@@ -0,0 +1,115 @@
+"""Ödeme dağıtım tetikleyicisi (FIFO, paid_amount) ve sapma raporu; veritabanı gerektirir."""
+from decimal import Decimal
+
+from conftest import borc_ekle, sorgula
+from src.services.debt_service import dogrula_odenen_tutarlar, get_detayli_borc
+from src.services.payment_service import kaydet_odeme
+
+def _borclar(unit_id):
+    return sorgula("""
+        SELECT period_month::text, type, expected_amount, status
+        FROM debt_item WHERE unit_id = %s ORDER BY period_month, type
+    """, (unit_id,))
+
+def _odenenler(unit_id):
+    return sorgula("""
+        SELECT period_month::text, paid_amount, remaining_amount
+        FROM debt_item WHERE unit_id = %s ORDER BY period_month, type
+    """, (unit_id,))
+
+def _dagitimlar(unit_id):
+    return sorgula("""
+        SELECT d.period_month::text, pd.covered_amount
+        FROM payment_debt pd
+        JOIN debt_item d ON d.id = pd.debt_item_id
+        WHERE d.unit_id = %s
+        ORDER BY pd.payment_id, d.period_month
+    """, (unit_id,))
+
+def test_odeme_en_eski_borctan_baslayarak_dagitilir(test_sitesi):
+    site_id, daire = test_sitesi["site_id"], test_sitesi["daireler"][0]
+    # Eklenme sırası dönem sırasından farklı: dağıtım id'ye değil döneme göre yapılmalı
+    borc_ekle(daire, "2025-11-01", 1000)
+    borc_ekle(daire, "2025-10-01", 1000)
+    borc_ekle(daire, "2025-12-01", 1000)
+
+    assert kaydet_odeme(site_id, daire, 1500, "test")
+
+    assert _borclar(daire) == [
+        ("2025-10-01", "DUES", Decimal("1000.00"), "PAID"),
+        ("2025-11-01", "DUES", Decimal("1000.00"), "PARTIAL"),
+        ("2025-12-01", "DUES", Decimal("1000.00"), "UNPAID"),
+    ]
+    assert _dagitimlar(daire) == [("2025-10-01", Decimal("1000.00")), ("2025-11-01", Decimal("500.00"))]
+
+def test_kismi_odemeler_ayni_borcu_tamamlar(test_sitesi):
+    site_id, daire = test_sitesi["site_id"], test_sitesi["daireler"][0]
+    borc_ekle(daire, "2025-10-01", 1000)
+    borc_ekle(daire, "2025-11-01", 800, tur="FUEL")
+
+    assert kaydet_odeme(site_id, daire, 400, "1. taksit")
+    assert kaydet_odeme(site_id, daire, 900, "2. taksit")
+
+    assert [(b[0], b[3]) for b in _borclar(daire)] == [("2025-10-01", "PAID"), ("2025-11-01", "PARTIAL")]
+    assert _dagitimlar(daire) == [("2025-10-01", Decimal("400.00")), ("2025-10-01", Decimal("600.00")),
+                                  ("2025-11-01", Decimal("300.00"))]
+
+def test_fazla_odeme_borclari_kapatir_fazlasi_dagitilmaz(test_sitesi):
+    site_id, daire = test_sitesi["site_id"], test_sitesi["daireler"][0]
+    borc_ekle(daire, "2025-10-01", 1000)
+    borc_ekle(daire, "2025-11-01", 1000)
+
+    assert kaydet_odeme(site_id, daire, 5000, "toplu")
+
+    assert {b[3] for b in _borclar(daire)} == {"PAID"}
+    assert sum(tutar for _, tutar in _dagitimlar(daire)) == Decimal("2000.00")
+    # Ödemenin tamamı kasaya gelir olarak işlenir
+    assert sorgula("SELECT type, amount FROM account_transaction WHERE complex_id = %s",
+                   (site_id,)) == [("INCOME", Decimal("5000.00"))]
+
+def test_odeme_yalnizca_kendi_dairesinin_borclarini_kapatir(test_sitesi):
+    site_id, (daire, komsu, _) = test_sitesi["site_id"], test_sitesi["daireler"]
+    borc_ekle(daire, "2025-10-01", 1000)
+    borc_ekle(komsu, "2025-09-01", 1000)
+
+    assert kaydet_odeme(site_id, daire, 1000, "test")
+
+    assert _borclar(komsu)[0][3] == "UNPAID"
+    assert _borclar(daire)[0][3] == "PAID"
+
+def test_paid_amount_dagitimla_birlikte_guncellenir(test_sitesi):
+    site_id, daire = test_sitesi["site_id"], test_sitesi["daireler"][0]
+    borc_ekle(daire, "2025-10-01", 1000)
+    borc_ekle(daire, "2025-11-01", 800, tur="FUEL")
+
+    assert kaydet_odeme(site_id, daire, 400, "1. taksit")
+    assert kaydet_odeme(site_id, daire, 900, "2. taksit")
+
+    assert _odenenler(daire) == [("2025-10-01", Decimal("1000.00"), Decimal("0.00")),
+                                 ("2025-11-01", Decimal("300.00"), Decimal("500.00"))]
+    assert get_detayli_borc(daire) == {"aidat": 0.0, "yakit": 500.0, "diger": 0.0, "toplam": 500.0}
+
+def test_paid_amount_payment_debt_ile_tutarli(test_sitesi):
+    site_id, daire = test_sitesi["site_id"], test_sitesi["daireler"][0]
+    for ay in range(1, 7):
+        borc_ekle(daire, f"2025-{ay:02d}-01", 750)
+    for tutar in (100, 1200, 333.33, 2000):
+        assert kaydet_odeme(site_id, daire, tutar, "test")
+
+    assert dogrula_odenen_tutarlar(site_id).empty
+
+def test_sapma_raporu_ve_duzeltme(test_sitesi):
+    site_id, daire = test_sitesi["site_id"], test_sitesi["daireler"][0]
+    borc_id = borc_ekle(daire, "2025-10-01", 1000)
+    assert kaydet_odeme(site_id, daire, 600, "test")
+    # paid_amount'u payment_debt'ten bağımsız olarak bozalım
+    sorgula("UPDATE debt_item SET paid_amount = 0, status = 'UNPAID' WHERE id = %s RETURNING id", (borc_id,))
+
+    sapma = dogrula_odenen_tutarlar(site_id)
+    assert sapma[["Borç ID", "Kayıtlı Ödenen", "Gerçek Ödenen", "Doğru Durum"]].values.tolist() == [
+        [borc_id, Decimal("0.00"), Decimal("600.00"), "PARTIAL"]]
+
+    assert len(dogrula_odenen_tutarlar(site_id, duzelt=True)) == 1
+    assert dogrula_odenen_tutarlar(site_id).empty
+    assert _odenenler(daire) == [("2025-10-01", Decimal("600.00"), Decimal("400.00"))]
+    assert _borclar(daire)[0][3] == "PARTIAL"